@@ -0,0 +1,78 @@
+"""Throughput of concurrent read only queries for several gRPC channel pool sizes.
+
+    python -m benchmark.channel_pool --pool-sizes 1,2,4 --concurrency 64 --requests 4000
+"""
+import argparse
+import asyncio
+import logging
+import time
+
+from v2.nacos.common.client_config import ClientConfig, GRPCConfig
+from v2.nacos.naming.model.naming_request import ServiceQueryRequest
+from v2.nacos.testing import FakeNacosServer
+from v2.nacos.transport.grpc_client import GrpcClient
+from v2.nacos.transport.http_agent import HttpAgent
+from v2.nacos.transport.nacos_server_connector import NacosServerConnector
+
+
+async def _start_client(port: int, pool_size: int, logger) -> GrpcClient:
+    client_config = ClientConfig(server_addresses=f"127.0.0.1:{port - 1000}")
+    client_config.set_grpc_config(GRPCConfig(channel_pool_size=pool_size))
+    connector = NacosServerConnector(logger, client_config, HttpAgent(logger, None, 3))
+    client = GrpcClient(logger, f"bench-pool-{pool_size}", client_config, connector)
+    await client.start()
+    # wait for the pooled connections opened in the background
+    for _ in range(100):
+        if len(client.pool_connections) >= pool_size - 1:
+            break
+        await asyncio.sleep(0.05)
+    return client
+
+
+async def run_once(port: int, pool_size: int, concurrency: int, total: int, logger) -> float:
+    client = await _start_client(port, pool_size, logger)
+    remaining = total
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            request = ServiceQueryRequest(namespace="public", serviceName="bench", groupName="DEFAULT_GROUP",
+                                          cluster="", healthOnly=False)
+            await client.request(request, 10000)
+
+    try:
+        start = time.perf_counter()
+        await asyncio.gather(*[worker() for _ in range(concurrency)])
+        return total / (time.perf_counter() - start)
+    finally:
+        await client.shutdown()
+
+
+async def main(args):
+    logger = logging.getLogger("benchmark")
+    logger.addHandler(logging.NullHandler())
+    logger.propagate = False
+    server = FakeNacosServer(latency_ms=args.latency_ms, max_concurrent_streams=args.max_streams)
+    port = await server.start()
+    try:
+        print(f"latency {args.latency_ms}ms, max concurrent streams per connection {args.max_streams}, "
+              f"concurrency {args.concurrency}, requests {args.requests}")
+        baseline = None
+        for pool_size in [int(size) for size in args.pool_sizes.split(",")]:
+            throughput = await run_once(port, pool_size, args.concurrency, args.requests, logger)
+            baseline = baseline or throughput
+            print(f"pool size {pool_size:>3}: {throughput:10.1f} req/s  x{throughput / baseline:.2f}")
+    finally:
+        await server.stop()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pool-sizes", default="1,2,4,8")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=4000)
+    parser.add_argument("--latency-ms", type=float, default=20)
+    parser.add_argument("--max-streams", type=int, default=8,
+                        help="concurrent streams allowed per connection by the fake server")
+    asyncio.run(main(parser.parse_args()))
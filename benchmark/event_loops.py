@@ -0,0 +1,132 @@
+"""Compares the default asyncio loop and uvloop on push handling and request throughput.
+
+    python -m benchmark.event_loops
+    python -m benchmark.event_loops --pushes 5000 --hosts 100 --requests 20000 --output loops.json
+
+Each loop runs the same two scenarios against an in-process FakeNacosServer, so the numbers
+include the server side, which runs on the same loop. ``push`` floods a subscribed naming client
+with NotifySubscriberRequest pushes that all change the instance list and measures until every push
+reached the subscriber callback. ``request`` sends ``--requests`` config queries with
+``--concurrency`` in flight. uvloop is skipped when it is not installed.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import tempfile
+import time
+
+from v2.nacos.common.client_config import ClientConfig
+from v2.nacos.config.model.config_param import ConfigParam
+from v2.nacos.config.nacos_config_service import NacosConfigService
+from v2.nacos.naming.model.instance import Instance
+from v2.nacos.naming.model.naming_param import SubscribeServiceParam
+from v2.nacos.naming.model.naming_request import NotifySubscriberRequest
+from v2.nacos.naming.model.service import Service
+from v2.nacos.naming.nacos_naming_service import NacosNamingService
+from v2.nacos.testing import FakeNacosServer
+from v2.nacos.utils import loop_util
+
+
+def _client_config(port: int, work_dir: str) -> ClientConfig:
+    client_config = ClientConfig(server_addresses=f"127.0.0.1:{port - 1000}", log_dir=work_dir,
+                                 log_level=logging.WARNING)
+    client_config.set_cache_dir(work_dir)
+    return client_config
+
+
+async def push_scenario(server: FakeNacosServer, client_config: ClientConfig, pushes: int, hosts: int) -> float:
+    naming = await NacosNamingService.create_naming_service(client_config)
+    received = 0
+    done = asyncio.Event()
+
+    async def on_change(instances):
+        nonlocal received
+        received += 1
+        if received == pushes:
+            done.set()
+
+    try:
+        await naming.subscribe(SubscribeServiceParam(service_name="bench", subscribe_callback=on_change))
+        await server.wait_for_connections(1)
+        requests = []
+        for i in range(pushes):
+            # every push moves the instances, so each one reaches the callback
+            service = Service(name="bench", groupName="DEFAULT_GROUP", lastRefTime=i + 1,
+                              hosts=[Instance(ip="10.0.0.1", port=10000 + i + host) for host in range(hosts)])
+            requests.append(NotifySubscriberRequest(namespace="public", groupName="DEFAULT_GROUP",
+                                                    serviceName="bench", serviceInfo=service))
+        begin = time.perf_counter()
+        for request in requests:
+            server.push(request)
+        await asyncio.wait_for(done.wait(), 120)
+        return pushes / (time.perf_counter() - begin)
+    finally:
+        await naming.shutdown()
+
+
+async def request_scenario(server: FakeNacosServer, client_config: ClientConfig, requests: int,
+                           concurrency: int) -> float:
+    server.publish_config("bench", "DEFAULT_GROUP", "x" * 256)
+    config = await NacosConfigService.create_config_service(client_config)
+    remaining = requests
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            await config.get_config(ConfigParam(data_id="bench", group="DEFAULT_GROUP"))
+
+    try:
+        begin = time.perf_counter()
+        await asyncio.gather(*[worker() for _ in range(concurrency)])
+        return requests / (time.perf_counter() - begin)
+    finally:
+        await config.shutdown()
+
+
+async def run_scenarios(args) -> dict:
+    with tempfile.TemporaryDirectory() as work_dir:
+        server = FakeNacosServer()
+        port = await server.start()
+        try:
+            client_config = _client_config(port, work_dir)
+            return {
+                "pushes_per_second": await push_scenario(server, client_config, args.pushes, args.hosts),
+                "requests_per_second": await request_scenario(server, client_config, args.requests,
+                                                              args.concurrency),
+            }
+        finally:
+            await server.stop()
+
+
+def main(args) -> dict:
+    results = {}
+    loops = [("asyncio", False)] + ([("uvloop", True)] if loop_util.uvloop_available() else [])
+    for name, use_uvloop in loops:
+        print(f"running on {name}", file=sys.stderr)
+        results[name] = loop_util.run(run_scenarios(args), use_uvloop=use_uvloop)
+    if not loop_util.uvloop_available():
+        print("uvloop is not installed, only the default loop was measured", file=sys.stderr)
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pushes", type=int, default=2000)
+    parser.add_argument("--hosts", type=int, default=10, help="instances in every push")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--output", help="also write the results as JSON")
+    arguments = parser.parse_args()
+    result = main(arguments)
+    print(f"{'loop':<10}{'pushes/s':>12}{'requests/s':>12}")
+    for loop_name, numbers in result.items():
+        print(f"{loop_name:<10}{numbers['pushes_per_second']:>12.0f}{numbers['requests_per_second']:>12.0f}")
+    if "uvloop" in result:
+        print(f"uvloop speedup: pushes {result['uvloop']['pushes_per_second'] / result['asyncio']['pushes_per_second']:.2f}x, "
+              f"requests {result['uvloop']['requests_per_second'] / result['asyncio']['requests_per_second']:.2f}x")
+    if arguments.output:
+        with open(arguments.output, "w", encoding="utf-8") as output:
+            json.dump(result, output, indent=2)
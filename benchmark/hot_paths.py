@@ -0,0 +1,310 @@
+"""Micro-benchmarks of the client hot paths, with JSON results and a compare command.
+
+    python -m benchmark.hot_paths run --output baseline.json
+    python -m benchmark.hot_paths run --output current.json --filter grpc_
+    python -m benchmark.hot_paths compare baseline.json current.json --threshold 10
+
+Every benchmark is calibrated to run at least ``--min-time`` seconds per round and reports the
+per call time of ``--rounds`` rounds; the median is compared. ``compare`` exits with status 1
+when a benchmark got slower than the threshold, so it can gate a change in CI. Compare results
+taken on the same machine and Python version only.
+"""
+import argparse
+import asyncio
+import fnmatch
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from v2.nacos.common.client_config import ClientConfig
+from v2.nacos.common.constants import Constants
+from v2.nacos.config.cache.config_info_cache import ConfigInfoCache
+from v2.nacos.config.cache.config_subscribe_manager import ConfigSubscribeManager
+from v2.nacos.config.filter.config_filter import ConfigFilterChainManager
+from v2.nacos.config.model.config import SubscribeCacheData, CacheDataListenerWrap
+from v2.nacos.config.util.config_client_util import get_config_cache_key
+from v2.nacos.naming.cache.service_info_cache import ServiceInfoCache
+from v2.nacos.naming.cache.subscribe_callback_wrapper import ClusterSelector
+from v2.nacos.naming.model.instance import Instance
+from v2.nacos.naming.model.naming_param import ListInstanceParam
+from v2.nacos.naming.model.naming_request import NotifySubscriberRequest
+from v2.nacos.naming.model.service import Service
+from v2.nacos.naming.nacos_naming_service import NacosNamingService
+from v2.nacos.testing import FakeNacosServer
+from v2.nacos.transport.grpc_util import GrpcUtils
+from v2.nacos.transport.request_signer import RequestSigner
+from v2.nacos.utils.hmac_util import sign_with_hmac_sha1_encrypt
+from v2.nacos.utils.md5_util import md5
+
+SCHEMA_VERSION = 1
+
+# name -> async factory returning the function to time and an optional cleanup coroutine
+BENCHMARKS: Dict[str, Callable[[str], Awaitable[tuple]]] = {}
+
+
+def benchmark(name: str):
+    def register(factory):
+        BENCHMARKS[name] = factory
+        return factory
+    return register
+
+
+def _hosts(count: int, clusters: int = 4) -> List[Instance]:
+    return [Instance(ip=f"10.{i // 65536 % 256}.{i // 256 % 256}.{i % 256}", port=8080, clusterName=f"c{i % clusters}",
+                     healthy=i % 10 != 0, weight=1.0, metadata={"version": "1.0.0", "zone": f"z{i % 3}"})
+            for i in range(count)]
+
+
+def _service(host_count: int) -> Service:
+    return Service(name="bench", groupName="DEFAULT_GROUP", hosts=_hosts(host_count), lastRefTime=1)
+
+
+def _notify_request(host_count: int) -> NotifySubscriberRequest:
+    return NotifySubscriberRequest(namespace="public", groupName="DEFAULT_GROUP", serviceName="bench",
+                                   serviceInfo=_service(host_count))
+
+
+def _client_config(work_dir: str, server_addresses: str = "127.0.0.1:8848") -> ClientConfig:
+    client_config = ClientConfig(server_addresses=server_addresses, access_key="ak", secret_key="sk",
+                                 log_dir=os.path.join(work_dir, "logs"))
+    client_config.set_cache_dir(os.path.join(work_dir, "cache"))
+    client_config.app_key = "bench"
+    return client_config
+
+
+def _codec_benchmarks(size: int, label: str):
+    @benchmark(f"grpc_encode_notify_{label}_hosts")
+    async def encode(work_dir):
+        request = _notify_request(size)
+        return lambda: GrpcUtils.convert_request_to_payload(request), None
+
+    @benchmark(f"grpc_parse_notify_{label}_hosts")
+    async def parse(work_dir):
+        payload = GrpcUtils.convert_request_to_payload(_notify_request(size))
+        return lambda: GrpcUtils.parse(payload), None
+
+
+_codec_benchmarks(10, "10")
+_codec_benchmarks(10000, "10k")
+
+
+@benchmark("service_info_cache_process_service_10k_hosts")
+async def process_service(work_dir):
+    # the steady state of a push: same hosts, newer lastRefTime, no file write and no callback
+    cache = ServiceInfoCache(_client_config(work_dir))
+    services = [_service(10000), _service(10000)]
+    await cache.process_service(services[0])
+    calls = 0
+
+    async def run():
+        nonlocal calls
+        calls += 1
+        service = services[calls % 2]
+        service.lastRefTime = calls + 1
+        await cache.process_service(service)
+    return run, None
+
+
+@benchmark("service_info_cache_check_instance_changed_10k_hosts")
+async def check_instance_changed(work_dir):
+    cache = ServiceInfoCache(_client_config(work_dir))
+    old, new = _service(10000), _service(10000)
+    new.lastRefTime = 2
+    return lambda: cache.check_instance_changed(old, new), None
+
+
+@benchmark("cluster_selector_select_instance_10k_hosts")
+async def select_instance(work_dir):
+    selector = ClusterSelector(["c1", "c2"])
+    service = _service(10000)
+    return lambda: selector.select_instance(service), None
+
+
+@benchmark("naming_list_instances_healthy_only_10k_hosts")
+async def list_instances(work_dir):
+    server = FakeNacosServer()
+    port = await server.start()
+    # filled directly, registering one by one would push the growing service 10k times
+    server.services[("public", "DEFAULT_GROUP", "bench")] = {(host.ip, host.port, host.clusterName): (host, None)
+                                                             for host in _hosts(10000)}
+    naming = await NacosNamingService.create_naming_service(_client_config(work_dir, f"127.0.0.1:{port - 1000}"))
+    param = ListInstanceParam(service_name="bench", healthy_only=True, subscribe=True)
+    # the first call subscribes, the timed ones are served from the cache
+    await naming.list_instances(param)
+
+    async def cleanup():
+        await naming.shutdown()
+        await server.stop()
+    return lambda: naming.list_instances(param), cleanup
+
+
+def _listen_benchmark(keys: int, label: str):
+    @benchmark(f"config_execute_listener_and_build_tasks_{label}_keys")
+    async def build_tasks(work_dir):
+        client_config = _client_config(work_dir)
+        manager = ConfigSubscribeManager(logging.getLogger("benchmark"), ConfigInfoCache(client_config), "",
+                                         ConfigFilterChainManager(), asyncio.Queue())
+
+        async def listener(tenant, group, data_id, content):
+            pass
+
+        for i in range(keys):
+            content = f"content-{i}"
+            cache_data = SubscribeCacheData(data_id=f"data-{i}", group="DEFAULT_GROUP", tenant="",
+                                            content=content, md5=md5(content), encrypted_data_key="",
+                                            chain_manager=manager.config_filter_chain_manager,
+                                            is_sync_with_server=True)
+            cache_data.task_id = i // Constants.PER_TASK_CONFIG_SIZE
+            # every listener has seen the current content, as between two changes
+            cache_data.cache_data_listeners.append(CacheDataListenerWrap(listener, cache_data.md5))
+            manager.subscribe_cache_map[get_config_cache_key(f"data-{i}", "DEFAULT_GROUP", "")] = cache_data
+        return lambda: manager.execute_listener_and_build_tasks(False), None
+
+
+_listen_benchmark(10000, "10k")
+_listen_benchmark(100000, "100k")
+
+
+@benchmark("md5_1kb")
+async def md5_1kb(work_dir):
+    content = "x" * 1024
+    return lambda: md5(content), None
+
+
+@benchmark("hmac_sha1_sign")
+async def hmac_sign(work_dir):
+    return lambda: sign_with_hmac_sha1_encrypt("public+DEFAULT_GROUP+1700000000000", "secret-key"), None
+
+
+@benchmark("request_signer_sign")
+async def signer_sign(work_dir):
+    signer = RequestSigner(_client_config(work_dir))
+    return lambda: signer.sign({}, "public+DEFAULT_GROUP"), None
+
+
+@benchmark("request_signer_sign_naming")
+async def signer_sign_naming(work_dir):
+    signer = RequestSigner(_client_config(work_dir))
+    return lambda: signer.sign_naming({}, "DEFAULT_GROUP@@bench"), None
+
+
+async def _time(func, loops: int, is_async: bool) -> float:
+    begin = time.perf_counter()
+    if is_async:
+        for _ in range(loops):
+            await func()
+    else:
+        for _ in range(loops):
+            func()
+    return time.perf_counter() - begin
+
+
+async def _measure(func, min_time: float, rounds: int) -> dict:
+    first = func()
+    is_async = asyncio.iscoroutine(first)
+    if is_async:
+        await first
+    loops = 1
+    while True:
+        elapsed = await _time(func, loops, is_async)
+        if elapsed >= min_time:
+            break
+        loops = max(loops * 2, int(loops * min_time / max(elapsed, 1e-9) * 1.2))
+    per_call_us = [(await _time(func, loops, is_async)) / loops * 1e6 for _ in range(rounds)]
+    return {
+        "median_us": statistics.median(per_call_us),
+        "min_us": min(per_call_us),
+        "stdev_us": statistics.stdev(per_call_us) if rounds > 1 else 0.0,
+        "loops": loops,
+        "rounds": rounds,
+    }
+
+
+async def run(patterns: Optional[List[str]], min_time: float, rounds: int) -> dict:
+    results = {}
+    with tempfile.TemporaryDirectory() as work_dir:
+        for name, factory in BENCHMARKS.items():
+            if patterns and not any(fnmatch.fnmatch(name, f"*{pattern}*") for pattern in patterns):
+                continue
+            func, cleanup = await factory(work_dir)
+            try:
+                results[name] = await _measure(func, min_time, rounds)
+            finally:
+                if cleanup is not None:
+                    await cleanup()
+            print(f"{name:<58} {results[name]['median_us']:>14.2f} us", file=sys.stderr, flush=True)
+    return {
+        "schema": SCHEMA_VERSION,
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "platform": platform.platform(),
+        "timestamp": int(time.time()),
+        "benchmarks": results,
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> int:
+    """Prints the change of every benchmark in both files, returns how many regressed over threshold percent."""
+    if baseline.get("python") != current.get("python") or baseline.get("machine") != current.get("machine"):
+        print(f"warning: baseline is from python {baseline.get('python')} on {baseline.get('machine')}, "
+              f"current from python {current.get('python')} on {current.get('machine')}")
+    regressions = 0
+    for name, result in current["benchmarks"].items():
+        base = baseline["benchmarks"].get(name)
+        if base is None:
+            print(f"{name:<58} {result['median_us']:>14.2f} us  (new)")
+            continue
+        change = (result["median_us"] - base["median_us"]) / base["median_us"] * 100
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        elif change < -threshold:
+            flag = "  faster"
+        print(f"{name:<58} {base['median_us']:>14.2f} -> {result['median_us']:>14.2f} us {change:>+8.1f}%{flag}")
+    for name in sorted(baseline["benchmarks"].keys() - current["benchmarks"].keys()):
+        print(f"{name:<58} (not run)")
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run", help="run the benchmarks and write the results as JSON")
+    run_parser.add_argument("--output", help="result file, printed to stdout when omitted")
+    run_parser.add_argument("--filter", action="append", help="only benchmarks whose name contains this, repeatable")
+    run_parser.add_argument("--min-time", type=float, default=0.2, help="minimum seconds per round")
+    run_parser.add_argument("--rounds", type=int, default=5)
+    run_parser.add_argument("--list", action="store_true", help="list the benchmarks and exit")
+    compare_parser = commands.add_parser("compare", help="compare a result file against a baseline")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=10, help="allowed slowdown in percent")
+    args = parser.parse_args(argv)
+
+    if args.command == "compare":
+        with open(args.baseline, encoding="utf-8") as baseline, open(args.current, encoding="utf-8") as current:
+            return 1 if compare(json.load(baseline), json.load(current), args.threshold) else 0
+
+    if args.list:
+        print("\n".join(BENCHMARKS))
+        return 0
+    logging.getLogger().addHandler(logging.NullHandler())
+    results = asyncio.run(run(args.filter, args.min_time, args.rounds))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output:
+            json.dump(results, output, indent=2, sort_keys=True)
+    else:
+        json.dump(results, sys.stdout, indent=2, sort_keys=True)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,287 @@
+"""Load generator: many naming and config clients in one or several processes.
+
+    python -m benchmark.load_generator --clients 50 --duration 30
+    python -m benchmark.load_generator --processes 4 --clients 100 --mix register=2,subscribe=1,publish=1
+    python -m benchmark.load_generator --server-addresses 10.0.0.1:8848 --clients 20 --output result.json
+
+Every process starts ``--clients`` NacosNamingService and NacosConfigService instances and runs
+``--concurrency`` workers for ``--duration`` seconds. A worker picks an operation by the weights of
+``--mix`` (register, subscribe, get_config, add_listener, publish) and a random client.
+Registrations and publishes carry their send time, so subscribers and listeners measure how long a
+change takes from the call to their callback. Without ``--server-addresses`` an in-process
+FakeNacosServer is started, all processes connect to it.
+
+The report gives, per operation, the throughput and p50/p99/p999 latency, the push to callback
+latency, the subscriptions, listeners and registrations held, the RSS and the event loop lag of
+every process.
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List
+
+import psutil
+
+from v2.nacos.common.client_config import ClientConfig
+from v2.nacos.config.model.config_param import ConfigParam
+from v2.nacos.config.nacos_config_service import NacosConfigService
+from v2.nacos.naming.model.naming_param import RegisterInstanceParam, SubscribeServiceParam
+from v2.nacos.naming.nacos_naming_service import NacosNamingService
+from v2.nacos.testing import FakeNacosServer
+
+OPERATIONS = ["register", "subscribe", "get_config", "add_listener", "publish"]
+DEFAULT_MIX = "register=1,subscribe=1,get_config=4,add_listener=1,publish=1"
+GROUP = "LOAD_GROUP"
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    weights = {}
+    for item in mix.split(","):
+        name, _, weight = item.partition("=")
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise argparse.ArgumentTypeError(f"unknown operation {name}, expected one of {', '.join(OPERATIONS)}")
+        weights[name] = float(weight or 1)
+    return weights
+
+
+def percentile(sorted_samples: List[float], q: float) -> float:
+    if not sorted_samples:
+        return 0.0
+    return sorted_samples[min(len(sorted_samples) - 1, int(q / 100 * len(sorted_samples)))]
+
+
+def summarize(samples: List[float]) -> dict:
+    samples = sorted(samples)
+    return {
+        "count": len(samples),
+        "p50_ms": percentile(samples, 50),
+        "p99_ms": percentile(samples, 99),
+        "p999_ms": percentile(samples, 99.9),
+        "max_ms": samples[-1] if samples else 0.0,
+    }
+
+
+class Worker:
+    """The clients of one process and what they measured."""
+
+    def __init__(self, args, worker_id: int):
+        self.args = args
+        self.worker_id = worker_id
+        self.random = random.Random(args.seed + worker_id)
+        self.naming: List[NacosNamingService] = []
+        self.config: List[NacosConfigService] = []
+        self.latencies: Dict[str, List[float]] = {operation: [] for operation in OPERATIONS}
+        self.errors: Dict[str, int] = {operation: 0 for operation in OPERATIONS}
+        self.push_latencies: Dict[str, List[float]] = {"naming": [], "config": []}
+        self.subscribed = set()
+        self.listened = set()
+        self.registered = set()
+        self.loop_lag: List[float] = []
+        self.peak_rss = 0
+
+    def client_config(self) -> ClientConfig:
+        client_config = ClientConfig(server_addresses=self.args.server_addresses, namespace_id=self.args.namespace,
+                                     log_dir=os.path.join(self.args.work_dir, "logs"),
+                                     log_level=self.args.log_level)
+        client_config.set_cache_dir(os.path.join(self.args.work_dir, "cache", str(self.worker_id)))
+        return client_config
+
+    async def start(self):
+        for _ in range(self.args.clients):
+            self.naming.append(await NacosNamingService.create_naming_service(self.client_config()))
+            self.config.append(await NacosConfigService.create_config_service(self.client_config()))
+
+    async def shutdown(self):
+        # concurrently, a config service waits for its listen task to stop
+        await asyncio.gather(*[service.shutdown() for service in self.naming + self.config])
+
+    async def on_instances(self, instances):
+        sent = [float(instance.metadata["sent"]) for instance in instances if "sent" in instance.metadata]
+        if sent:
+            self.push_latencies["naming"].append((time.time() - max(sent)) * 1000)
+
+    async def on_config(self, tenant, group, data_id, content):
+        try:
+            self.push_latencies["config"].append((time.time() - float(content.split("@", 1)[0])) * 1000)
+        except ValueError:
+            pass
+
+    async def register(self):
+        client = self.random.randrange(len(self.naming))
+        service = self.random.randrange(self.args.services)
+        # one instance per client and service, re-registering changes its metadata and pushes
+        await self.naming[client].register_instance(RegisterInstanceParam(
+            service_name=f"load-svc-{service}", group_name=GROUP, ip=f"10.{self.worker_id}.{client // 256}.{client % 256}",
+            port=8000 + service, metadata={"sent": repr(time.time())}))
+        self.registered.add((client, service))
+
+    async def subscribe(self):
+        client, service = self.random.randrange(len(self.naming)), self.random.randrange(self.args.services)
+        if (client, service) in self.subscribed:
+            return False
+        self.subscribed.add((client, service))
+        await self.naming[client].subscribe(SubscribeServiceParam(
+            service_name=f"load-svc-{service}", group_name=GROUP, subscribe_callback=self.on_instances))
+
+    async def get_config(self):
+        client, data = self.random.randrange(len(self.config)), self.random.randrange(self.args.configs)
+        await self.config[client].get_config(ConfigParam(data_id=f"load-cfg-{data}", group=GROUP))
+
+    async def add_listener(self):
+        client, data = self.random.randrange(len(self.config)), self.random.randrange(self.args.configs)
+        if (client, data) in self.listened:
+            return False
+        self.listened.add((client, data))
+        await self.config[client].add_listener(f"load-cfg-{data}", GROUP, self.on_config)
+
+    async def publish(self):
+        client, data = self.random.randrange(len(self.config)), self.random.randrange(self.args.configs)
+        await self.config[client].publish_config(ConfigParam(
+            data_id=f"load-cfg-{data}", group=GROUP, content=f"{time.time()!r}@{self.worker_id}"))
+
+    async def drive(self, deadline: float):
+        weights = parse_mix(self.args.mix)
+        operations, cumulative = list(weights), list(weights.values())
+        while time.perf_counter() < deadline:
+            operation = self.random.choices(operations, cumulative)[0]
+            begin = time.perf_counter()
+            try:
+                if await getattr(self, operation)() is False:
+                    # already subscribed or listening, nothing was sent
+                    continue
+            except Exception:
+                self.errors[operation] += 1
+                continue
+            self.latencies[operation].append((time.perf_counter() - begin) * 1000)
+
+    async def monitor(self, interval: float = 0.05):
+        process = psutil.Process()
+        while True:
+            begin = time.perf_counter()
+            await asyncio.sleep(interval)
+            self.loop_lag.append((time.perf_counter() - begin - interval) * 1000)
+            self.peak_rss = max(self.peak_rss, process.memory_info().rss)
+
+    async def run(self) -> dict:
+        monitor = asyncio.create_task(self.monitor())
+        try:
+            await self.start()
+            begin = time.perf_counter()
+            await asyncio.gather(*[self.drive(begin + self.args.duration) for _ in range(self.args.concurrency)])
+            elapsed = time.perf_counter() - begin
+            # pushes of the last changes are still in flight
+            await asyncio.sleep(self.args.drain)
+        finally:
+            monitor.cancel()
+            await self.shutdown()
+        return {
+            "worker": self.worker_id,
+            "elapsed": elapsed,
+            "latencies": self.latencies,
+            "errors": self.errors,
+            "push_latencies": self.push_latencies,
+            "subscriptions": len(self.subscribed),
+            "listeners": len(self.listened),
+            "registrations": len(self.registered),
+            "loop_lag": summarize(self.loop_lag),
+            "peak_rss_mb": self.peak_rss / 1024 / 1024,
+        }
+
+
+def _run_process(args, worker_id: int) -> dict:
+    return asyncio.run(Worker(args, worker_id).run())
+
+
+def report(results: List[dict]) -> dict:
+    elapsed = max(result["elapsed"] for result in results)
+    operations = {}
+    for operation in OPERATIONS:
+        samples = [sample for result in results for sample in result["latencies"][operation]]
+        errors = sum(result["errors"][operation] for result in results)
+        if samples or errors:
+            operations[operation] = dict(summarize(samples), errors=errors, per_second=len(samples) / elapsed)
+    return {
+        "processes": len(results),
+        "elapsed": elapsed,
+        "operations": operations,
+        "push_to_callback": {kind: summarize([sample for result in results for sample in result["push_latencies"][kind]])
+                             for kind in ("naming", "config")},
+        "subscriptions": sum(result["subscriptions"] for result in results),
+        "listeners": sum(result["listeners"] for result in results),
+        "registrations": sum(result["registrations"] for result in results),
+        "per_process": [{"worker": result["worker"], "peak_rss_mb": result["peak_rss_mb"],
+                         "loop_lag": result["loop_lag"]} for result in results],
+    }
+
+
+def print_report(summary: dict):
+    print(f"{summary['processes']} processes, {summary['elapsed']:.1f}s")
+    print(f"{'operation':<14}{'ops/s':>10}{'count':>9}{'errors':>8}{'p50 ms':>10}{'p99 ms':>10}{'p999 ms':>10}")
+    for operation, stats in summary["operations"].items():
+        print(f"{operation:<14}{stats['per_second']:>10.1f}{stats['count']:>9}{stats['errors']:>8}"
+              f"{stats['p50_ms']:>10.2f}{stats['p99_ms']:>10.2f}{stats['p999_ms']:>10.2f}")
+    for kind, stats in summary["push_to_callback"].items():
+        print(f"push to callback ({kind}): {stats['count']} pushes, p50 {stats['p50_ms']:.2f}ms, "
+              f"p99 {stats['p99_ms']:.2f}ms, p999 {stats['p999_ms']:.2f}ms")
+    print(f"held: {summary['subscriptions']} subscriptions, {summary['listeners']} listeners, "
+          f"{summary['registrations']} registrations")
+    for process in summary["per_process"]:
+        lag = process["loop_lag"]
+        print(f"process {process['worker']}: peak rss {process['peak_rss_mb']:.1f}MB, loop lag p50 {lag['p50_ms']:.2f}ms "
+              f"p99 {lag['p99_ms']:.2f}ms max {lag['max_ms']:.2f}ms")
+
+
+async def main(args) -> dict:
+    server = None
+    if not args.server_addresses:
+        server = FakeNacosServer()
+        port = await server.start()
+        args.server_addresses = f"127.0.0.1:{port - 1000}"
+    try:
+        if args.processes == 1:
+            results = [await Worker(args, 0).run()]
+        else:
+            # spawned, a forked child would inherit the gRPC state of the parent
+            loop = asyncio.get_running_loop()
+            with ProcessPoolExecutor(args.processes, mp_context=multiprocessing.get_context("spawn")) as executor:
+                results = await asyncio.gather(*[loop.run_in_executor(executor, _run_process, args, worker_id)
+                                                 for worker_id in range(args.processes)])
+    finally:
+        if server is not None:
+            await server.stop()
+    return report(results)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--server-addresses", help="a real server, an in-process fake server when omitted")
+    parser.add_argument("--namespace", default="")
+    parser.add_argument("--processes", type=int, default=1)
+    parser.add_argument("--clients", type=int, default=10, help="naming and config services per process")
+    parser.add_argument("--concurrency", type=int, default=32, help="concurrent operations per process")
+    parser.add_argument("--duration", type=float, default=10, help="seconds")
+    parser.add_argument("--drain", type=float, default=1, help="seconds to wait for the last pushes")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="operation weights")
+    parser.add_argument("--services", type=int, default=20)
+    parser.add_argument("--configs", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--log-level", default="WARNING")
+    parser.add_argument("--output", help="also write the report as JSON")
+    arguments = parser.parse_args()
+    parse_mix(arguments.mix)
+    with tempfile.TemporaryDirectory() as work_dir:
+        arguments.work_dir = work_dir
+        result = asyncio.run(main(arguments))
+    print_report(result)
+    if arguments.output:
+        with open(arguments.output, "w", encoding="utf-8") as output:
+            json.dump(result, output, indent=2)
+    sys.exit(0)
@@ -0,0 +1,108 @@
+"""Replays recorded server pushes into the naming cache and config listeners, without a server.
+
+    python -m benchmark.replay_pushes pushes.rec
+    python -m benchmark.replay_pushes pushes.rec --rounds 5 --no-subscribe
+    python -m benchmark.replay_pushes pushes.rec --real-time --speed 10
+
+Record pushes with ``GRPCConfig(push_record_path=...)`` on a client. Every round feeds the whole
+file to a NamingPushRequestHandler over a fresh ServiceInfoCache and to a
+ConfigChangeNotifyRequestHandler, as fast as possible unless ``--real-time``. By default every
+service and config seen in the file gets a subscriber or listener first, so callback processing
+is part of the measurement. Run it under a profiler to see where the time goes.
+"""
+import argparse
+import asyncio
+import logging
+import statistics
+import tempfile
+import time
+
+from v2.nacos.common.client_config import ClientConfig
+from v2.nacos.config.cache.config_info_cache import ConfigInfoCache
+from v2.nacos.config.cache.config_subscribe_manager import ConfigSubscribeManager
+from v2.nacos.config.filter.config_filter import ConfigFilterChainManager
+from v2.nacos.config.model.config_request import CONFIG_CHANGE_NOTIFY_REQUEST_TYPE
+from v2.nacos.config.remote.config_change_notify_request_handler import ConfigChangeNotifyRequestHandler
+from v2.nacos.naming.cache.service_info_cache import ServiceInfoCache
+from v2.nacos.naming.cache.subscribe_callback_wrapper import ClusterSelector, SubscribeCallbackFuncWrapper
+from v2.nacos.naming.model.naming_request import NOTIFY_SUBSCRIBER_REQUEST_TYPE
+from v2.nacos.naming.remote.naming_push_request_handler import NamingPushRequestHandler
+from v2.nacos.naming.util.naming_client_util import get_group_name
+from v2.nacos.transport.grpc_util import GrpcUtils
+from v2.nacos.transport.push_recorder import PushReplayer, read_pushes
+
+
+def scan(path: str):
+    services, configs, counts = set(), set(), {}
+    for _, payload in read_pushes(path):
+        counts[payload.metadata.type] = counts.get(payload.metadata.type, 0) + 1
+        if payload.metadata.type == NOTIFY_SUBSCRIBER_REQUEST_TYPE:
+            service = GrpcUtils.parse(payload).serviceInfo
+            if service is not None:
+                services.add((get_group_name(service.name, service.groupName), service.clusters or ""))
+        elif payload.metadata.type == CONFIG_CHANGE_NOTIFY_REQUEST_TYPE:
+            request = GrpcUtils.parse(payload)
+            configs.add((request.dataId, request.group))
+    return services, configs, counts
+
+
+async def replay_round(args, work_dir: str, services, configs) -> float:
+    logger = logging.getLogger("benchmark")
+    client_config = ClientConfig(server_addresses="127.0.0.1:8848", log_dir=work_dir)
+    client_config.set_cache_dir(work_dir)
+    client_config.set_load_cache_at_start(False)
+    service_info_cache = ServiceInfoCache(client_config)
+    config_subscribe_manager = ConfigSubscribeManager(logger, ConfigInfoCache(client_config), "",
+                                                      ConfigFilterChainManager(), asyncio.Queue())
+    if args.subscribe:
+        async def on_instances(instances):
+            pass
+
+        async def on_config(tenant, group, data_id, content):
+            pass
+
+        for service_name, clusters in services:
+            await service_info_cache.register_callback(service_name, clusters, SubscribeCallbackFuncWrapper(
+                ClusterSelector(clusters.split(",") if clusters else None), on_instances))
+        for data_id, group in configs:
+            await config_subscribe_manager.add_listener(data_id, group, "", on_config)
+
+    replayer = PushReplayer(logger, {
+        NOTIFY_SUBSCRIBER_REQUEST_TYPE: NamingPushRequestHandler(logger, service_info_cache),
+        CONFIG_CHANGE_NOTIFY_REQUEST_TYPE: ConfigChangeNotifyRequestHandler(logger, config_subscribe_manager,
+                                                                            "benchmark"),
+    })
+    begin = time.perf_counter()
+    await replayer.replay(args.path, args.real_time, args.speed)
+    elapsed = time.perf_counter() - begin
+    if replayer.failed:
+        print(f"{replayer.failed} pushes failed")
+    return elapsed
+
+
+async def main(args):
+    services, configs, counts = scan(args.path)
+    total = sum(counts.values())
+    print(f"{total} pushes: " + ", ".join(f"{name} {count}" for name, count in sorted(counts.items())))
+    print(f"{len(services)} services, {len(configs)} configs")
+    handled = counts.get(NOTIFY_SUBSCRIBER_REQUEST_TYPE, 0) + counts.get(CONFIG_CHANGE_NOTIFY_REQUEST_TYPE, 0)
+    timings = []
+    for _ in range(args.rounds):
+        with tempfile.TemporaryDirectory() as work_dir:
+            timings.append(await replay_round(args, work_dir, services, configs))
+    median = statistics.median(timings)
+    print(f"replay median {median * 1000:.1f}ms, min {min(timings) * 1000:.1f}ms over {args.rounds} rounds, "
+          f"{handled / median if median else 0:.0f} pushes/s")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", help="file written by a client with push_record_path")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--real-time", action="store_true", help="keep the recorded gaps between pushes")
+    parser.add_argument("--speed", type=float, default=1.0, help="divides the recorded gaps with --real-time")
+    parser.add_argument("--no-subscribe", dest="subscribe", action="store_false",
+                        help="replay without subscribers and listeners")
+    arguments = parser.parse_args()
+    logging.basicConfig(level=logging.ERROR)
+    asyncio.run(main(arguments))
@@ -55,7 +55,7 @@ setup(
     name="nacos-sdk-python",
     version="3.2.0",
     packages=find_packages(
-        exclude=["test", "*.tests", "*.tests.*", "tests.*", "tests"]),
+        exclude=["test", "*.tests", "*.tests.*", "tests.*", "tests", "benchmark", "benchmark.*"]),
     url="https://github.com/nacos-group/nacos-sdk-python",
     license="Apache License 2.0",
     classifiers=[
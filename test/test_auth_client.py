@@ -0,0 +1,112 @@
+import asyncio
+import json
+import logging
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from v2.nacos.common.client_config import ClientConfig
+from v2.nacos.transport.auth_client import AuthClient
+
+
+class FakeHttpAgent:
+	"""Answers logins with a token, servers listed in delays answer late or, with None, not at all."""
+
+	def __init__(self, token_ttl=18000, delays=None):
+		self.token_ttl = token_ttl
+		self.delays = delays or {}
+		self.logins = []
+		self.logged_in = asyncio.Event()
+
+	async def request(self, url, method, headers, params, data):
+		self.logins.append(url)
+		delay = self.delays.get(url.split("/nacos")[0], 0)
+		if delay is None:
+			return None, "connection refused"
+		await asyncio.sleep(delay)
+		body = {"accessToken": f"token-{id(self)}-{len(self.logins)}", "tokenTtl": self.token_ttl}
+		self.logged_in.set()
+		return json.dumps(body).encode("utf-8"), None
+
+
+class TestAuthClient(unittest.IsolatedAsyncioTestCase):
+	"""Tests for login coalescing, racing, refresh and the token cache of AuthClient."""
+
+	def setUp(self):
+		self.logger = logging.getLogger("test")
+		self.servers = ["http://127.0.0.1:8848", "http://127.0.0.2:8848"]
+		self.cache_dir = tempfile.TemporaryDirectory()
+		self.clients = []
+
+	async def asyncTearDown(self):
+		for client in self.clients:
+			await client.close()
+		self.cache_dir.cleanup()
+
+	def _client(self, http_agent, password="nacos", cache=False, refresh_ratio=0.8):
+		client_config = ClientConfig(server_addresses=",".join(self.servers), username="nacos", password=password)
+		client_config.set_cache_dir(self.cache_dir.name)
+		client_config.set_auth_token_cache_enabled(cache)
+		client_config.set_auth_token_refresh_ratio(refresh_ratio)
+		client = AuthClient(self.logger, client_config, lambda: self.servers, http_agent)
+		self.clients.append(client)
+		return client
+
+	async def test_concurrent_callers_share_one_login(self):
+		http_agent = FakeHttpAgent(delays={self.servers[1]: None})
+		client = self._client(http_agent)
+		tokens = await asyncio.gather(*[client.get_access_token() for _ in range(10)])
+		self.assertEqual(set(tokens), {tokens[0]})
+		self.assertEqual(len(http_agent.logins), 2)
+
+	async def test_login_races_servers(self):
+		http_agent = FakeHttpAgent(delays={self.servers[0]: 2, self.servers[1]: 0.01})
+		client = self._client(http_agent)
+		begin = time.perf_counter()
+		self.assertIsNotNone(await client.get_access_token())
+		self.assertLess(time.perf_counter() - begin, 1)
+
+	async def test_token_is_refreshed_in_background(self):
+		http_agent = FakeHttpAgent(token_ttl=1)
+		client = self._client(http_agent, refresh_ratio=0.5)
+		first = await client.get_access_token()
+		logins = len(http_agent.logins)
+		http_agent.logged_in.clear()
+		# the refresh is due after about a second, the bound only catches one that never comes
+		await asyncio.wait_for(http_agent.logged_in.wait(), 30)
+		await client.login_task
+		self.assertNotEqual(client.access_token, first)
+		self.assertGreater(len(http_agent.logins), logins)
+
+	async def test_cached_token_survives_restart(self):
+		first = self._client(FakeHttpAgent(), cache=True)
+		token = await first.get_access_token()
+
+		http_agent = FakeHttpAgent()
+		restarted = self._client(http_agent, cache=True)
+		self.assertEqual(await restarted.get_access_token(), token)
+		self.assertEqual(http_agent.logins, [])
+
+		http_agent = FakeHttpAgent()
+		other_password = self._client(http_agent, password="other", cache=True)
+		self.assertNotEqual(await other_password.get_access_token(), token)
+		self.assertEqual(len(http_agent.logins), 2)
+
+	async def test_unusable_token_cache_falls_back_to_login(self):
+		client = self._client(FakeHttpAgent(), cache=True)
+		await client.token_cache.save(["not", "a", "token"])
+		self.assertIsNone(await client.token_cache.load())
+		with mock.patch("v2.nacos.transport.auth_client.read_file", side_effect=OSError("disk error")):
+			self.assertIsNone(await client.token_cache.load())
+
+		http_agent = FakeHttpAgent()
+		restarted = self._client(http_agent, cache=True)
+		with open(restarted.token_cache.file_path, "w") as cache_file:
+			cache_file.write("damaged")
+		self.assertIsNotNone(await restarted.get_access_token())
+		self.assertEqual(len(http_agent.logins), 2)
+
+
+if __name__ == '__main__':
+	unittest.main()
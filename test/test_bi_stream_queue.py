@@ -0,0 +1,63 @@
+import asyncio
+import unittest
+
+from v2.nacos.common.nacos_exception import NacosException, CLIENT_OVER_THRESHOLD, CLIENT_DISCONNECT
+from v2.nacos.transport.bi_stream_queue import BiStreamSendQueue, PRIORITY_CONTROL, PRIORITY_ACK, \
+	PRIORITY_REQUEST
+from v2.nacos.transport.grpcauto.nacos_grpc_service_pb2 import Payload, Metadata
+
+
+def _payload(name):
+	return Payload(metadata=Metadata(type=name))
+
+
+class TestBiStreamSendQueue(unittest.IsolatedAsyncioTestCase):
+	"""Tests for the bounded priority queue feeding the bi stream."""
+
+	async def test_control_then_acks_then_requests(self):
+		queue = BiStreamSendQueue(max_size=8)
+		await queue.put(_payload("request-1"), PRIORITY_REQUEST)
+		await queue.put(_payload("ack-1"), PRIORITY_ACK)
+		await queue.put(_payload("setup"), PRIORITY_CONTROL)
+		await queue.put(_payload("ack-2"), PRIORITY_ACK)
+		await queue.put(_payload("request-2"), PRIORITY_REQUEST)
+		sent = [(await queue.get()).metadata.type for _ in range(5)]
+		self.assertEqual(sent, ["setup", "ack-1", "ack-2", "request-1", "request-2"])
+		snapshot = queue.snapshot()
+		self.assertEqual(snapshot["sent"], 5)
+		self.assertEqual(snapshot["max_depth"], 5)
+		self.assertEqual(snapshot["depth"], 0)
+
+	async def test_full_queue_fails_after_timeout(self):
+		queue = BiStreamSendQueue(max_size=2, put_timeout_ms=50)
+		await queue.put(_payload("ack-1"), PRIORITY_ACK)
+		await queue.put(_payload("ack-2"), PRIORITY_ACK)
+		with self.assertRaises(NacosException) as ctx:
+			await queue.put(_payload("ack-3"), PRIORITY_ACK)
+		self.assertEqual(ctx.exception.error_code, CLIENT_OVER_THRESHOLD)
+		self.assertEqual(queue.qsize(), 2)
+
+	async def test_closed_queue_drops_and_rejects(self):
+		queue = BiStreamSendQueue(max_size=2)
+		await queue.put(_payload("ack-1"), PRIORITY_ACK)
+		queue.close()
+		self.assertEqual(queue.qsize(), 0)
+		with self.assertRaises(NacosException) as ctx:
+			await queue.put(_payload("ack-2"), PRIORITY_ACK)
+		self.assertEqual(ctx.exception.error_code, CLIENT_DISCONNECT)
+
+	async def test_close_wakes_waiting_readers(self):
+		queue = BiStreamSendQueue(max_size=2)
+		readers = [asyncio.create_task(queue.get()) for _ in range(2)]
+		await asyncio.sleep(0.01)
+		queue.close()
+		for reader in readers:
+			with self.assertRaises(NacosException):
+				await asyncio.wait_for(reader, 1)
+		with self.assertRaises(NacosException):
+			await queue.get()
+		self.assertEqual(queue.snapshot()["depth"], 0)
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,77 @@
+import asyncio
+import unittest
+
+from v2.nacos.common.client_config import GRPCConfig
+from v2.nacos.naming.model.instance import Instance
+from v2.nacos.naming.model.naming_request import InstanceRequest
+from v2.nacos.testing import FakeServerTestCase, query_request
+from v2.nacos.transport.model.internal_request import ConnectResetRequest
+
+
+class TestChannelPool(FakeServerTestCase):
+	"""Tests for the pooled connections of GrpcClient against a local fake server."""
+
+	async def asyncSetUp(self):
+		self.server = await self.start_server(latency_ms=20, max_concurrent_streams=2)
+		self.client = await self.create_client(
+			"pool-test", self.client_config(self.server.port, grpc_config=GRPCConfig(channel_pool_size=3)))
+		await self._wait_pool_filled()
+
+	async def _wait_pool_filled(self):
+		for _ in range(100):
+			if len(self.client.pool_connections) == 2:
+				return
+			await asyncio.sleep(0.02)
+		self.fail("pool is not filled")
+
+	async def test_pool_connections_are_distinct(self):
+		ids = {self.client.current_connection.get_connection_id()}
+		ids.update(conn.get_connection_id() for conn in self.client.pool_connections)
+		self.assertEqual(len(ids), 3)
+		for conn in self.client.pool_connections:
+			self.assertIsNotNone(conn.setup_ack_request_handler)
+
+	async def test_read_only_requests_spread_over_pool(self):
+		responses = await asyncio.gather(*[self.client.request(query_request()) for _ in range(12)])
+		self.assertTrue(all(response.is_success() for response in responses))
+		self.assertEqual(len(self.server.peers), 3)
+
+	def test_write_requests_stay_on_current_connection(self):
+		for conn in self.client.pool_connections:
+			conn.in_flight = -1
+		try:
+			register = InstanceRequest(namespace="public", serviceName="svc", groupName="DEFAULT_GROUP",
+									   instance=Instance(ip="1.1.1.1", port=80), type="registerInstance")
+			self.assertIs(self.client._select_connection(register), self.client.current_connection)
+			self.assertIsNot(self.client._select_connection(query_request()), self.client.current_connection)
+		finally:
+			for conn in self.client.pool_connections:
+				conn.in_flight = 0
+
+	async def test_broken_pool_connection_is_replaced(self):
+		broken = self.client.pool_connections[0]
+		await broken.channel.close()
+		await self.client._health_check_pool()
+		self.assertNotIn(broken, self.client.pool_connections)
+		self.assertTrue(broken.is_abandon())
+		await self._wait_pool_filled()
+		self.assertTrue(self.client.is_running())
+
+	async def test_reset_of_pool_connection_keeps_current(self):
+		current = self.client.current_connection
+		reset = self.client.pool_connections[0]
+		self.assertEqual(self.server.push(ConnectResetRequest(), [reset.get_connection_id()]), 1)
+		for _ in range(100):
+			if reset.is_abandon():
+				break
+			await asyncio.sleep(0.02)
+		self.assertTrue(reset.is_abandon())
+		self.assertIs(self.client.current_connection, current)
+		self.assertFalse(current.is_abandon())
+		await self._wait_pool_filled()
+		self.assertNotIn(reset, self.client.pool_connections)
+		self.assertTrue(self.client.is_running())
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,89 @@
+import asyncio
+import logging
+import unittest
+
+from v2.nacos.common.client_config import ClientConfig, GRPCConfig
+from v2.nacos.common.nacos_exception import NacosException
+from v2.nacos.transport.circuit_breaker import CircuitBreaker, CircuitState, DecorrelatedJitterBackoff
+from v2.nacos.transport.http_agent import HttpAgent
+from v2.nacos.transport.nacos_server_connector import NacosServerConnector
+
+
+class TestCircuitBreaker(unittest.TestCase):
+
+	def test_opens_after_consecutive_failures(self):
+		breaker = CircuitBreaker(failure_threshold=3, open_base_ms=1000, open_max_ms=1000)
+		breaker.on_failure(now=0)
+		breaker.on_success()
+		breaker.on_failure(now=0)
+		breaker.on_failure(now=0)
+		self.assertEqual(breaker.state, CircuitState.CLOSED)
+		breaker.on_failure(now=0)
+		self.assertEqual(breaker.state, CircuitState.OPEN)
+		self.assertFalse(breaker.is_available(now=0.5))
+		self.assertTrue(breaker.is_available(now=1.0))
+
+	def test_half_open_trial(self):
+		breaker = CircuitBreaker(failure_threshold=1, open_base_ms=1000, open_max_ms=1000)
+		breaker.on_failure(now=0)
+		breaker.on_attempt(now=2)
+		self.assertEqual(breaker.state, CircuitState.HALF_OPEN)
+		# one trial at a time
+		self.assertFalse(breaker.is_available(now=2))
+		breaker.on_failure(now=2)
+		self.assertEqual(breaker.state, CircuitState.OPEN)
+		breaker.on_attempt(now=4)
+		breaker.on_success()
+		self.assertEqual(breaker.state, CircuitState.CLOSED)
+		self.assertEqual(breaker.snapshot()["consecutive_failures"], 0)
+
+	def test_decorrelated_jitter_stays_in_bounds(self):
+		backoff = DecorrelatedJitterBackoff(base_ms=100, cap_ms=5000)
+		previous = 100
+		for _ in range(200):
+			delay = backoff.next_delay_ms()
+			self.assertGreaterEqual(delay, 100)
+			self.assertLessEqual(delay, min(5000, previous * 3))
+			previous = delay
+		backoff.reset()
+		self.assertLessEqual(backoff.next_delay_ms(), 300)
+
+
+class TestConnectorCircuit(unittest.IsolatedAsyncioTestCase):
+
+	async def test_open_servers_are_skipped(self):
+		logger = logging.getLogger("test")
+		client_config = ClientConfig(server_addresses="10.0.0.1:8848,10.0.0.2:8848")
+		client_config.set_grpc_config(GRPCConfig(circuit_breaker_enabled=True, circuit_failure_threshold=1))
+		connector = NacosServerConnector(logger, client_config, HttpAgent(logger, None, 3))
+		connector.record_server_result("10.0.0.1", 8848, None, False)
+		self.assertEqual({connector.get_next_server() for _ in range(5)}, {"10.0.0.2:8848"})
+		self.assertEqual(connector.get_circuit_breaker_states()["10.0.0.1:8848"]["state"], "open")
+
+		connector.record_server_result("10.0.0.2", 8848, None, False)
+		with self.assertRaises(NacosException):
+			connector.get_next_server()
+
+	async def test_picking_a_server_does_not_use_up_the_trial(self):
+		logger = logging.getLogger("test")
+		client_config = ClientConfig(server_addresses="10.0.0.1:8848,10.0.0.2:8848")
+		client_config.set_grpc_config(GRPCConfig(circuit_breaker_enabled=True, circuit_failure_threshold=1,
+												 circuit_open_base_ms=1, circuit_open_max_ms=1))
+		connector = NacosServerConnector(logger, client_config, HttpAgent(logger, None, 3))
+		connector.record_server_result("10.0.0.1", 8848, None, False)
+		await asyncio.sleep(0.01)
+		# picks that are never connected to, like the losers of a race, leave the trial to a real attempt
+		picked = {connector.get_next_server() for _ in range(10)}
+		self.assertEqual(picked, {"10.0.0.1:8848", "10.0.0.2:8848"})
+		breaker = connector.circuit_breakers["10.0.0.1:8848"]
+		self.assertEqual(breaker.state, CircuitState.OPEN)
+
+		connector.record_server_attempt("10.0.0.1", 8848)
+		self.assertEqual(breaker.state, CircuitState.HALF_OPEN)
+		self.assertFalse(breaker.is_available())
+		connector.record_server_attempt("10.0.0.1", 8848, cancelled=True)
+		self.assertTrue(breaker.is_available())
+
+
+if __name__ == '__main__':
+	unittest.main()
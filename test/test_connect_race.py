@@ -0,0 +1,50 @@
+import logging
+import time
+import unittest
+from unittest import mock
+
+from v2.nacos.common.client_config import GRPCConfig
+from v2.nacos.testing import FakeServerTestCase, unused_port
+from v2.nacos.transport.model.server_info import ServerInfo
+from v2.nacos.transport.rpc_client import ReconnectContext
+
+
+class TestConnectRace(FakeServerTestCase):
+	"""Tests for racing connection attempts to several servers."""
+
+	async def asyncSetUp(self):
+		self.live_port = (await self.start_server()).port
+		self.dead_port = unused_port()
+		grpc_config = GRPCConfig(grpc_timeout=2000, connect_race_size=2, connect_race_stagger_ms=100)
+		self.client = await self.create_client(
+			"race-test", self.client_config(self.dead_port, self.live_port, grpc_config=grpc_config), start=False)
+
+	async def test_dead_server_does_not_delay_connect(self):
+		begin = time.perf_counter()
+		connection = await self.client._race_connect(ServerInfo("127.0.0.1", self.dead_port))
+		self.assertLess(time.perf_counter() - begin, 1)
+		self.assertIsNotNone(connection)
+		self.assertEqual(connection.get_server_info().server_port, self.live_port)
+		await connection.close()
+
+	async def test_start_reports_time_to_connect(self):
+		await self.client.start()
+		self.assertTrue(self.client.is_running())
+		self.assertEqual(self.client.current_connection.get_server_info().server_port, self.live_port)
+		self.assertLess(self.client.connect_time_ms, 1000)
+
+	async def test_reconnect_follows_the_server_that_won(self):
+		hedge = mock.Mock(server_info=ServerInfo("127.0.0.1", self.live_port), close=mock.AsyncMock())
+		hedge.is_abandon.return_value = False
+		self.client.hedge_connection = hedge
+		with self.assertLogs(self.logger, logging.INFO) as logs:
+			await self.client.reconnect(ReconnectContext(ServerInfo("127.0.0.1", self.dead_port), False))
+		self.assertEqual(self.client.current_connection.get_server_info().server_port, self.live_port)
+		self.assertIn(f"success to connect a server:127.0.0.1:{self.live_port}", "\n".join(logs.output))
+		# the standby to the server that won is not kept as a standby to the current server
+		self.assertIsNone(self.client.hedge_connection)
+		hedge.close.assert_awaited()
+
+
+if __name__ == '__main__':
+	unittest.main()
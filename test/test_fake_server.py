@@ -0,0 +1,168 @@
+import asyncio
+import logging
+import tempfile
+import unittest
+
+import grpc
+
+from v2.nacos.ai.model.ai_param import GetMcpServerParam
+from v2.nacos.ai.model.mcp.mcp import McpServerDetailInfo
+from v2.nacos.ai.nacos_ai_service import NacosAIService
+from v2.nacos.common.client_config import ClientConfig
+from v2.nacos.common.nacos_exception import NacosException
+from v2.nacos.config.model.config_param import ConfigParam
+from v2.nacos.config.nacos_config_service import NacosConfigService
+from v2.nacos.naming.model.instance import Instance
+from v2.nacos.naming.model.naming_param import RegisterInstanceParam, SubscribeServiceParam, ListInstanceParam
+from v2.nacos.naming.model.naming_request import ServiceQueryRequest, NotifySubscriberRequest
+from v2.nacos.naming.model.service import Service
+from v2.nacos.naming.nacos_naming_service import NacosNamingService
+from v2.nacos.testing import FakeNacosServer, create_grpc_client
+from v2.nacos.transport.rpc_client import RpcClient
+
+
+async def _eventually(condition, timeout=5):
+	for _ in range(int(timeout / 0.02)):
+		if condition():
+			return
+		await asyncio.sleep(0.02)
+	raise AssertionError("condition not met in time")
+
+
+class TestFakeServer(unittest.IsolatedAsyncioTestCase):
+	"""Tests for the in-process fake Nacos server against the real clients."""
+
+	async def asyncSetUp(self):
+		self.server = FakeNacosServer()
+		port = await self.server.start()
+		self.dir = tempfile.TemporaryDirectory()
+		self.client_config = ClientConfig(server_addresses=f"127.0.0.1:{port - 1000}", log_dir=self.dir.name)
+		self.client_config.set_cache_dir(self.dir.name)
+		self.services = []
+
+	async def asyncTearDown(self):
+		for service in self.services:
+			await service.shutdown()
+		await self.server.stop()
+		self.dir.cleanup()
+
+	async def _config_service(self):
+		service = await NacosConfigService.create_config_service(self.client_config)
+		self.services.append(service)
+		return service
+
+	async def _naming_service(self):
+		service = await NacosNamingService.create_naming_service(self.client_config)
+		self.services.append(service)
+		return service
+
+	async def _grpc_client(self):
+		logger = logging.getLogger("test")
+		client = create_grpc_client(logger, "fake-server-test", self.client_config)
+		await client.start()
+		self.services.append(client)
+		return client
+
+	async def test_config_publish_and_listen(self):
+		config = await self._config_service()
+		self.assertEqual(await config.get_config(ConfigParam(data_id="app", group="DEFAULT_GROUP")), "")
+
+		changes = []
+
+		async def listener(tenant, group, data_id, content):
+			changes.append(content)
+
+		await config.add_listener("app", "DEFAULT_GROUP", listener)
+		# run the listen task now instead of at its next interval
+		await config.grpc_client_proxy.execute_config_listen_channel.put(None)
+		await _eventually(lambda: self.server.config_listeners.get(("", "DEFAULT_GROUP", "app")))
+		self.assertTrue(await config.publish_config(ConfigParam(data_id="app", group="DEFAULT_GROUP", content="v1")))
+		self.assertEqual(await config.get_config(ConfigParam(data_id="app", group="DEFAULT_GROUP")), "v1")
+		await _eventually(lambda: changes == ["v1"])
+
+		# a change made on the server side is pushed as well
+		self.server.publish_config("app", "DEFAULT_GROUP", "v2")
+		await _eventually(lambda: changes == ["v1", "v2"])
+
+	async def test_register_and_subscribe(self):
+		naming = await self._naming_service()
+		pushed = []
+
+		async def on_change(instances):
+			pushed.append(sorted(instance.port for instance in instances))
+
+		await naming.subscribe(SubscribeServiceParam(service_name="svc", subscribe_callback=on_change))
+		await naming.register_instance(RegisterInstanceParam(service_name="svc", ip="10.0.0.1", port=80))
+		self.server.register_instance("svc", Instance(ip="10.0.0.2", port=81))
+		await _eventually(lambda: pushed and pushed[-1] == [80, 81])
+		instances = await naming.list_instances(ListInstanceParam(service_name="svc", subscribe=False,
+																  healthy_only=None))
+		self.assertEqual(sorted(instance.port for instance in instances), [80, 81])
+
+	async def test_ephemeral_instances_go_with_their_connection(self):
+		naming = await self._naming_service()
+		await naming.register_instance(RegisterInstanceParam(service_name="svc", ip="10.0.0.1", port=80))
+		self.assertEqual(len(self.server.services[("public", "DEFAULT_GROUP", "svc")]), 1)
+		await naming.shutdown()
+		self.services.remove(naming)
+		await _eventually(lambda: not self.server.services[("public", "DEFAULT_GROUP", "svc")])
+
+	async def test_ability_negotiation_and_ai_query(self):
+		self.server.put_mcp_server(McpServerDetailInfo(name="weather", version="1.0.0", protocol="mcp-sse"))
+		self.server.put_mcp_server(McpServerDetailInfo(name="weather", version="1.1.0", protocol="mcp-sse"))
+		ai = await NacosAIService.create_ai_service(self.client_config)
+		self.services.append(ai)
+		latest = await ai.get_mcp_server(GetMcpServerParam(mcp_name="weather"))
+		self.assertEqual(latest.version, "1.1.0")
+		pinned = await ai.get_mcp_server(GetMcpServerParam(mcp_name="weather", version="1.0.0"))
+		self.assertEqual(pinned.version, "1.0.0")
+
+	async def test_injected_errors(self):
+		client = await self._grpc_client()
+		request = ServiceQueryRequest(namespace="public", serviceName="svc", groupName="DEFAULT_GROUP",
+									  cluster="", healthOnly=False)
+		fault = self.server.inject_error("ServiceQueryRequest", error_code=503)
+		with self.assertRaises(NacosException):
+			await client.request(request, 1000)
+		self.assertEqual(self.server.requests_by_type["ServiceQueryRequest"], RpcClient.RETRY_TIMES)
+		self.server.clear_faults()
+		self.assertTrue((await client.request(request, 3000)).is_success())
+
+		broken = self.server.inject_error(status=grpc.StatusCode.UNAVAILABLE, times=1)
+		with self.assertRaises(grpc.RpcError):
+			await client.request(request, 3000)
+		self.assertEqual(broken.times, 0)
+		self.assertTrue((await client.request(request, 3000)).is_success())
+		self.assertIsNone(fault.times)
+
+	async def test_reset_moves_client_to_new_connection(self):
+		client = await self._grpc_client()
+		await self.server.wait_for_connections(1)
+		first = client.current_connection.get_connection_id()
+		self.assertEqual(self.server.reset_connections("127.0.0.1", self.server.port - 1000), 1)
+		await _eventually(lambda: client.current_connection is not None
+						  and client.current_connection.get_connection_id() != first and client.is_running())
+		self.assertEqual(self.server.connection_count, 2)
+
+	async def test_dropped_connection_is_reconnected(self):
+		client = await self._grpc_client()
+		await self.server.wait_for_connections(1)
+		first = client.current_connection.get_connection_id()
+		self.assertEqual(self.server.drop_connections(), 1)
+		await _eventually(lambda: client.current_connection is not None
+						  and client.current_connection.get_connection_id() != first and client.is_running())
+
+	async def test_push_flood(self):
+		naming = await self._naming_service()
+		await naming.subscribe(SubscribeServiceParam(service_name="svc"))
+		await self.server.wait_for_connections(1)
+		connection = next(iter(self.server.connections.values()))
+		acks_before = connection.ack_count
+		push = NotifySubscriberRequest(namespace="public", groupName="DEFAULT_GROUP", serviceName="svc",
+									   serviceInfo=Service(name="svc", groupName="DEFAULT_GROUP"))
+		self.assertEqual(self.server.push_flood(push, 200), 200)
+		await _eventually(lambda: connection.ack_count - acks_before == 200)
+
+
+if __name__ == '__main__':
+	unittest.main()
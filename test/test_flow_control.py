@@ -0,0 +1,99 @@
+import asyncio
+import time
+import unittest
+from unittest import mock
+
+from v2.nacos.common.nacos_exception import NacosException, CLIENT_OVER_THRESHOLD, INVALID_PARAM
+from v2.nacos.testing import FakeServerTestCase, query_request
+from v2.nacos.transport.flow_control import FlowController, SlidingWindow
+
+
+class TestFlowControl(unittest.IsolatedAsyncioTestCase):
+	"""Tests for the per request type sliding window limit of FlowController."""
+
+	def test_sliding_window(self):
+		window = SlidingWindow(3, slot_count=10, interval_ms=1000)
+		self.assertEqual(window.try_acquire(0), 0)
+		self.assertEqual(window.try_acquire(150), 0)
+		self.assertEqual(window.try_acquire(250), 0)
+		# the oldest request leaves the window when its slot expires at 1000
+		self.assertEqual(window.try_acquire(400), 600)
+		self.assertEqual(window.try_acquire(1000), 0)
+		self.assertEqual(window.try_acquire(1050), 50)
+
+	async def test_reject_over_threshold(self):
+		controller = FlowController(threshold=2, wait_ms=0)
+		await controller.acquire("naming", "InstanceRequest", 3000)
+		await controller.acquire("naming", "InstanceRequest", 3000)
+		with self.assertRaises(NacosException) as context:
+			await controller.acquire("naming", "InstanceRequest", 3000)
+		self.assertEqual(context.exception.error_code, CLIENT_OVER_THRESHOLD)
+		# other request types have windows of their own
+		await controller.acquire("naming", "ServiceQueryRequest", 3000)
+		self.assertEqual(controller.snapshot()["rejected"], {"InstanceRequest": 1})
+
+	async def test_wait_for_window(self):
+		controller = FlowController(threshold=5, wait_ms=2000)
+		begin = time.perf_counter()
+		for _ in range(8):
+			await controller.acquire("config", "ConfigPublishRequest", 3000)
+		self.assertGreater(time.perf_counter() - begin, 0.5)
+		snapshot = controller.snapshot()
+		self.assertEqual(snapshot["passed"], {"ConfigPublishRequest": 8})
+		# the first five share a slot, once it expires the sixth and the rest pass without waiting
+		self.assertEqual(snapshot["delayed"], {"ConfigPublishRequest": 1})
+
+	async def test_rules(self):
+		controller = FlowController(threshold=1, wait_ms=0,
+									rules={"config": 3, "ConfigRemoveRequest": 2})
+		for _ in range(3):
+			await controller.acquire("config", "ConfigPublishRequest", 3000)
+		for _ in range(2):
+			await controller.acquire("config", "ConfigRemoveRequest", 3000)
+		with self.assertRaises(NacosException):
+			await controller.acquire("config", "ConfigRemoveRequest", 3000)
+		await controller.acquire("naming", "InstanceRequest", 3000)
+		with self.assertRaises(NacosException):
+			await controller.acquire("naming", "InstanceRequest", 3000)
+
+	def test_thresholds_must_be_positive(self):
+		for threshold, rules in [(0, None), (5, {"InstanceRequest": 0}), (5, {"config": -1})]:
+			with self.assertRaises(NacosException) as context:
+				FlowController(threshold=threshold, rules=rules)
+			self.assertEqual(context.exception.error_code, INVALID_PARAM)
+
+
+class TestFlowControlledRequest(FakeServerTestCase):
+	"""Tests for the timeout of requests that waited in flow control."""
+
+	async def asyncSetUp(self):
+		client_config = self.client_config((await self.start_server()).port)
+		client_config.set_flow_control_enabled(True)
+		self.client = await self.create_client("flow-test", client_config)
+
+	async def test_flow_control_wait_counts_against_the_timeout(self):
+		async def slow_acquire(module, request_type, timeout_ms):
+			await asyncio.sleep(0.3)
+
+		timeouts = []
+		timed_request = self.client._timed_request
+
+		async def record_timeout(connection, request, timeout_millis):
+			timeouts.append(timeout_millis)
+			return await timed_request(connection, request, timeout_millis)
+
+		with mock.patch.object(self.client.flow_controller, "acquire", slow_acquire), \
+				mock.patch.object(self.client, "_timed_request", record_timeout):
+			self.assertTrue((await self.client.request(query_request(), 1000)).is_success())
+			self.assertLessEqual(timeouts[0], 720)
+
+			# nothing is left for the request, it fails without blaming the server
+			with self.assertRaises(NacosException) as context:
+				await self.client.request(query_request(), 200)
+		self.assertEqual(context.exception.error_code, CLIENT_OVER_THRESHOLD)
+		self.assertEqual(len(timeouts), 1)
+		self.assertTrue(self.client.is_running())
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,55 @@
+import json
+import unittest
+
+from v2.nacos.common.nacos_exception import NacosException
+from v2.nacos.naming.model.instance import Instance
+from v2.nacos.naming.model.naming_request import InstanceRequest, NotifySubscriberRequest
+from v2.nacos.naming.model.service import Service
+from v2.nacos.transport.grpc_codec import create_payload_codec, CODEC_JSON, CODEC_PYDANTIC, CODEC_ORJSON
+from v2.nacos.transport.grpc_util import GrpcUtils
+
+
+def _service(host_count):
+	hosts = [Instance(ip=f"10.0.{i // 256}.{i % 256}", port=8080, clusterName="DEFAULT",
+					  metadata={"zone": "a"}) for i in range(host_count)]
+	return Service(name="svc", groupName="DEFAULT_GROUP", hosts=hosts, lastRefTime=1)
+
+
+class TestPayloadCodec(unittest.TestCase):
+	"""Every codec must produce the same JSON document and parse it back to the same model."""
+
+	CODECS = [CODEC_JSON, CODEC_PYDANTIC, CODEC_ORJSON]
+
+	def test_request_body_is_identical_across_codecs(self):
+		request = InstanceRequest(namespace="public", serviceName="svc", groupName="DEFAULT_GROUP",
+								  instance=Instance(ip="1.1.1.1", port=80), type="registerInstance")
+		request.put_header("k", "v")
+		expected = json.loads(GrpcUtils.convert_request_to_payload(request).body.value)
+		for name in self.CODECS:
+			payload = GrpcUtils.convert_request_to_payload(request, create_payload_codec(name))
+			self.assertEqual(json.loads(payload.body.value), expected, name)
+			self.assertEqual(payload.metadata.type, "InstanceRequest")
+			self.assertEqual(payload.metadata.headers["k"], "v")
+
+	def test_parse_round_trip(self):
+		push = NotifySubscriberRequest(serviceInfo=_service(100), requestId="42")
+		for name in self.CODECS:
+			codec = create_payload_codec(name)
+			parsed = GrpcUtils.parse(GrpcUtils.convert_request_to_payload(push, codec), codec)
+			self.assertIsInstance(parsed, NotifySubscriberRequest)
+			self.assertEqual(parsed.requestId, "42")
+			self.assertEqual(parsed.serviceInfo, push.serviceInfo, name)
+
+	def test_metadata_template_does_not_leak_headers(self):
+		first = GrpcUtils.build_metadata("InstanceRequest", {"a": "1"})
+		second = GrpcUtils.build_metadata("InstanceRequest")
+		self.assertEqual(dict(first.headers), {"a": "1"})
+		self.assertEqual(dict(second.headers), {})
+
+	def test_unknown_codec(self):
+		with self.assertRaises(NacosException):
+			create_payload_codec("xml")
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,63 @@
+import asyncio
+import json
+import unittest
+
+from v2.nacos.common.nacos_exception import NacosException
+from v2.nacos.naming.model.naming_response import QueryServiceResponse
+from v2.nacos.testing import query_request
+from v2.nacos.transport.grpc_connection import GrpcConnection
+from v2.nacos.transport.grpcauto.nacos_grpc_service_pb2 import Payload
+from v2.nacos.transport.model.server_info import ServerInfo
+
+
+class TestBiStreamRequest(unittest.IsolatedAsyncioTestCase):
+	"""Tests for requests multiplexed over the bi stream of a GrpcConnection."""
+
+	def setUp(self):
+		self.connection = GrpcConnection(ServerInfo("127.0.0.1", 9848), "conn-1", None, None, None,
+										 bi_stream_request_enabled=True)
+		self.connection.mark_bi_stream_active(True)
+
+	async def test_response_is_matched_by_request_id(self):
+		request = query_request()
+		first = asyncio.create_task(self.connection.request(request, 1000))
+		second = asyncio.create_task(self.connection.request(query_request(), 1000))
+		sent = [json.loads((await self.connection.queue.get()).body.value)["requestId"] for _ in range(2)]
+		self.assertNotEqual(sent[0], sent[1])
+		# the id goes to the copy that is sent, the caller's request is left as it was
+		self.assertEqual(request.requestId, "")
+		self.assertEqual(len(self.connection.pending_requests), 2)
+
+		# answer out of order
+		self.assertTrue(self.connection.complete_request(QueryServiceResponse(requestId=sent[1], message="2")))
+		self.assertTrue(self.connection.complete_request(QueryServiceResponse(requestId=sent[0], message="1")))
+		self.assertEqual((await first).message, "1")
+		self.assertEqual((await second).message, "2")
+		self.assertEqual(self.connection.pending_requests, {})
+
+	async def test_request_deadline(self):
+		with self.assertRaises(NacosException):
+			await self.connection.request(query_request(), 50)
+		self.assertEqual(self.connection.pending_requests, {})
+
+	async def test_stream_close_fails_in_flight_requests(self):
+		task = asyncio.create_task(self.connection.request(query_request(), 1000))
+		await self.connection.queue.get()
+		self.connection.mark_bi_stream_active(False)
+		with self.assertRaises(NacosException):
+			await task
+		self.assertFalse(self.connection.complete_request(QueryServiceResponse(requestId="unknown")))
+
+	async def test_request_iterator_ends_when_stream_closes(self):
+		await self.connection.send_bi_request(Payload())
+		payloads = self.connection.request_payloads()
+		await anext(payloads)
+		waiting = asyncio.create_task(anext(payloads))
+		await asyncio.sleep(0.01)
+		self.connection.mark_bi_stream_active(False)
+		with self.assertRaises(StopAsyncIteration):
+			await asyncio.wait_for(waiting, 1)
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,93 @@
+import asyncio
+import time
+import unittest
+from unittest import mock
+
+from v2.nacos.common.client_config import GRPCConfig
+from v2.nacos.naming.model.instance import Instance
+from v2.nacos.naming.model.naming_request import InstanceRequest
+from v2.nacos.testing import FakeServerTestCase, query_request
+from v2.nacos.transport.hedging import HedgePolicy
+
+
+class TestHedgePolicy(unittest.TestCase):
+	"""Tests for the hedge delay and budget."""
+
+	def test_delay_follows_percentile(self):
+		policy = HedgePolicy(percentile=90, min_delay_ms=1, budget_percent=10)
+		for i in range(HedgePolicy.MIN_SAMPLES - 1):
+			policy.record_latency(i % 100)
+		self.assertIsNone(policy.delay_ms())
+		for i in range(HedgePolicy.MIN_SAMPLES - 1, HedgePolicy.MIN_SAMPLES + HedgePolicy.RECOMPUTE_EVERY * 20):
+			policy.record_latency(i % 100)
+		self.assertAlmostEqual(policy.delay_ms(), 90, delta=2)
+
+	def test_min_delay(self):
+		policy = HedgePolicy(percentile=90, min_delay_ms=50, budget_percent=10)
+		for _ in range(HedgePolicy.MIN_SAMPLES):
+			policy.record_latency(1)
+		self.assertEqual(policy.delay_ms(), 50)
+
+	def test_budget(self):
+		policy = HedgePolicy(budget_percent=10)
+		granted = 0
+		for _ in range(100):
+			policy.on_read()
+			granted += policy.try_acquire()
+		self.assertEqual(granted, 10)
+		self.assertFalse(policy.try_acquire())
+
+
+class TestHedgedRequest(FakeServerTestCase):
+	"""Tests for hedged reads of GrpcClient against two local fake servers."""
+
+	async def asyncSetUp(self):
+		self.servers = [await self.start_server(latency_ms=2), await self.start_server(latency_ms=2)]
+		grpc_config = GRPCConfig(hedge_enabled=True, hedge_min_delay_ms=20, hedge_budget_percent=50)
+		self.client = await self.create_client(
+			"hedge-test", self.client_config(*[server.port for server in self.servers], grpc_config=grpc_config))
+		for _ in range(100):
+			if self.client.hedge_connection is not None:
+				break
+			await asyncio.sleep(0.02)
+		self.assertIsNotNone(self.client.hedge_connection)
+		for _ in range(HedgePolicy.MIN_SAMPLES + 2):
+			await self.client.request(query_request())
+		port = self.client.current_connection.get_server_info().server_port
+		self.current_server = next(server for server in self.servers if server.port == port)
+		self.standby_server = next(server for server in self.servers if server.port != port)
+
+	async def test_slow_read_is_answered_by_standby_server(self):
+		self.current_server.latency_ms = 1000
+		sent = []
+		timed_request = self.client._timed_request
+
+		async def record_attempt(connection, request, timeout_millis):
+			sent.append(request)
+			return await timed_request(connection, request, timeout_millis)
+
+		begin = time.perf_counter()
+		query = query_request()
+		with mock.patch.object(self.client, "_timed_request", record_attempt):
+			response = await self.client.request(query)
+		self.assertTrue(response.is_success())
+		# the attempts run at the same time, each on its own copy
+		self.assertEqual(len({id(request) for request in sent + [query]}), 3)
+		self.assertLess(time.perf_counter() - begin, 0.5)
+		self.assertEqual(self.client.hedge_policy.hedges_won, 1)
+		self.assertEqual(self.client.current_connection.in_flight, 0)
+
+	async def test_writes_are_not_hedged(self):
+		requests_before = self.standby_server.request_count
+		register = InstanceRequest(namespace="public", serviceName="svc", groupName="DEFAULT_GROUP",
+								   instance=Instance(ip="1.1.1.1", port=80), type="registerInstance")
+		# slower than the hedge delay, a read would be hedged
+		self.current_server.set_latency(100, "InstanceRequest")
+		response = await self.client.request(register, 1000)
+		self.assertTrue(response.is_success())
+		self.assertEqual(self.standby_server.request_count, requests_before)
+		self.assertEqual(self.client.hedge_policy.hedges_sent, 0)
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,109 @@
+import asyncio
+import gc
+import logging
+import unittest
+from unittest import mock
+
+from aiohttp import web
+
+from v2.nacos.transport.http_agent import HttpAgent
+
+
+class TestHttpAgent(unittest.IsolatedAsyncioTestCase):
+	"""Tests for the pooled session of HttpAgent against a local aiohttp server."""
+
+	async def asyncSetUp(self):
+		self.peers = set()
+
+		async def handle(request):
+			self.peers.add(request.transport.get_extra_info("peername"))
+			return web.Response(text="ok")
+
+		async def missing(request):
+			return web.Response(status=404)
+
+		app = web.Application()
+		app.router.add_get("/ok", handle)
+		app.router.add_get("/missing", missing)
+		self.runner = web.AppRunner(app)
+		await self.runner.setup()
+		site = web.TCPSite(self.runner, "127.0.0.1", 0)
+		await site.start()
+		port = site._server.sockets[0].getsockname()[1]
+		self.base_url = f"http://127.0.0.1:{port}"
+		self.agent = HttpAgent(logging.getLogger("test"), None, 5)
+
+	async def asyncTearDown(self):
+		await self.agent.close()
+		await self.runner.cleanup()
+
+	async def test_requests_reuse_pooled_connection(self):
+		for _ in range(5):
+			body, err = await self.agent.request(self.base_url + "/ok", "GET")
+			self.assertIsNone(err)
+			self.assertEqual(body, b"ok")
+		self.assertEqual(len(self.peers), 1)
+
+	async def test_non_ok_status_returns_error(self):
+		body, err = await self.agent.request(self.base_url + "/missing", "GET")
+		self.assertIsNone(body)
+		self.assertIn("404", err)
+
+	async def test_close_releases_session(self):
+		await self.agent.request(self.base_url + "/ok", "GET")
+		session = self.agent._session
+		await self.agent.close()
+		self.assertTrue(session.closed)
+		body, err = await self.agent.request(self.base_url + "/ok", "GET")
+		self.assertEqual(body, b"ok")
+		self.assertIsNot(self.agent._session, session)
+
+	async def test_reuse_from_another_loop(self):
+		async def contended_request():
+			# a request waiting for the session lock binds the lock to the running loop
+			async with self.agent._lock_for(asyncio.get_running_loop()):
+				request = asyncio.create_task(self.agent.request(self.base_url + "/ok", "GET"))
+				await asyncio.sleep(0.01)
+			body, _ = await request
+			return body
+
+		async def on_other_loop():
+			try:
+				return await contended_request()
+			finally:
+				await self.agent.close()
+
+		with mock.patch("sys.unraisablehook") as unraisable_hook:
+			self.assertEqual(await contended_request(), b"ok")
+			first_session = self.agent._session
+			self.assertEqual(await asyncio.to_thread(asyncio.run, on_other_loop()), b"ok")
+			# the session left behind is closed on the loop it belongs to
+			for _ in range(50):
+				if first_session.closed:
+					break
+				await asyncio.sleep(0.01)
+			self.assertTrue(first_session.closed)
+			self.assertEqual(await contended_request(), b"ok")
+			del first_session
+			gc.collect()
+		unraisable_hook.assert_not_called()
+
+	async def test_session_of_a_closed_loop_is_discarded(self):
+		async def on_other_loop():
+			# the host ends its loop without closing the agent
+			body, _ = await self.agent.request(self.base_url + "/ok", "GET")
+			return body, self.agent._session.connector
+
+		with mock.patch("sys.unraisablehook") as unraisable_hook:
+			body, connector = await asyncio.to_thread(asyncio.run, on_other_loop())
+			self.assertEqual(body, b"ok")
+			body, _ = await self.agent.request(self.base_url + "/ok", "GET")
+			self.assertEqual(body, b"ok")
+			self.assertTrue(connector.closed)
+			del connector
+			gc.collect()
+		unraisable_hook.assert_not_called()
+
+
+if __name__ == '__main__':
+	unittest.main()
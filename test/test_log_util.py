@@ -0,0 +1,68 @@
+import logging
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from v2.nacos.common.client_config import ClientConfig
+from v2.nacos.nacos_client import NacosClient
+from v2.nacos.utils.log_util import LogRateLimiter, get_queue_handler
+
+
+class TestLogUtil(unittest.IsolatedAsyncioTestCase):
+	"""Tests for the shared background file handler and the log rate limiter."""
+
+	def setUp(self):
+		self.log_dir = tempfile.TemporaryDirectory()
+		self.clients = []
+
+	async def asyncTearDown(self):
+		for client in self.clients:
+			await client.http_agent.close()
+		logger = logging.getLogger("test-log-util")
+		for handler in list(logger.handlers):
+			logger.removeHandler(handler)
+		self.log_dir.cleanup()
+
+	def _client(self):
+		client_config = ClientConfig(server_addresses="127.0.0.1:8848", log_dir=self.log_dir.name)
+		client_config.set_cache_dir(os.path.join(self.log_dir.name, "cache"))
+		client = NacosClient(client_config, "test-log-util")
+		self.clients.append(client)
+		return client
+
+	async def test_clients_share_one_handler(self):
+		first, second = self._client(), self._client()
+		self.assertIs(first.logger, second.logger)
+		self.assertEqual(len(first.logger.handlers), 1)
+
+		first.logger.info("written from %s", "a background thread")
+		log_path = os.path.join(self.log_dir.name, "test-log-util.log")
+		for _ in range(100):
+			with open(log_path, encoding="utf-8") as log_file:
+				content = log_file.read()
+			if "a background thread" in content:
+				break
+			time.sleep(0.01)
+		self.assertEqual(content.count("written from a background thread"), 1)
+
+	def test_one_handler_per_path(self):
+		log_path = os.path.join(self.log_dir.name, "shared.log")
+		self.assertIs(get_queue_handler(log_path, 1), get_queue_handler(log_path, 1))
+		self.assertIsNot(get_queue_handler(log_path, 1), get_queue_handler(log_path + ".other", 1))
+
+	def test_rate_limiter(self):
+		limiter = LogRateLimiter(1)
+		with mock.patch("v2.nacos.utils.log_util.time.monotonic", return_value=100.0):
+			self.assertEqual(limiter.acquire("NotifySubscriberRequest"), 0)
+			self.assertIsNone(limiter.acquire("NotifySubscriberRequest"))
+			self.assertIsNone(limiter.acquire("NotifySubscriberRequest"))
+			self.assertEqual(limiter.acquire("ConfigChangeNotifyRequest"), 0)
+		with mock.patch("v2.nacos.utils.log_util.time.monotonic", return_value=101.5):
+			self.assertEqual(limiter.acquire("NotifySubscriberRequest"), 2)
+			self.assertIsNone(limiter.acquire("NotifySubscriberRequest"))
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,156 @@
+import asyncio
+import logging
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from aiohttp import web
+
+from v2.nacos.common.client_config import ClientConfig
+from v2.nacos.config.model.config_param import ConfigParam
+from v2.nacos.config.nacos_config_service import NacosConfigService
+from v2.nacos.naming.model.naming_param import RegisterInstanceParam, SubscribeServiceParam
+from v2.nacos.naming.nacos_naming_service import NacosNamingService
+from v2.nacos.testing import FakeNacosServer
+from v2.nacos.transport.http_agent import HttpAgent
+from v2.nacos.utils import loop_util
+from v2.nacos.utils.file_util import read_file, write_to_file
+
+
+class TestLoopUtil(unittest.TestCase):
+	"""Tests for the event loop helpers and the client paths on uvloop."""
+
+	def setUp(self):
+		self.dir = tempfile.TemporaryDirectory()
+
+	def tearDown(self):
+		self.dir.cleanup()
+
+	def _client_config(self, server_addresses="127.0.0.1:8848"):
+		client_config = ClientConfig(server_addresses=server_addresses, log_dir=self.dir.name)
+		client_config.set_cache_dir(os.path.join(self.dir.name, "cache"))
+		return client_config
+
+	def test_run_without_uvloop(self):
+		async def loop_type():
+			return type(asyncio.get_running_loop())
+
+		with mock.patch.object(loop_util, "uvloop", None):
+			self.assertFalse(loop_util.install_uvloop())
+			loop = loop_util.new_event_loop(use_uvloop=True)
+			self.assertFalse(loop_util.is_uvloop(loop))
+			loop.close()
+			self.assertNotIn("uvloop", loop_util.run(loop_type(), use_uvloop=True).__module__)
+
+	def test_tune_event_loop(self):
+		client_config = self._client_config()
+		client_config.slow_callback_warning_ms = 50
+		client_config.loop_executor_workers = 2
+
+		async def tuned():
+			loop = asyncio.get_running_loop()
+			loop_util.tune_event_loop(loop, client_config)
+			with mock.patch.object(loop, "set_default_executor") as set_default_executor:
+				loop_util.tune_event_loop(loop, client_config)
+			return loop.get_debug(), loop.slow_callback_duration, set_default_executor.call_count
+
+		self.assertEqual(loop_util.run(tuned(), use_uvloop=False), (True, 0.05, 0))
+
+	def test_tune_event_loop_shuts_down_the_replaced_executor(self):
+		client_config = self._client_config()
+		client_config.loop_executor_workers = 2
+
+		async def replaced():
+			loop = asyncio.get_running_loop()
+			await loop.run_in_executor(None, lambda: None)
+			previous = loop._default_executor
+			loop_util.tune_event_loop(loop, client_config)
+			self.assertIsNot(loop._default_executor, previous)
+			with self.assertRaises(RuntimeError):
+				previous.submit(lambda: None)
+
+		loop_util.run(replaced(), use_uvloop=False)
+
+	def test_run_keeps_the_loop_policy(self):
+		async def answer():
+			return 42
+
+		policy = asyncio.get_event_loop_policy()
+		# the branch python 3.10 takes, it has no asyncio.Runner
+		runner = asyncio.Runner
+		del asyncio.Runner
+		try:
+			self.assertEqual(loop_util.run(answer(), use_uvloop=True), 42)
+		finally:
+			asyncio.Runner = runner
+		self.assertIs(asyncio.get_event_loop_policy(), policy)
+
+	@unittest.skipUnless(loop_util.uvloop_available(), "uvloop is not installed")
+	def test_client_paths_on_uvloop(self):
+		async def scenario():
+			self.assertTrue(loop_util.is_uvloop(asyncio.get_running_loop()))
+			server = FakeNacosServer()
+			port = await server.start()
+			client_config = self._client_config(f"127.0.0.1:{port - 1000}")
+			client_config.use_uvloop = True
+			naming = await NacosNamingService.create_naming_service(client_config)
+			config = await NacosConfigService.create_config_service(client_config)
+			try:
+				# grpc.aio: requests and pushes
+				pushed = asyncio.Event()
+
+				async def on_change(instances):
+					pushed.set()
+
+				await naming.subscribe(SubscribeServiceParam(service_name="svc", subscribe_callback=on_change))
+				await naming.register_instance(RegisterInstanceParam(service_name="svc", ip="10.0.0.1", port=80))
+				await asyncio.wait_for(pushed.wait(), 5)
+				server.publish_config("app", "DEFAULT_GROUP", "v1")
+				self.assertEqual(await config.get_config(ConfigParam(data_id="app", group="DEFAULT_GROUP")), "v1")
+			finally:
+				await naming.shutdown()
+				await config.shutdown()
+				await server.stop()
+
+			# aiofiles
+			path = os.path.join(self.dir.name, "cache", "file")
+			await write_to_file(logging.getLogger("test"), path, "content")
+			self.assertEqual(await read_file(logging.getLogger("test"), path), "content")
+
+			# aiohttp
+			async def ping(request):
+				return web.Response(text="pong")
+
+			app = web.Application()
+			app.router.add_get("/nacos/ping", ping)
+			runner = web.AppRunner(app)
+			await runner.setup()
+			site = web.TCPSite(runner, "127.0.0.1", 0)
+			await site.start()
+			http_port = site._server.sockets[0].getsockname()[1]
+			agent = HttpAgent(logging.getLogger("test"), None, 3000)
+			try:
+				body, err = await agent.request(f"http://127.0.0.1:{http_port}/nacos/ping", "GET")
+				self.assertIsNone(err)
+				self.assertEqual(body, b"pong")
+			finally:
+				await agent.close()
+				await runner.cleanup()
+
+		loop_util.run(scenario(), use_uvloop=True)
+
+	def test_warns_when_uvloop_is_expected(self):
+		client_config = self._client_config()
+		client_config.use_uvloop = True
+		logger = logging.getLogger("test-loop-util")
+
+		async def tune():
+			with self.assertLogs(logger, logging.WARNING):
+				loop_util.tune_event_loop(asyncio.get_running_loop(), client_config, logger)
+
+		loop_util.run(tune(), use_uvloop=False)
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,128 @@
+import gc
+import logging
+import tempfile
+import unittest
+
+from v2.nacos.common.client_config import ClientConfig
+from v2.nacos.common.metrics import MetricsRegistry, metrics
+from v2.nacos.naming.cache.service_info_cache import ServiceInfoCache
+from v2.nacos.naming.model.instance import Instance
+from v2.nacos.naming.model.naming_request import ServiceQueryRequest
+from v2.nacos.naming.model.service import Service
+from v2.nacos.testing import FakeNacosServer, create_grpc_client, server_addresses
+
+
+class _Component:
+
+	def __init__(self, size):
+		self.size = size
+
+	def get_size(self):
+		return self.size
+
+	def snapshot(self):
+		return {"size": self.size}
+
+
+def _value(snapshot, kind, name, **labels):
+	for item in snapshot[kind]:
+		if item["name"] == name and all(item["labels"].get(k) == v for k, v in labels.items()):
+			return item
+	return None
+
+
+class TestMetricsRegistry(unittest.TestCase):
+	"""Tests for the counters, histograms, gauges and collectors of MetricsRegistry."""
+
+	def test_counter_and_histogram(self):
+		registry = MetricsRegistry()
+		registry.counter("requests", type="A", code=200).inc()
+		registry.counter("requests", code=200, type="A").inc(2)
+		for value in (0.5, 3, 3, 20000):
+			registry.histogram("latency", type="A").observe(value)
+		snapshot = registry.snapshot()
+		self.assertEqual(_value(snapshot, "counters", "requests", type="A", code="200")["value"], 3)
+		histogram = _value(snapshot, "histograms", "latency", type="A")
+		self.assertEqual(histogram["count"], 4)
+		self.assertEqual(histogram["buckets"]["1"], 1)
+		self.assertEqual(histogram["buckets"]["5"], 2)
+		self.assertEqual(histogram["buckets"]["+Inf"], 1)
+		registry.reset()
+		self.assertEqual(registry.snapshot()["counters"], [])
+
+	def test_gauges_and_collectors_follow_their_objects(self):
+		registry = MetricsRegistry()
+		first, second = _Component(2), _Component(3)
+		registry.register_gauge("cache_size", first.get_size, namespace="public")
+		registry.register_gauge("cache_size", second.get_size, namespace="public")
+		registry.register_collector("component", second.snapshot)
+		snapshot = registry.snapshot()
+		self.assertEqual(_value(snapshot, "gauges", "cache_size")["value"], 5)
+		self.assertEqual(snapshot["collectors"]["component"], {"size": 3})
+
+		del second
+		gc.collect()
+		snapshot = registry.snapshot()
+		self.assertEqual(_value(snapshot, "gauges", "cache_size")["value"], 2)
+		self.assertEqual(snapshot["collectors"], {})
+
+
+class TestInstrumentation(unittest.IsolatedAsyncioTestCase):
+	"""Tests that the instrumented code records into the process registry only while it is enabled."""
+
+	def setUp(self):
+		self.cache_dir = tempfile.TemporaryDirectory()
+		metrics.reset()
+
+	def tearDown(self):
+		metrics.enable(False)
+		metrics.reset()
+		self.cache_dir.cleanup()
+
+	async def test_service_info_cache(self):
+		client_config = ClientConfig(server_addresses="127.0.0.1:8848")
+		client_config.set_cache_dir(self.cache_dir.name)
+		client_config.load_cache_at_start = False
+		cache = ServiceInfoCache(client_config)
+		await cache.process_service(Service(name="svc", groupName="group", clusters="",
+											hosts=[Instance(ip="10.0.0.1", port=80)], lastRefTime=1))
+
+		await cache.get_service_info("svc", "group", "")
+		self.assertIsNone(_value(metrics.snapshot(), "counters", "nacos_client_service_info_cache_total"))
+
+		metrics.enable()
+		await cache.get_service_info("svc", "group", "")
+		await cache.get_service_info("other", "group", "")
+		snapshot = metrics.snapshot()
+		self.assertEqual(_value(snapshot, "counters", "nacos_client_service_info_cache_total", result="hit")["value"], 1)
+		self.assertEqual(_value(snapshot, "counters", "nacos_client_service_info_cache_total", result="miss")["value"], 1)
+		self.assertGreaterEqual(_value(snapshot, "gauges", "nacos_client_service_info_cache_size")["value"], 1)
+
+	async def test_rpc_client_requests(self):
+		logger = logging.getLogger("test")
+		server = FakeNacosServer(latency_ms=1)
+		port = await server.start()
+		client = create_grpc_client(logger, "metrics-test", ClientConfig(server_addresses=server_addresses(port)))
+		try:
+			await client.start()
+			metrics.enable()
+			for _ in range(3):
+				await client.request(ServiceQueryRequest(namespace="public", serviceName="svc",
+														 groupName="DEFAULT_GROUP", cluster="", healthOnly=False))
+			snapshot = metrics.snapshot()
+			self.assertEqual(_value(snapshot, "counters", "nacos_client_request_total",
+									type="ServiceQueryRequest", code="200")["value"], 3)
+			self.assertEqual(_value(snapshot, "histograms", "nacos_client_request_latency_ms",
+									type="ServiceQueryRequest")["count"], 3)
+			state = snapshot["collectors"]["rpc_client.metrics-test"]
+			self.assertEqual(state["status"], "RUNNING")
+			self.assertIsNotNone(state["connect_time_ms"])
+			self.assertIn("push_dispatcher", state)
+		finally:
+			await client.shutdown()
+			await server.stop()
+		self.assertNotIn("rpc_client.metrics-test", metrics.snapshot()["collectors"])
+
+
+if __name__ == '__main__':
+	unittest.main()
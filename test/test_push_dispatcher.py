@@ -0,0 +1,97 @@
+import asyncio
+import logging
+import unittest
+
+from v2.nacos.config.model.config_request import ConfigChangeNotifyRequest
+from v2.nacos.naming.model.naming_request import NotifySubscriberRequest
+from v2.nacos.naming.model.service import Service
+from v2.nacos.transport.grpc_util import GrpcUtils
+from v2.nacos.transport.model.internal_request import ConnectResetRequest
+from v2.nacos.transport.push_dispatcher import PushDispatcher
+
+
+class TestPushDispatcher(unittest.IsolatedAsyncioTestCase):
+	"""Tests for the ordering, concurrency and priority lane of PushDispatcher."""
+
+	async def asyncSetUp(self):
+		self.dispatcher = PushDispatcher(logging.getLogger("test"), "dispatch-test", max_workers=2, max_pending=4)
+		self.handled = []
+
+	async def asyncTearDown(self):
+		await self.dispatcher.shutdown()
+
+	def _job(self, name, delay=0.0, gate: asyncio.Event = None):
+		async def handle():
+			if gate is not None:
+				await gate.wait()
+			await asyncio.sleep(delay)
+			self.handled.append(name)
+		return handle
+
+	async def _drain(self):
+		for _ in range(200):
+			if self.dispatcher.pending == 0:
+				return
+			await asyncio.sleep(0.01)
+		self.fail("pushes are not handled")
+
+	async def test_same_key_in_order_other_keys_concurrently(self):
+		await self.dispatcher.submit("a", self._job("a1", 0.05), "push")
+		await self.dispatcher.submit("a", self._job("a2"), "push")
+		await self.dispatcher.submit("b", self._job("b1"), "push")
+		await self._drain()
+		self.assertEqual(self.handled, ["b1", "a1", "a2"])
+		self.assertEqual(self.dispatcher.snapshot()["handlers"]["push"]["count"], 3)
+
+	async def test_priority_lane_is_not_blocked_by_slow_handlers(self):
+		gate = asyncio.Event()
+		await self.dispatcher.submit("a", self._job("a", gate=gate), "push")
+		await self.dispatcher.submit("b", self._job("b", gate=gate), "push")
+		await self.dispatcher.submit("reset", self._job("reset"), "control", priority=True)
+		await asyncio.sleep(0.05)
+		self.assertEqual(self.handled, ["reset"])
+		self.assertEqual(self.dispatcher.snapshot()["queue_depth"], 2)
+		gate.set()
+		await self._drain()
+
+	async def test_full_queue_sheds_without_waiting(self):
+		gate = asyncio.Event()
+		for name in ["a1", "a2", "a3"]:
+			await self.dispatcher.submit("a", self._job(name, gate=gate), "push")
+		await self.dispatcher.submit("b", self._job("b1", gate=gate), "push")
+		# the newer push of a waiting key takes the place of the older one, another key is dropped
+		await asyncio.wait_for(self.dispatcher.submit("a", self._job("a4", gate=gate), "push"), 0.1)
+		await asyncio.wait_for(self.dispatcher.submit("c", self._job("c1", gate=gate), "push"), 0.1)
+		snapshot = self.dispatcher.snapshot()
+		self.assertEqual((snapshot["queue_depth"], snapshot["coalesced"], snapshot["dropped"]), (4, 1, 1))
+		gate.set()
+		await self._drain()
+		self.assertEqual(sorted(self.handled), ["a1", "a2", "a4", "b1"])
+
+	async def test_failed_handler_does_not_stop_the_key(self):
+		async def fail():
+			raise ValueError("boom")
+		await self.dispatcher.submit("a", fail, "push")
+		await self.dispatcher.submit("a", self._job("a2"), "push")
+		await self._drain()
+		self.assertEqual(self.handled, ["a2"])
+		self.assertEqual(self.dispatcher.snapshot()["handlers"]["push"]["failed"], 1)
+
+
+class TestDispatchKey(unittest.TestCase):
+
+	def test_keys(self):
+		push = NotifySubscriberRequest(serviceInfo=Service(name="svc", groupName="g"))
+		self.assertEqual(push.get_dispatch_key(), "g@@svc")
+		change = ConfigChangeNotifyRequest(dataId="d", group="g", tenant="t")
+		self.assertEqual(change.get_dispatch_key(), "t+g+d")
+
+	def test_connect_reset_request_is_parsed(self):
+		payload = GrpcUtils.convert_request_to_payload(ConnectResetRequest(serverIp="1.2.3.4", serverPort="8848"))
+		request = GrpcUtils.parse(payload)
+		self.assertIsInstance(request, ConnectResetRequest)
+		self.assertEqual(request.serverIp, "1.2.3.4")
+
+
+if __name__ == '__main__':
+	unittest.main()
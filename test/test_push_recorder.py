@@ -0,0 +1,163 @@
+import asyncio
+import logging
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from v2.nacos.common.client_config import ClientConfig, GRPCConfig
+from v2.nacos.common.nacos_exception import NacosException
+from v2.nacos.naming.cache.service_info_cache import ServiceInfoCache
+from v2.nacos.naming.cache.subscribe_callback_wrapper import ClusterSelector, SubscribeCallbackFuncWrapper
+from v2.nacos.naming.model.instance import Instance
+from v2.nacos.naming.model.naming_param import SubscribeServiceParam
+from v2.nacos.naming.model.naming_request import NotifySubscriberRequest, NOTIFY_SUBSCRIBER_REQUEST_TYPE
+from v2.nacos.naming.model.service import Service
+from v2.nacos.naming.nacos_naming_service import NacosNamingService
+from v2.nacos.naming.remote.naming_push_request_handler import NamingPushRequestHandler
+from v2.nacos.testing import FakeNacosServer
+from v2.nacos.transport.grpc_util import GrpcUtils
+from v2.nacos.transport.push_recorder import PushRecorder, PushReplayer, get_push_recorder, read_pushes
+
+
+def _push(port: int, last_ref_time: int):
+	service = Service(name="svc", groupName="DEFAULT_GROUP", lastRefTime=last_ref_time,
+					  hosts=[Instance(ip="10.0.0.1", port=port)])
+	return NotifySubscriberRequest(namespace="public", groupName="DEFAULT_GROUP", serviceName="svc",
+								   serviceInfo=service)
+
+
+class TestPushRecorder(unittest.IsolatedAsyncioTestCase):
+	"""Tests for recording server pushes and replaying them into the push handlers."""
+
+	def setUp(self):
+		self.dir = tempfile.TemporaryDirectory()
+		self.path = os.path.join(self.dir.name, "pushes.rec")
+		self.client_config = ClientConfig(server_addresses="127.0.0.1:8848", log_dir=self.dir.name)
+		self.client_config.set_cache_dir(self.dir.name)
+
+	def tearDown(self):
+		self.dir.cleanup()
+
+	async def _replay(self, **kwargs):
+		cache = ServiceInfoCache(self.client_config)
+		pushed = []
+
+		async def on_change(instances):
+			pushed.append([instance.port for instance in instances])
+
+		await cache.register_callback("DEFAULT_GROUP@@svc", "",
+									  SubscribeCallbackFuncWrapper(ClusterSelector(None), on_change))
+		replayer = PushReplayer(logging.getLogger("test"),
+								{NOTIFY_SUBSCRIBER_REQUEST_TYPE: NamingPushRequestHandler(logging.getLogger("test"),
+																							cache)})
+		return await replayer.replay(self.path, **kwargs), replayer, pushed
+
+	async def test_record_and_replay(self):
+		recorder = PushRecorder(self.path)
+		for i in range(3):
+			recorder.record(GrpcUtils.convert_request_to_payload(_push(80 + i, i + 1)), received=100.0 + i)
+		recorder.close()
+		self.assertEqual([received for received, _ in read_pushes(self.path)], [100.0, 101.0, 102.0])
+
+		handled, replayer, pushed = await self._replay()
+		self.assertEqual(handled, 3)
+		self.assertEqual(pushed, [[80], [81], [82]])
+		self.assertEqual(replayer.skipped, 0)
+
+	async def test_real_time_keeps_the_gaps(self):
+		recorder = PushRecorder(self.path)
+		for i in range(3):
+			recorder.record(GrpcUtils.convert_request_to_payload(_push(80 + i, i + 1)), received=100.0 + i)
+		recorder.close()
+		with mock.patch("v2.nacos.transport.push_recorder.asyncio.sleep") as sleep:
+			await self._replay(real_time=True, speed=4)
+		self.assertEqual(len(sleep.call_args_list), 2)
+		self.assertAlmostEqual(sleep.call_args_list[-1].args[0], 0.5, delta=0.05)
+
+	def test_limits_and_damaged_files(self):
+		payload = GrpcUtils.convert_request_to_payload(_push(80, 1))
+		recorder = PushRecorder(self.path, max_bytes=len(payload.SerializeToString()) * 3 // 2)
+		self.assertTrue(recorder.record(payload))
+		self.assertFalse(recorder.record(payload))
+		self.assertEqual(recorder.dropped, 1)
+		recorder.close()
+		# a record cut short by a killed process is ignored
+		with open(self.path, "ab") as record_file:
+			record_file.write(b"\x00\x01")
+		self.assertEqual(len(list(read_pushes(self.path))), 1)
+
+		other = os.path.join(self.dir.name, "other")
+		with open(other, "wb") as other_file:
+			other_file.write(b"not a record")
+		with self.assertRaises(NacosException):
+			list(read_pushes(other))
+
+	def test_shared_path_must_agree_on_the_limit(self):
+		recorder = get_push_recorder(self.path, 1024)
+		try:
+			self.assertIs(get_push_recorder(self.path, 1024), recorder)
+			with self.assertRaises(NacosException):
+				get_push_recorder(self.path, 2048)
+		finally:
+			recorder.close()
+
+	def test_flush_waits_for_the_writer(self):
+		recorder = PushRecorder(self.path)
+		try:
+			for i in range(50):
+				self.assertTrue(recorder.record(GrpcUtils.convert_request_to_payload(_push(80, i + 1))))
+			recorder.flush()
+			self.assertEqual(len(list(read_pushes(self.path))), 50)
+		finally:
+			recorder.close()
+		# a closed recorder drops instead of queueing for a writer that is gone
+		self.assertFalse(recorder.record(GrpcUtils.convert_request_to_payload(_push(80, 1))))
+
+	def test_write_error_stops_the_recording(self):
+		recorder = PushRecorder(self.path)
+		payload = GrpcUtils.convert_request_to_payload(_push(80, 1))
+		with mock.patch.object(recorder, "_file", wraps=recorder._file) as record_file:
+			record_file.write.side_effect = OSError("no space left on device")
+			with self.assertLogs(recorder.logger, "ERROR"):
+				for _ in range(20):
+					recorder.record(payload)
+				# neither waits for a writer that is gone
+				recorder.flush()
+			self.assertFalse(recorder._writer.is_alive())
+			self.assertFalse(recorder.record(payload))
+			self.assertEqual(recorder.recorded, 0)
+			self.assertEqual(recorder.dropped, 21)
+		recorder.close()
+
+	async def test_client_records_pushes(self):
+		server = FakeNacosServer()
+		port = await server.start()
+		client_config = ClientConfig(server_addresses=f"127.0.0.1:{port - 1000}", log_dir=self.dir.name)
+		client_config.set_cache_dir(self.dir.name)
+		client_config.set_grpc_config(GRPCConfig(push_record_path=self.path))
+		naming = await NacosNamingService.create_naming_service(client_config)
+		try:
+			await naming.subscribe(SubscribeServiceParam(service_name="svc"))
+			await server.wait_for_connections(1)
+			self.assertEqual(server.push_flood(_push(80, 1), 5), 5)
+			recorder = get_push_recorder(self.path)
+			for _ in range(100):
+				if recorder.recorded >= 5:
+					break
+				await asyncio.sleep(0.02)
+		finally:
+			await naming.shutdown()
+			await server.stop()
+		types = [payload.metadata.type for _, payload in read_pushes(self.path)]
+		# the setup ack and other control requests of the connection are not pushes
+		self.assertEqual(types, [NOTIFY_SUBSCRIBER_REQUEST_TYPE] * 5)
+
+		handled, _, pushed = await self._replay()
+		self.assertEqual(handled, 5)
+		# the same service info five times changes the cache once
+		self.assertEqual(pushed, [[80]])
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,71 @@
+import base64
+import hashlib
+import hmac
+import unittest
+from unittest import mock
+
+from v2.nacos.common.client_config import ClientConfig
+from v2.nacos.common.constants import Constants
+from v2.nacos.transport.request_signer import RequestSigner
+from v2.nacos.utils.md5_util import md5
+
+
+def _reference_signature(secret, sign_str):
+	return base64.encodebytes(hmac.new(secret.encode(), sign_str.encode(), digestmod=hashlib.sha1).digest()) \
+		.decode().strip()
+
+
+class TestRequestSigner(unittest.TestCase):
+	"""Tests that RequestSigner produces the headers the proxies used to build by hand."""
+
+	def setUp(self):
+		self.client_config = ClientConfig(server_addresses="127.0.0.1:8848", access_key="ak", secret_key="sk")
+		self.client_config.app_key = "app-key"
+		self.clock = mock.patch("v2.nacos.transport.request_signer.get_current_time_millis", return_value=1000)
+		self.clock.start()
+
+	def tearDown(self):
+		self.clock.stop()
+
+	def test_sign(self):
+		signer = RequestSigner(self.client_config, {Constants.CLIENT_APPNAME_HEADER: "app"})
+		headers = {}
+		signer.sign(headers, "tenant+group")
+		self.assertEqual(headers[Constants.CLIENT_APPNAME_HEADER], "app")
+		self.assertEqual(headers[Constants.CLIENT_REQUEST_TS_HEADER], "1000")
+		self.assertEqual(headers[Constants.CLIENT_REQUEST_TOKEN_HEADER], md5("1000app-key"))
+		self.assertEqual(headers["Spas-AccessKey"], "ak")
+		self.assertEqual(headers["Spas-Signature"], _reference_signature("sk", "tenant+group+1000"))
+
+	def test_sign_naming(self):
+		signer = RequestSigner(self.client_config)
+		headers = {}
+		signer.sign_naming(headers, "group@@svc")
+		self.assertEqual(headers["data"], "1000@@group@@svc")
+		self.assertEqual(headers["signature"], _reference_signature("sk", "1000@@group@@svc"))
+		headers = {}
+		signer.sign_naming(headers, "")
+		self.assertEqual(headers["signature"], _reference_signature("sk", "1000"))
+
+	def test_rotated_secret_and_clock(self):
+		signer = RequestSigner(self.client_config)
+		first = {}
+		signer.sign(first, "group")
+		self.client_config.credentials_provider.set_access_key_secret("sk2")
+		rotated = {}
+		signer.sign(rotated, "group")
+		self.assertEqual(rotated["Spas-Signature"], _reference_signature("sk2", "group+1000"))
+		with mock.patch("v2.nacos.transport.request_signer.get_current_time_millis", return_value=1001):
+			later = {}
+			signer.sign(later, "group")
+		self.assertEqual(later["Spas-Signature"], _reference_signature("sk2", "group+1001"))
+
+	def test_no_credentials(self):
+		signer = RequestSigner(ClientConfig(server_addresses="127.0.0.1:8848"))
+		headers = {}
+		signer.sign_naming(headers, "group@@svc")
+		self.assertEqual(headers, {})
+
+
+if __name__ == '__main__':
+	unittest.main()
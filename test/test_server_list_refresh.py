@@ -0,0 +1,119 @@
+import logging
+import tempfile
+import unittest
+
+from aiohttp import web
+
+from v2.nacos.common.client_config import ClientConfig
+from v2.nacos.testing import unused_port
+from v2.nacos.transport.grpc_client import GrpcClient
+from v2.nacos.transport.grpc_connection import GrpcConnection
+from v2.nacos.transport.http_agent import HttpAgent
+from v2.nacos.transport.model.server_info import ServerInfo
+from v2.nacos.transport.nacos_server_connector import NacosServerConnector
+from v2.nacos.transport.rpc_client import RpcClientStatus
+
+
+class AddressServer:
+	"""Serves /nacos/serverlist with an ETag and answers 304 when the list did not change."""
+
+	def __init__(self, servers):
+		self.servers = servers
+		self.requests = []
+		self.runner = None
+
+	async def start(self) -> int:
+		app = web.Application()
+		app.router.add_get("/nacos/serverlist", self.server_list)
+		self.runner = web.AppRunner(app)
+		await self.runner.setup()
+		site = web.TCPSite(self.runner, "127.0.0.1", 0)
+		await site.start()
+		return self.runner.addresses[0][1]
+
+	async def stop(self):
+		await self.runner.cleanup()
+
+	async def server_list(self, request):
+		etag = f'"{hash(tuple(self.servers))}"'
+		self.requests.append(request.headers.get("If-None-Match"))
+		if request.headers.get("If-None-Match") == etag:
+			return web.Response(status=304)
+		return web.Response(text="\n".join(self.servers), headers={"ETag": etag})
+
+
+class TestServerListRefresh(unittest.IsolatedAsyncioTestCase):
+	"""Tests for the server list of NacosServerConnector fetched from address servers."""
+
+	async def asyncSetUp(self):
+		self.logger = logging.getLogger("test")
+		self.cache_dir = tempfile.TemporaryDirectory()
+		self.address_server = AddressServer(["10.0.0.1:8848", "10.0.0.2:8848"])
+		self.port = await self.address_server.start()
+		self.http_agent = HttpAgent(self.logger, None, 3)
+		self.connectors = []
+
+	async def asyncTearDown(self):
+		for connector in self.connectors:
+			await connector.close()
+		await self.http_agent.close()
+		await self.address_server.stop()
+		self.cache_dir.cleanup()
+
+	def _connector(self, endpoint):
+		client_config = ClientConfig(endpoint=endpoint)
+		client_config.set_cache_dir(self.cache_dir.name)
+		connector = NacosServerConnector(self.logger, client_config, self.http_agent)
+		self.connectors.append(connector)
+		return connector
+
+	async def test_conditional_refresh(self):
+		connector = self._connector(f"127.0.0.1:{self.port}")
+		await connector.init()
+		self.assertEqual(connector.get_server_list(), ["10.0.0.1:8848", "10.0.0.2:8848"])
+		changes = []
+
+		async def on_change():
+			changes.append(list(connector.get_server_list()))
+		connector.add_server_list_listener(on_change)
+
+		await connector._get_server_list_from_endpoint()
+		self.assertIsNotNone(self.address_server.requests[-1])
+		self.assertEqual(changes, [])
+
+		self.address_server.servers = ["10.0.0.3:8848"]
+		await connector._get_server_list_from_endpoint()
+		self.assertEqual(changes, [["10.0.0.3:8848"]])
+
+	async def test_dead_address_server_is_skipped(self):
+		connector = self._connector(f"127.0.0.1:{unused_port()},127.0.0.1:{self.port}")
+		await connector.init()
+		self.assertEqual(connector.get_server_list(), ["10.0.0.1:8848", "10.0.0.2:8848"])
+
+	async def test_cold_start_uses_cached_list(self):
+		await self._connector(f"127.0.0.1:{self.port}").init()
+		await self.address_server.stop()
+		self.address_server = AddressServer([])
+		await self.address_server.start()
+
+		restarted = self._connector(f"127.0.0.1:{self.port}")
+		await restarted.init()
+		self.assertEqual(restarted.get_server_list(), ["10.0.0.1:8848", "10.0.0.2:8848"])
+
+	async def test_rpc_client_leaves_removed_server(self):
+		connector = self._connector(f"127.0.0.1:{self.port}")
+		await connector.init()
+		client = GrpcClient(self.logger, "srv-change-test", ClientConfig(endpoint=connector.endpoint), connector)
+		client.rpc_client_status = RpcClientStatus.RUNNING
+		client.current_connection = GrpcConnection(ServerInfo("10.0.0.1", 9848), "conn-1", None, None, None)
+
+		await connector._notify_server_list_change()
+		self.assertTrue(client.reconnection_chan.empty())
+
+		self.address_server.servers = ["10.0.0.2:8848"]
+		await connector._get_server_list_from_endpoint()
+		self.assertFalse(client.reconnection_chan.empty())
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,100 @@
+import logging
+import unittest
+from collections import Counter
+from unittest import mock
+
+from v2.nacos.common.client_config import ClientConfig
+from v2.nacos.transport.http_agent import HttpAgent
+from v2.nacos.transport.nacos_server_connector import NacosServerConnector
+from v2.nacos.transport.server_selector import LatencyServerSelector, SERVER_SELECT_LATENCY, server_key
+
+SERVERS = ["10.0.0.1:8848", "10.0.0.2:8848", "http://10.0.0.3:8848/"]
+
+
+class TestLatencyServerSelector(unittest.TestCase):
+
+	def test_server_key(self):
+		self.assertEqual(server_key("http://10.0.0.3:8848/"), "10.0.0.3:8848")
+		self.assertEqual(server_key("10.0.0.1"), "10.0.0.1:8848")
+		self.assertEqual(server_key("https://nacos.local:80/nacos"), "nacos.local:80")
+
+	def test_settles_on_fastest_server(self):
+		selector = LatencyServerSelector()
+		for _ in range(5):
+			selector.record("10.0.0.1:8848", 40, True)
+			selector.record("10.0.0.2:8848", 2, True)
+			selector.record("10.0.0.3:8848", 20, True)
+		chosen = Counter(selector.choose(SERVERS) for _ in range(300))
+		# the slowest member loses every pairing, the fastest wins both pairings it takes part in
+		self.assertNotIn("10.0.0.1:8848", chosen)
+		self.assertGreater(chosen["10.0.0.2:8848"], chosen["http://10.0.0.3:8848/"])
+
+	def test_failing_server_is_avoided(self):
+		selector = LatencyServerSelector()
+		for _ in range(5):
+			selector.record("10.0.0.1:8848", 1, False)
+			selector.record("10.0.0.2:8848", 10, True)
+		self.assertEqual({selector.choose(SERVERS[:2]) for _ in range(50)}, {"10.0.0.2:8848"})
+
+	def test_unmeasured_server_is_tried(self):
+		selector = LatencyServerSelector()
+		selector.record("10.0.0.1:8848", 10, True)
+		self.assertEqual(selector.choose(SERVERS[:2]), "10.0.0.2:8848")
+		selector.record("10.0.0.2:8848", None, True)
+		self.assertEqual(selector.choose(SERVERS[:2]), "10.0.0.2:8848")
+
+	def test_slow_answers_outweigh_a_fast_probe(self):
+		selector = LatencyServerSelector()
+		for _ in range(5):
+			selector.record("10.0.0.1:8848", 2, True)
+			selector.record("10.0.0.2:8848", 5, True)
+			# each request type is compared with itself only
+			selector.record_request("10.0.0.1:8848", "ConfigQueryRequest", 50, True)
+			selector.record_request("10.0.0.2:8848", "ConfigQueryRequest", 5, True)
+			selector.record_request("10.0.0.1:8848", "BatchInstanceRequest", 200, True)
+			selector.record_request("10.0.0.2:8848", "BatchInstanceRequest", 20, True)
+		self.assertGreater(selector.stats["10.0.0.1:8848"].slowness, 1)
+		self.assertLess(selector.stats["10.0.0.2:8848"].slowness, 1)
+		self.assertEqual({selector.choose(SERVERS[:2]) for _ in range(50)}, {"10.0.0.2:8848"})
+
+
+class TestConnectorServerStats(unittest.IsolatedAsyncioTestCase):
+
+	async def test_only_servers_of_the_list_are_recorded(self):
+		logger = logging.getLogger("test")
+		client_config = ClientConfig(server_addresses="10.0.0.1:8848,10.0.0.2:8848")
+		client_config.set_server_select_strategy(SERVER_SELECT_LATENCY)
+		http_agent = HttpAgent(logger, None, 3)
+		connector = NacosServerConnector(logger, client_config, http_agent)
+		self.assertIn(connector.record_server_result, http_agent.result_listeners)
+
+		connector.record_server_result("downloads.example.com", 443, 30, True)
+		connector.record_server_result("10.0.0.1", 8848, 30, True, "ConfigQueryRequest")
+		self.assertEqual(list(connector.server_selector.stats), ["10.0.0.1:8848"])
+		self.assertEqual(connector.server_selector.request_rtt_ms, {"ConfigQueryRequest": 30})
+		# request latency scales the probe latency instead of mixing into it
+		self.assertIsNone(connector.server_selector.stats["10.0.0.1:8848"].rtt_ms)
+
+		connector._set_server_list(["10.0.0.3:8848"])
+		connector.record_server_result("10.0.0.1", 8848, 30, True)
+		connector.record_server_result("10.0.0.3", 8848, 30, True)
+		self.assertEqual(sorted(connector.server_selector.stats), ["10.0.0.1:8848", "10.0.0.3:8848"])
+		self.assertEqual(connector.server_selector.stats["10.0.0.1:8848"].samples, 1)
+
+		await connector.close()
+		self.assertNotIn(connector.record_server_result, http_agent.result_listeners)
+
+	async def test_nothing_is_recorded_when_both_features_are_off(self):
+		logger = logging.getLogger("test")
+		client_config = ClientConfig(server_addresses="10.0.0.1:8848")
+		connector = NacosServerConnector(logger, client_config, HttpAgent(logger, None, 3))
+		# every rpc reports here, with both features off it returns before looking at the server list
+		connector.server_keys = mock.MagicMock()
+		connector.record_server_result("10.0.0.1", 8848, 30, False, "ConfigQueryRequest")
+		connector.server_keys.__contains__.assert_not_called()
+		self.assertEqual(connector.circuit_breakers, {})
+		await connector.close()
+
+
+if __name__ == '__main__':
+	unittest.main()
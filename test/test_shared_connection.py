@@ -0,0 +1,55 @@
+import unittest
+
+from v2.nacos.common.client_config import ClientConfig
+from v2.nacos.config.nacos_config_service import NacosConfigService
+from v2.nacos.naming.nacos_naming_service import NacosNamingService
+from v2.nacos.testing import FakeNacosServer
+from v2.nacos.transport.shared_rpc_client import shared_rpc_clients
+
+
+class TestSharedConnection(unittest.IsolatedAsyncioTestCase):
+	"""Tests for naming and config services sharing one rpc client."""
+
+	async def asyncSetUp(self):
+		self.server = FakeNacosServer()
+		port = await self.server.start()
+		self.client_config = ClientConfig(server_addresses=f"127.0.0.1:{port - 1000}")
+		self.client_config.set_shared_connection(True)
+
+	async def asyncTearDown(self):
+		await self.server.stop()
+
+	async def test_services_share_one_connection(self):
+		naming = await NacosNamingService.create_naming_service(self.client_config)
+		config = await NacosConfigService.create_config_service(self.client_config)
+		self.assertIs(naming.grpc_client_proxy.rpc_client, await config.grpc_client_proxy.fetch_rpc_client())
+		self.assertEqual(self.server.connection_count, 1)
+		self.assertEqual(shared_rpc_clients.size(), 1)
+		self.assertTrue(await naming.server_health())
+
+		rpc_client = naming.grpc_client_proxy.rpc_client
+		shared_agent = rpc_client.nacos_server.http_agent
+		# the services close their own agents on shutdown, the shared client keeps using its agent
+		self.assertNotIn(shared_agent, (naming.http_agent, config.http_agent))
+		await naming.shutdown()
+		self.assertTrue(rpc_client.is_running())
+		self.assertNotIn("NotifySubscriberRequest", rpc_client.server_request_handler_mapping)
+		await shared_agent.request_with_status(f"127.0.0.1:{self.server.port}/nacos", "GET")
+		self.assertIsNotNone(shared_agent._session)
+		await config.shutdown()
+		self.assertTrue(rpc_client.is_shutdown())
+		self.assertIsNone(shared_agent._session)
+		self.assertEqual(shared_rpc_clients.size(), 0)
+
+	async def test_second_service_of_a_module_gets_own_connection(self):
+		first = await NacosNamingService.create_naming_service(self.client_config)
+		second = await NacosNamingService.create_naming_service(self.client_config)
+		self.assertIsNot(first.grpc_client_proxy.rpc_client, second.grpc_client_proxy.rpc_client)
+		self.assertEqual(shared_rpc_clients.size(), 2)
+		await first.shutdown()
+		await second.shutdown()
+		self.assertEqual(shared_rpc_clients.size(), 0)
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,58 @@
+import asyncio
+import unittest
+
+from v2.nacos.common.nacos_exception import NacosException, SERVER_ERROR
+from v2.nacos.transport.single_flight import SingleFlight
+
+
+class TestSingleFlight(unittest.IsolatedAsyncioTestCase):
+	"""Tests that SingleFlight shares one in-flight call between identical concurrent queries."""
+
+	async def test_concurrent_calls_share_one(self):
+		single_flight = SingleFlight()
+		sent = []
+
+		async def query(key):
+			sent.append(key)
+			await asyncio.sleep(0.05)
+			return f"result-{key}"
+
+		results = await asyncio.gather(*[single_flight.do(("config", i % 2), lambda i=i: query(i % 2))
+										 for i in range(10)])
+		self.assertEqual(sorted(sent), [0, 1])
+		self.assertEqual(results.count("result-0"), 5)
+		self.assertEqual(single_flight.snapshot(), {"calls": 10, "coalesced": 8, "in_flight": 0})
+
+		# once finished the next call is sent again
+		self.assertEqual(await single_flight.do(("config", 0), lambda: query(0)), "result-0")
+		self.assertEqual(len(sent), 3)
+
+	async def test_error_is_shared(self):
+		single_flight = SingleFlight()
+
+		async def query():
+			await asyncio.sleep(0.01)
+			raise NacosException(SERVER_ERROR, "boom")
+
+		results = await asyncio.gather(*[single_flight.do("key", query) for _ in range(3)], return_exceptions=True)
+		self.assertTrue(all(isinstance(result, NacosException) for result in results))
+		self.assertEqual(single_flight.snapshot()["in_flight"], 0)
+
+	async def test_cancelled_caller_does_not_cancel_others(self):
+		single_flight = SingleFlight()
+
+		async def query():
+			await asyncio.sleep(0.05)
+			return "done"
+
+		first = asyncio.create_task(single_flight.do("key", query))
+		second = asyncio.create_task(single_flight.do("key", query))
+		await asyncio.sleep(0.01)
+		first.cancel()
+		self.assertEqual(await second, "done")
+		with self.assertRaises(asyncio.CancelledError):
+			await first
+
+
+if __name__ == '__main__':
+	unittest.main()
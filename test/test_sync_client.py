@@ -0,0 +1,149 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from v2.nacos.common.client_config import ClientConfig
+from v2.nacos.common.nacos_exception import NacosException, SERVER_ERROR
+from v2.nacos.config.model.config_param import ConfigParam
+from v2.nacos.naming.model.instance import Instance
+from v2.nacos.naming.model.naming_param import ListInstanceParam, RegisterInstanceParam, SubscribeServiceParam
+from v2.nacos.sync_client import NacosLoopThread, SyncNacosConfigService, SyncNacosNamingService
+from v2.nacos.testing import FakeNacosServer
+
+
+def _wait_until(condition, timeout=5):
+	deadline = time.monotonic() + timeout
+	while not condition():
+		if time.monotonic() > deadline:
+			raise AssertionError("condition not met in time")
+		time.sleep(0.02)
+
+
+class TestSyncClient(unittest.TestCase):
+	"""Tests for the synchronous facades hosted on a background event loop thread."""
+
+	def setUp(self):
+		self.dir = tempfile.TemporaryDirectory()
+		self.server = FakeNacosServer()
+		# the fake server runs on its own loop, like a remote server would
+		self.server_thread = NacosLoopThread(name="fake-server")
+		port = self.server_thread.run(self.server.start())
+		self.client_config = ClientConfig(server_addresses=f"127.0.0.1:{port - 1000}", log_dir=self.dir.name)
+		self.client_config.set_cache_dir(os.path.join(self.dir.name, "cache"))
+
+	def tearDown(self):
+		self.server_thread.run(self.server.stop())
+		self.server_thread.stop()
+		self.dir.cleanup()
+
+	def _on_server(self, method, *args):
+		async def call():
+			return method(*args)
+
+		return self.server_thread.run(call())
+
+	def test_naming_reads_the_cache(self):
+		with SyncNacosNamingService.create(self.client_config) as naming:
+			changes = []
+
+			def on_change(instances):
+				# plain callbacks run outside the loop thread
+				changes.append((threading.current_thread().name, len(instances)))
+
+			naming.subscribe(SubscribeServiceParam(service_name="svc", subscribe_callback=on_change))
+			self.assertTrue(naming.register_instance(RegisterInstanceParam(service_name="svc", ip="10.0.0.1",
+																		   port=80, weight=1)))
+			_wait_until(lambda: len(naming.list_instances(ListInstanceParam(service_name="svc", healthy_only=True))) == 1)
+			_wait_until(lambda: changes)
+			self.assertNotIn("nacos-loop", {name for name, _ in changes})
+
+			queries = self.server.requests_by_type["ServiceQueryRequest"]
+			self._on_server(self.server.register_instance, "svc", Instance(ip="10.0.0.2", port=80, weight=0.001))
+			_wait_until(lambda: len(naming.list_instances(ListInstanceParam(service_name="svc", healthy_only=True))) == 2)
+			picked = {naming.select_one_healthy_instance("svc").ip for _ in range(20)}
+			self.assertIn("10.0.0.1", picked)
+			self.assertEqual(self.server.requests_by_type["ServiceQueryRequest"], queries)
+
+			with self.assertRaises(NacosException):
+				naming.select_one_healthy_instance("missing")
+		self.assertFalse(naming.loop_thread.is_running())
+
+	def test_naming_does_not_serve_the_disk_cache_before_subscribing(self):
+		old, new = Instance(ip="10.0.0.1", port=80), Instance(ip="10.0.0.2", port=80)
+		self._on_server(self.server.register_instance, "svc", old)
+		param = ListInstanceParam(service_name="svc", healthy_only=None)
+		with SyncNacosNamingService.create(self.client_config) as naming:
+			self.assertEqual([instance.ip for instance in naming.list_instances(param)], ["10.0.0.1"])
+		self._on_server(self.server.deregister_instance, "svc", old)
+		self._on_server(self.server.register_instance, "svc", new)
+
+		self.client_config.set_load_cache_at_start(True)
+		with SyncNacosNamingService.create(self.client_config) as naming:
+			holder = naming.service.service_info_holder
+			_wait_until(lambda: holder.peek_service_info("svc", "DEFAULT_GROUP", "") is not None)
+			self.assertEqual([instance.ip for instance in naming.list_instances(param)], ["10.0.0.2"])
+
+	def test_config_is_cached_and_follows_changes(self):
+		self._on_server(self.server.publish_config, "app", "DEFAULT_GROUP", "v1")
+		with SyncNacosConfigService.create(self.client_config) as config:
+			param = ConfigParam(data_id="app", group="DEFAULT_GROUP")
+			self.assertEqual(config.get_config(param), "v1")
+			_wait_until(lambda: ("", "DEFAULT_GROUP", "app") in self.server.config_listeners)
+
+			queries = self.server.requests_by_type["ConfigQueryRequest"]
+			self.assertEqual(config.get_config(param), "v1")
+			self.assertEqual(self.server.requests_by_type["ConfigQueryRequest"], queries)
+
+			self._on_server(self.server.publish_config, "app", "DEFAULT_GROUP", "v2")
+			_wait_until(lambda: config.get_config(param) == "v2")
+
+			# a local publish drops the cached content
+			self.assertTrue(config.publish_config(ConfigParam(data_id="app", group="DEFAULT_GROUP", content="v3")))
+			self.assertEqual(config.get_config(param), "v3")
+
+	def test_config_listener_is_added_again_after_a_failure(self):
+		self._on_server(self.server.publish_config, "app", "DEFAULT_GROUP", "v1")
+		with SyncNacosConfigService.create(self.client_config) as config:
+			param = ConfigParam(data_id="app", group="DEFAULT_GROUP")
+			add_listener = config.service.add_listener
+			calls = []
+
+			async def fail_once(data_id, group, listener):
+				calls.append(data_id)
+				if len(calls) == 1:
+					raise NacosException(SERVER_ERROR, "add listener failed")
+				return await add_listener(data_id, group, listener)
+
+			with mock.patch.object(config.service, "add_listener", fail_once):
+				with self.assertRaises(NacosException):
+					config.get_config(param)
+				self.assertEqual(config.get_config(param), "v1")
+			self.assertEqual(len(calls), 2)
+			_wait_until(lambda: ("", "DEFAULT_GROUP", "app") in self.server.config_listeners)
+
+	def test_shared_loop_thread(self):
+		loop_thread = NacosLoopThread()
+		try:
+			naming = SyncNacosNamingService.create(self.client_config, loop_thread)
+			config = SyncNacosConfigService.create(self.client_config, loop_thread)
+
+			async def call_from_loop():
+				return naming.server_health()
+
+			# blocking the loop on its own call would never return
+			with self.assertRaises(NacosException):
+				loop_thread.run(call_from_loop())
+			naming.shutdown()
+			config.shutdown()
+			self.assertTrue(loop_thread.is_running())
+		finally:
+			loop_thread.stop()
+		with self.assertRaises(NacosException):
+			naming.server_health()
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,122 @@
+import logging
+import unittest
+
+from v2.nacos.common.client_config import ClientConfig
+from v2.nacos.common.tracing import Span, Tracer, OpenTelemetryTracer, NOOP_SPAN, set_tracer, start_span
+from v2.nacos.naming.cache.subscribe_callback_wrapper import ClusterSelector, SubscribeCallbackFuncWrapper
+from v2.nacos.naming.cache.subscribe_manager import SubscribeManager
+from v2.nacos.naming.model.naming_request import ServiceQueryRequest
+from v2.nacos.naming.model.service import Service
+from v2.nacos.testing import FakeNacosServer, create_grpc_client, server_addresses
+
+
+class RecordedSpan(Span):
+
+	def __init__(self, tracer, name, parent):
+		self.tracer = tracer
+		self.name = name
+		self.parent = parent
+		self.attributes = {}
+		self.exception = None
+
+	def set_attribute(self, key, value):
+		self.attributes[key] = value
+
+	def record_exception(self, exception):
+		self.exception = exception
+
+	def __enter__(self):
+		self.tracer.stack.append(self)
+		return self
+
+	def __exit__(self, exc_type, exc, tb):
+		self.tracer.stack.remove(self)
+		return super().__exit__(exc_type, exc, tb)
+
+
+class RecordingTracer(Tracer):
+	"""Keeps every span with the span that was open when it started."""
+
+	def __init__(self):
+		self.spans = []
+		self.stack = []
+
+	def start_span(self, name, attributes=None):
+		span = RecordedSpan(self, name, self.stack[-1] if self.stack else None)
+		self.spans.append(span)
+		return span
+
+	def named(self, name):
+		return [span for span in self.spans if span.name == name]
+
+
+class TestTracing(unittest.IsolatedAsyncioTestCase):
+	"""Tests for the spans created around requests, pushes and listener callbacks."""
+
+	def setUp(self):
+		self.tracer = RecordingTracer()
+		set_tracer(self.tracer)
+
+	def tearDown(self):
+		set_tracer(None)
+
+	def test_default_tracer_is_noop(self):
+		set_tracer(None)
+		with start_span("nacos.test") as span:
+			span.set_attribute("key", "value")
+		self.assertIs(span, NOOP_SPAN)
+
+	async def test_request_spans(self):
+		logger = logging.getLogger("test")
+		server = FakeNacosServer(latency_ms=1)
+		port = await server.start()
+		client = create_grpc_client(logger, "tracing-test", ClientConfig(server_addresses=server_addresses(port)))
+		try:
+			await client.start()
+			self.tracer.spans.clear()
+			await client.request(ServiceQueryRequest(namespace="public", serviceName="svc",
+													 groupName="DEFAULT_GROUP", cluster="", healthOnly=False))
+		finally:
+			await client.shutdown()
+			await server.stop()
+
+		rpc_span = self.tracer.named("nacos.rpc.request")[0]
+		self.assertEqual(rpc_span.attributes["nacos.request_type"], "ServiceQueryRequest")
+		self.assertEqual(rpc_span.attributes["nacos.result_code"], 200)
+		grpc_span = self.tracer.named("nacos.grpc.request")[0]
+		self.assertIs(grpc_span.parent, rpc_span)
+		encode, decode = self.tracer.named("nacos.grpc.encode")[0], self.tracer.named("nacos.grpc.decode")[0]
+		self.assertIs(encode.parent, grpc_span)
+		self.assertIs(decode.parent, grpc_span)
+		self.assertEqual(decode.attributes["nacos.type"], "QueryServiceResponse")
+		self.assertGreater(encode.attributes["nacos.body_size"], 0)
+
+	async def test_listener_span_records_error(self):
+		async def listener(instances):
+			raise ValueError("listener failed")
+
+		manager = SubscribeManager()
+		await manager.add_callback_func("DEFAULT_GROUP@@svc", "", SubscribeCallbackFuncWrapper(ClusterSelector(None), listener))
+		with self.assertRaises(ValueError):
+			await manager.service_changed("DEFAULT_GROUP@@svc", Service(name="svc", groupName="DEFAULT_GROUP"))
+		span = self.tracer.named("nacos.naming.notify")[0]
+		self.assertEqual(span.attributes["nacos.service"], "DEFAULT_GROUP@@svc")
+		self.assertIsInstance(span.exception, ValueError)
+
+	def test_open_telemetry_span_becomes_current(self):
+		try:
+			from opentelemetry import trace
+		except ImportError:
+			self.skipTest("opentelemetry-api is not installed")
+		parent = trace.NonRecordingSpan(trace.SpanContext(trace_id=0x1234, span_id=0x5678, is_remote=False))
+		tracer = OpenTelemetryTracer()
+		with trace.use_span(parent):
+			with tracer.start_span("nacos.rpc.request") as span:
+				span.set_attribute("nacos.request_type", "ServiceQueryRequest")
+				self.assertIs(trace.get_current_span(), span._span)
+				self.assertEqual(span._span.get_span_context().trace_id, 0x1234)
+			self.assertIs(trace.get_current_span(), parent)
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -5,6 +5,8 @@ from .common.client_config import (KMSConfig,
                                    TLSConfig,
                                    ClientConfig)
 from .common.client_config_builder import ClientConfigBuilder
+from .common.metrics import metrics, MetricsRegistry
+from .common.tracing import Span, Tracer, OpenTelemetryTracer, set_tracer
 from .common.nacos_exception import NacosException
 from .config.model.config_param import ConfigParam
 from .config.nacos_config_service import NacosConfigService
@@ -26,6 +28,12 @@ __all__ = [
     "TLSConfig",
     "ClientConfig",
     "ClientConfigBuilder",
+    "metrics",
+    "MetricsRegistry",
+    "Span",
+    "Tracer",
+    "OpenTelemetryTracer",
+    "set_tracer",
     "NacosException",
     "ConfigParam",
     "NacosConfigService",
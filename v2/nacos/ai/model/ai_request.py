@@ -58,6 +58,9 @@ class QueryAgentCardRequest(AbstractAgentRequest):
 		"""Returns the query agent card request type"""
 		return QUERY_AGENT_CARD_REQUEST_TYPE
 
+	def is_read_only(self) -> bool:
+		return True
+
 
 class ReleaseAgentCardRequest(AbstractAgentRequest):
 	"""Request for releasing/publishing a new Agent to the registry"""
@@ -102,6 +105,9 @@ class QueryMcpServerRequest(AbstractMcpRequest):
 		"""Returns the query MCP server request type"""
 		return QUERY_MCP_SERVER_REQUEST_TYPE
 
+	def is_read_only(self) -> bool:
+		return True
+
 
 class McpServerEndpointRequest(AbstractMcpRequest):
 	"""Request for registering or deregistering MCP server endpoint"""
@@ -155,3 +161,6 @@ class QueryPromptRequest(AbstractPromptRequest):
 
 	def get_request_type(self) -> str:
 		return QUERY_PROMPT_REQUEST_TYPE
+
+	def is_read_only(self) -> bool:
+		return True
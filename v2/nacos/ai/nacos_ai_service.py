@@ -75,6 +75,8 @@ class NacosAIService(NacosClient):
 
 	async def start(self):
 		await self.grpc_client_proxy.start(self.mcp_server_cache_holder, self.agent_info_cache_holder)
+		# a shared connection brings its connector only on start
+		self.http_client_proxy.nacos_server_connector = self.grpc_client_proxy.nacos_server_connector
 
 
 	async def get_mcp_server(self, param:GetMcpServerParam) -> McpServerDetailInfo:
@@ -237,6 +239,7 @@ class NacosAIService(NacosClient):
 		await self.mcp_server_cache_holder.shutdown()
 		await self.agent_info_cache_holder.shutdown()
 		await self.prompt_cache_holder.shutdown()
+		await self.http_agent.close()
 
 	# ==================== Skill Download Methods ====================
 
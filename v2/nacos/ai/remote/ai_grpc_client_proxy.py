@@ -1,6 +1,3 @@
-import base64
-import hashlib
-import hmac
 import logging
 import uuid
 from typing import Optional
@@ -25,14 +22,16 @@ from v2.nacos.ai.model.mcp.mcp import McpServerBasicInfo, McpToolSpecification,
 	McpEndpointSpec, McpServerDetailInfo
 from v2.nacos.ai.redo.ai_grpc_redo_service import AIGrpcRedoService
 from v2.nacos.common.constants import Constants
+from v2.nacos.common.metrics import metrics
 from v2.nacos.common.nacos_exception import SERVER_ERROR, SERVER_NOT_IMPLEMENTED
 from v2.nacos.transport.ability import AbilityKey, AbilityStatus
 from v2.nacos.transport.http_agent import HttpAgent
 from v2.nacos.transport.nacos_server_connector import NacosServerConnector
+from v2.nacos.transport.request_signer import RequestSigner
 from v2.nacos.transport.rpc_client import ConnectionType
 from v2.nacos.transport.rpc_client_factory import RpcClientFactory
-from v2.nacos.utils.common_util import get_current_time_millis
-from v2.nacos.utils.md5_util import md5
+from v2.nacos.transport.shared_rpc_client import shared_rpc_clients
+from v2.nacos.transport.single_flight import SingleFlight
 
 
 class AIGRPCClientProxy:
@@ -46,16 +45,25 @@ class AIGRPCClientProxy:
 		self.client_config = client_config
 		self.uuid = uuid.uuid4()
 
+		self.http_client = http_client
 		self.rpc_client = None
+		self.rpc_client_lease = None
 		self.app_name = self.client_config.app_name if self.client_config.app_name else "unknown"
+		self.request_signer = RequestSigner(client_config, {
+			Constants.CLIENT_APPNAME_HEADER: self.app_name,
+			Constants.CHARSET_KEY: "utf-8",
+		})
+		# concurrent identical queries share one request
+		self.single_flight = SingleFlight()
+		metrics.register_collector(f"ai_proxy.{self.uuid}.single_flight", self.single_flight.snapshot)
 		if not client_config.namespace_id or len(client_config.namespace_id) == 0 :
 			self.namespace_id = "public"
 		else:
 			self.namespace_id = client_config.namespace_id
 
-		self.nacos_server_connector = NacosServerConnector(self.logger,
-														   client_config,
-														   http_client)
+		# with a shared connection the connector comes with the shared rpc client on start
+		self.nacos_server_connector = None if client_config.shared_connection else \
+			NacosServerConnector(self.logger, client_config, http_client)
 
 		self.redo_service = AIGrpcRedoService(self)
 
@@ -63,6 +71,15 @@ class AIGRPCClientProxy:
 		self.cache_holder = mcp_server_cache_holder
 		self.agent_cache_holder = agent_info_cache_holder
 
+		if self.client_config.shared_connection:
+			self.rpc_client_lease = await shared_rpc_clients.acquire(
+				self.logger, self.client_config, Constants.AI_MODULE)
+			self.rpc_client = self.rpc_client_lease.rpc_client
+			self.nacos_server_connector = self.rpc_client_lease.nacos_server
+			await self.rpc_client_lease.register_connection_listener(self.redo_service)
+			await self.rpc_client_lease.start()
+			return
+
 		await self.nacos_server_connector.init()
 		labels = {Constants.LABEL_SOURCE: Constants.LABEL_SOURCE_SDK,
 				  Constants.LABEL_MODULE: Constants.AI_MODULE}
@@ -81,35 +98,7 @@ class AIGRPCClientProxy:
 			await self.nacos_server_connector.inject_security_info(
 				request.get_headers())
 
-			now = get_current_time_millis()
-			request.put_all_headers({
-				Constants.CLIENT_APPNAME_HEADER: self.app_name,
-				Constants.CLIENT_REQUEST_TS_HEADER: str(now),
-				Constants.CLIENT_REQUEST_TOKEN_HEADER: md5(
-					str(now) + self.client_config.app_key),
-				Constants.CHARSET_KEY: "utf-8",
-				'Timestamp': str(now),
-			})
-
-			credentials = self.client_config.credentials_provider.get_credentials()
-			if credentials.get_access_key_id() and credentials.get_access_key_secret():
-				resource = request.namespaceId + "+" + "DEFAULT_GROUP"
-				if resource.strip():
-					sign_str = f"{resource}+{now}"
-				else:
-					sign_str = str(now)
-
-				request.put_all_headers({
-					'Spas-AccessKey': credentials.get_access_key_id(),
-					'Spas-Signature': base64.encodebytes(
-							hmac.new(
-								credentials.get_access_key_secret().encode(),
-								sign_str.encode(),
-								digestmod=hashlib.sha1).digest()).decode().strip(),
-				})
-				if credentials.get_security_token():
-					request.put_header("Spas-SecurityToken",
-									   credentials.get_security_token())
+			self.request_signer.sign(request.get_headers(), request.namespaceId + "+" + "DEFAULT_GROUP")
 
 			response = await self.rpc_client.request(request,
 												self.client_config.grpc_config.grpc_timeout)
@@ -146,7 +135,8 @@ class AIGRPCClientProxy:
 				version=version,
 		)
 
-		response = await self.request_ai_server(request, QueryMcpServerResponse)
+		response = await self.single_flight.do(("mcp", mcp_name, version),
+				lambda: self.request_ai_server(request, QueryMcpServerResponse))
 		return response.mcpServerDetailInfo
 
 	async def release_mcp_server(self,server_spec: McpServerBasicInfo, tool_spec: McpToolSpecification, endpoint_spec: McpEndpointSpec):
@@ -230,7 +220,8 @@ class AIGRPCClientProxy:
 				version=version,
 				registrationType=registration_type
 		)
-		response = await self.request_ai_server(request, QueryAgentCardResponse)
+		response = await self.single_flight.do(("agent", agent_name, version, registration_type),
+				lambda: self.request_ai_server(request, QueryAgentCardResponse))
 		return response.agentCardDetailInfo
 
 	async def release_agent_card(self, agent_card: AgentCard, registration_type: str, set_as_latest: bool):
@@ -308,12 +299,18 @@ class AIGRPCClientProxy:
 			label=label,
 			md5=md5_value,
 		)
-		response = await self.request_ai_server(request, QueryPromptResponse)
+		response = await self.single_flight.do(("prompt", prompt_key, version, label, md5_value),
+				lambda: self.request_ai_server(request, QueryPromptResponse))
 		return response.promptInfo if response.promptInfo else Prompt()
 
 	async def close_client(self):
 		self.logger.info("close Nacos python ai grpc client...")
+		metrics.unregister_collector(f"ai_proxy.{self.uuid}.single_flight")
+		if self.rpc_client_lease:
+			await self.rpc_client_lease.release()
+			return
 		await self.rpc_client.shutdown()
+		await self.nacos_server_connector.close()
 
 	def is_enabled(self):
 		return self.rpc_client.is_running()
\ No newline at end of file
@@ -1,6 +1,3 @@
-import base64
-import hashlib
-import hmac
 import json
 import logging
 from random import randrange
@@ -14,8 +11,7 @@ from v2.nacos.common.constants import Constants
 from v2.nacos.common.nacos_exception import NacosException, SERVER_ERROR, NOT_MODIFIED, NOT_FOUND
 from v2.nacos.transport.http_agent import HttpAgent
 from v2.nacos.transport.nacos_server_connector import NacosServerConnector
-from v2.nacos.utils.common_util import get_current_time_millis
-from v2.nacos.utils.md5_util import md5
+from v2.nacos.transport.request_signer import RequestSigner
 
 PROMPT_CLIENT_PATH = "/v3/client/ai/prompt"
 MAX_RETRY = 3
@@ -43,6 +39,12 @@ class AiHttpClientProxy:
 			self.namespace_id = client_config.namespace_id
 
 		self.app_name = client_config.app_name if client_config.app_name else "unknown"
+		self.request_signer = RequestSigner(client_config, {
+			Constants.CLIENT_APPNAME_HEADER: self.app_name,
+			Constants.CHARSET_KEY: "utf-8",
+			'Client-Version': Constants.CLIENT_VERSION,
+			'User-Agent': Constants.CLIENT_VERSION,
+		})
 		self.http_agent = http_agent
 		self.nacos_server_connector = nacos_server_connector
 
@@ -219,34 +221,7 @@ class AiHttpClientProxy:
 	async def _build_headers(self) -> dict:
 		headers = {}
 		await self.nacos_server_connector.inject_security_info(headers)
-
-		now = get_current_time_millis()
-		headers[Constants.CLIENT_APPNAME_HEADER] = self.app_name
-		headers[Constants.CLIENT_REQUEST_TS_HEADER] = str(now)
-		headers[Constants.CLIENT_REQUEST_TOKEN_HEADER] = md5(
-			str(now) + self.client_config.app_key)
-		headers[Constants.CHARSET_KEY] = "utf-8"
-		headers['Timestamp'] = str(now)
-		headers['Client-Version'] = Constants.CLIENT_VERSION
-		headers['User-Agent'] = Constants.CLIENT_VERSION
-
-		credentials = self.client_config.credentials_provider.get_credentials()
-		if credentials.get_access_key_id() and credentials.get_access_key_secret():
-			resource = self.namespace_id + "+" + "DEFAULT_GROUP"
-			if resource.strip():
-				sign_str = f"{resource}+{now}"
-			else:
-				sign_str = str(now)
-
-			headers['Spas-AccessKey'] = credentials.get_access_key_id()
-			headers['Spas-Signature'] = base64.encodebytes(
-				hmac.new(
-					credentials.get_access_key_secret().encode(),
-					sign_str.encode(),
-					digestmod=hashlib.sha1).digest()).decode().strip()
-			if credentials.get_security_token():
-				headers['Spas-SecurityToken'] = credentials.get_security_token()
-
+		self.request_signer.sign(headers, self.namespace_id + "+" + "DEFAULT_GROUP")
 		return headers
 
 	async def close(self):
@@ -1,4 +1,5 @@
 import logging
+from typing import Dict
 
 from v2.nacos.common.constants import Constants
 from v2.nacos.common.nacos_exception import NacosException, INVALID_PARAM
@@ -36,7 +37,27 @@ class GRPCConfig:
                  initial_conn_window_size=Constants.GRPC_INITIAL_CONN_WINDOW_SIZE,
                  grpc_timeout=Constants.DEFAULT_GRPC_TIMEOUT_MILLS,
                  port_offset=Constants.GRPC_PORT_OFFSET,
-                 capability_negotiation_timeout=Constants.GRPC_CAPABILITY_NEGOTIATION_TIMEOUT):
+                 capability_negotiation_timeout=Constants.GRPC_CAPABILITY_NEGOTIATION_TIMEOUT,
+                 codec=Constants.GRPC_DEFAULT_CODEC,
+                 bi_stream_request_enabled=False,
+                 channel_pool_size=Constants.GRPC_CHANNEL_POOL_SIZE,
+                 connect_race_size=Constants.GRPC_CONNECT_RACE_SIZE,
+                 connect_race_stagger_ms=Constants.GRPC_CONNECT_RACE_STAGGER_MILLS,
+                 reconnect_backoff_base_ms=Constants.GRPC_RECONNECT_BACKOFF_BASE_MILLS,
+                 reconnect_backoff_max_ms=Constants.GRPC_RECONNECT_BACKOFF_MAX_MILLS,
+                 circuit_breaker_enabled=False,
+                 circuit_failure_threshold=Constants.GRPC_CIRCUIT_FAILURE_THRESHOLD,
+                 circuit_open_base_ms=Constants.GRPC_CIRCUIT_OPEN_BASE_MILLS,
+                 circuit_open_max_ms=Constants.GRPC_CIRCUIT_OPEN_MAX_MILLS,
+                 hedge_enabled=False,
+                 hedge_percentile=Constants.GRPC_HEDGE_PERCENTILE,
+                 hedge_min_delay_ms=Constants.GRPC_HEDGE_MIN_DELAY_MILLS,
+                 hedge_budget_percent=Constants.GRPC_HEDGE_BUDGET_PERCENT,
+                 push_workers=Constants.GRPC_PUSH_WORKERS,
+                 push_queue_size=Constants.GRPC_PUSH_QUEUE_SIZE,
+                 bi_stream_queue_size=Constants.GRPC_BI_STREAM_QUEUE_SIZE,
+                 push_record_path=None,
+                 push_record_max_bytes=0):
         self.max_receive_message_length = max_receive_message_length
         self.max_keep_alive_ms = max_keep_alive_ms
         self.initial_window_size = initial_window_size
@@ -44,6 +65,26 @@ class GRPCConfig:
         self.grpc_timeout = grpc_timeout
         self.port_offset = port_offset  # gRPC port offset, default 1000
         self.capability_negotiation_timeout = capability_negotiation_timeout
+        self.codec = codec  # payload codec: json (stdlib), pydantic or orjson
+        self.bi_stream_request_enabled = bi_stream_request_enabled  # send requests on the bi stream, unary as fallback
+        self.channel_pool_size = channel_pool_size  # connections per server, extra ones only serve read only requests
+        self.connect_race_size = connect_race_size  # servers raced on connect and reconnect
+        self.connect_race_stagger_ms = connect_race_stagger_ms  # delay before racing the next server
+        self.reconnect_backoff_base_ms = reconnect_backoff_base_ms  # decorrelated jitter between reconnect attempts
+        self.reconnect_backoff_max_ms = reconnect_backoff_max_ms
+        self.circuit_breaker_enabled = circuit_breaker_enabled  # skip servers that keep failing for a while
+        self.circuit_failure_threshold = circuit_failure_threshold
+        self.circuit_open_base_ms = circuit_open_base_ms
+        self.circuit_open_max_ms = circuit_open_max_ms
+        self.hedge_enabled = hedge_enabled  # resend slow read only requests to a second connection
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_delay_ms = hedge_min_delay_ms
+        self.hedge_budget_percent = hedge_budget_percent
+        self.push_workers = push_workers  # pushes of different services or configs are handled concurrently
+        self.push_queue_size = push_queue_size
+        self.bi_stream_queue_size = bi_stream_queue_size  # outbound payloads buffered per connection
+        self.push_record_path = push_record_path  # append the raw payload of every server push to this file
+        self.push_record_max_bytes = push_record_max_bytes  # 0 records without limit
 
 
 class ClientConfig:
@@ -85,6 +126,22 @@ class ClientConfig:
         self.update_thread_num = 5
         self.ai_transport_mode = "grpc"
         self.ai_prompt_cache_update_interval = 10
+        self.http_pool_size = Constants.HTTP_POOL_SIZE  # max pooled http connections of one client
+        self.http_pool_size_per_host = Constants.HTTP_POOL_SIZE_PER_HOST  # max pooled http connections per server
+        self.http_keep_alive_timeout = Constants.HTTP_KEEP_ALIVE_TIMEOUT  # idle timeout of a pooled connection, second
+        self.shared_connection = False  # naming, config and ai services of the same server and namespace share one rpc client
+        self.server_select_strategy = Constants.SERVER_SELECT_STRATEGY  # round_robin or latency
+        self.auth_token_refresh_ratio = Constants.AUTH_TOKEN_REFRESH_RATIO  # refresh the token after this share of its ttl
+        self.auth_token_cache_enabled = False  # keep the access token encrypted in cache_dir across restarts
+        self.flow_control_enabled = False  # limit the requests sent per request type
+        self.flow_control_threshold = Constants.FLOW_CONTROL_THRESHOLD  # requests per type in FLOW_CONTROL_INTERVAL
+        self.flow_control_wait_ms = Constants.FLOW_CONTROL_WAIT_MILLS  # wait of a request over the limit before rejecting it
+        self.flow_control_rules = {}  # threshold per request type or module, overrides flow_control_threshold
+        self.metrics_enabled = False  # record request, push, cache and listener metrics, see v2.nacos.metrics
+        self.tracer = None  # v2.nacos.common.tracing.Tracer creating the spans of the client, None is a no-op
+        self.use_uvloop = False  # the client expects a uvloop loop, see v2.nacos.utils.loop_util
+        self.slow_callback_warning_ms = 0  # log event loop callbacks running longer, turns on the loop debug mode
+        self.loop_executor_workers = 0  # size of the default executor of the loop (file cache, dns), 0 keeps it
 
     @staticmethod
     def _normalize_context_path(context_path):
@@ -170,3 +227,55 @@ class ClientConfig:
     def set_ai_prompt_cache_update_interval(self, interval: int):
         self.ai_prompt_cache_update_interval = interval
         return self
+
+    def set_http_pool_size(self, http_pool_size: int):
+        self.http_pool_size = http_pool_size
+        return self
+
+    def set_http_pool_size_per_host(self, http_pool_size_per_host: int):
+        self.http_pool_size_per_host = http_pool_size_per_host
+        return self
+
+    def set_http_keep_alive_timeout(self, http_keep_alive_timeout: float):
+        self.http_keep_alive_timeout = http_keep_alive_timeout
+        return self
+
+    def set_shared_connection(self, shared_connection: bool):
+        self.shared_connection = shared_connection
+        return self
+
+    def set_server_select_strategy(self, server_select_strategy: str):
+        self.server_select_strategy = server_select_strategy
+        return self
+
+    def set_auth_token_refresh_ratio(self, auth_token_refresh_ratio: float):
+        self.auth_token_refresh_ratio = auth_token_refresh_ratio
+        return self
+
+    def set_auth_token_cache_enabled(self, auth_token_cache_enabled: bool):
+        self.auth_token_cache_enabled = auth_token_cache_enabled
+        return self
+
+    def set_flow_control_enabled(self, flow_control_enabled: bool):
+        self.flow_control_enabled = flow_control_enabled
+        return self
+
+    def set_flow_control_threshold(self, flow_control_threshold: int):
+        self.flow_control_threshold = flow_control_threshold
+        return self
+
+    def set_flow_control_wait_ms(self, flow_control_wait_ms: int):
+        self.flow_control_wait_ms = flow_control_wait_ms
+        return self
+
+    def set_flow_control_rules(self, flow_control_rules: Dict[str, int]):
+        self.flow_control_rules = flow_control_rules
+        return self
+
+    def set_metrics_enabled(self, metrics_enabled: bool):
+        self.metrics_enabled = metrics_enabled
+        return self
+
+    def set_tracer(self, tracer):
+        self.tracer = tracer
+        return self
@@ -5,6 +5,7 @@ from v2.nacos.common.client_config import ClientConfig, GRPCConfig
 from v2.nacos.common.client_config import KMSConfig
 from v2.nacos.common.client_config import TLSConfig
 from v2.nacos.common.constants import Constants
+from v2.nacos.common.tracing import Tracer
 
 
 class ClientConfigBuilder:
@@ -121,5 +122,69 @@ class ClientConfigBuilder:
         self._config.ai_prompt_cache_update_interval = interval
         return self
 
+    def http_pool_size(self, http_pool_size: int) -> "ClientConfigBuilder":
+        self._config.http_pool_size = http_pool_size
+        return self
+
+    def http_pool_size_per_host(self, http_pool_size_per_host: int) -> "ClientConfigBuilder":
+        self._config.http_pool_size_per_host = http_pool_size_per_host
+        return self
+
+    def http_keep_alive_timeout(self, http_keep_alive_timeout: float) -> "ClientConfigBuilder":
+        self._config.http_keep_alive_timeout = http_keep_alive_timeout
+        return self
+
+    def shared_connection(self, shared_connection: bool) -> "ClientConfigBuilder":
+        self._config.shared_connection = shared_connection
+        return self
+
+    def server_select_strategy(self, server_select_strategy: str) -> "ClientConfigBuilder":
+        self._config.server_select_strategy = server_select_strategy
+        return self
+
+    def auth_token_refresh_ratio(self, auth_token_refresh_ratio: float) -> "ClientConfigBuilder":
+        self._config.auth_token_refresh_ratio = auth_token_refresh_ratio
+        return self
+
+    def auth_token_cache_enabled(self, auth_token_cache_enabled: bool) -> "ClientConfigBuilder":
+        self._config.auth_token_cache_enabled = auth_token_cache_enabled
+        return self
+
+    def flow_control_enabled(self, flow_control_enabled: bool) -> "ClientConfigBuilder":
+        self._config.flow_control_enabled = flow_control_enabled
+        return self
+
+    def flow_control_threshold(self, flow_control_threshold: int) -> "ClientConfigBuilder":
+        self._config.flow_control_threshold = flow_control_threshold
+        return self
+
+    def flow_control_wait_ms(self, flow_control_wait_ms: int) -> "ClientConfigBuilder":
+        self._config.flow_control_wait_ms = flow_control_wait_ms
+        return self
+
+    def flow_control_rules(self, flow_control_rules: Dict[str, int]) -> "ClientConfigBuilder":
+        self._config.flow_control_rules = flow_control_rules
+        return self
+
+    def metrics_enabled(self, metrics_enabled: bool) -> "ClientConfigBuilder":
+        self._config.metrics_enabled = metrics_enabled
+        return self
+
+    def tracer(self, tracer: Tracer) -> "ClientConfigBuilder":
+        self._config.tracer = tracer
+        return self
+
+    def use_uvloop(self, use_uvloop: bool) -> "ClientConfigBuilder":
+        self._config.use_uvloop = use_uvloop
+        return self
+
+    def slow_callback_warning_ms(self, slow_callback_warning_ms: int) -> "ClientConfigBuilder":
+        self._config.slow_callback_warning_ms = slow_callback_warning_ms
+        return self
+
+    def loop_executor_workers(self, loop_executor_workers: int) -> "ClientConfigBuilder":
+        self._config.loop_executor_workers = loop_executor_workers
+        return self
+
     def build(self):
         return self._config
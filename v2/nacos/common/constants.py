@@ -118,6 +118,12 @@ class Constants:
 
     FLOW_CONTROL_INTERVAL = 1000
 
+    # how long a request over the flow control threshold waits before it is rejected, millisecond
+    FLOW_CONTROL_WAIT_MILLS = 1000
+
+    # interval of the info log lines of pushes of one type, second
+    PUSH_LOG_INTERVAL = 1
+
     DEFAULT_PROTECT_THRESHOLD = 0.0
 
     LINE_SEPARATOR = chr(1)
@@ -224,8 +230,75 @@ class Constants:
 
     GRPC_PORT_OFFSET = 1000  # gRPC port = HTTP port + offset
 
+    GRPC_DEFAULT_CODEC = "json"  # payload codec: json, pydantic or orjson
+    GRPC_CHANNEL_POOL_SIZE = 1  # connections kept to the connected server by each rpc client
+
+    GRPC_CONNECT_RACE_SIZE = 1
+
+    GRPC_CONNECT_RACE_STAGGER_MILLS = 250
+
+    GRPC_RECONNECT_BACKOFF_BASE_MILLS = 100
+
+    GRPC_RECONNECT_BACKOFF_MAX_MILLS = 5000
+
+    GRPC_CIRCUIT_FAILURE_THRESHOLD = 3  # consecutive failures that open the circuit of a server
+
+    GRPC_CIRCUIT_OPEN_BASE_MILLS = 1000
+
+    GRPC_CIRCUIT_OPEN_MAX_MILLS = 30000
+
+    GRPC_HEDGE_PERCENTILE = 95  # reads slower than this percentile of recent reads are hedged
+
+    GRPC_HEDGE_MIN_DELAY_MILLS = 10
+
+    GRPC_HEDGE_BUDGET_PERCENT = 10  # hedges allowed per 100 reads
+
+    GRPC_HEDGE_LATENCY_WINDOW = 512
+
+    GRPC_PUSH_WORKERS = 4  # workers handling server pushes of one rpc client
+
+    GRPC_PUSH_QUEUE_SIZE = 1024
+
+    GRPC_PUSH_SLOW_HANDLE_MILLS = 1000
+
+    GRPC_BI_STREAM_QUEUE_SIZE = 1024  # payloads waiting to be written to the bi stream of a connection
+
+    GRPC_BI_STREAM_PUT_TIMEOUT_MILLS = 3000
+
+    AUTH_TOKEN_REFRESH_RATIO = 0.8
+
+    AUTH_TOKEN_REFRESH_RETRY_INTERVAL = 10  # seconds between refresh attempts after a failed login
+
+    SERVER_LIST_REFRESH_INTERVAL = 30  # seconds between server list refreshes from the endpoint
+
+    SERVER_LIST_REFRESH_JITTER = 0.2
+
+    SERVER_SELECT_STRATEGY = "round_robin"  # round_robin or latency
+
+    SERVER_EWMA_ALPHA = 0.3  # weight of the newest rtt and error sample
+
+    SERVER_ERROR_PENALTY = 10  # score = rtt * (1 + penalty * error rate)
+
+    SERVER_ERROR_RATE_HALF_LIFE = 30  # seconds
+
+    SERVER_ERROR_RATE_IGNORED = 0.01
+
+    SERVER_PROBE_INTERVAL = 30  # seconds between tcp probes of every server with the latency strategy
+
+    SERVER_PROBE_TIMEOUT = 1  # seconds
+
     DEFAULT_TIMEOUT_MILLS = 10000
 
+    HTTP_POOL_SIZE = 100
+
+    HTTP_POOL_SIZE_PER_HOST = 16
+
+    # second.
+    HTTP_KEEP_ALIVE_TIMEOUT = 30
+
+    # second.
+    HTTP_DNS_CACHE_TTL = 60
+
     PER_TASK_CONFIG_SIZE = 3000
 
     MSE_KMS_V1_DEFAULT_KEY_ID = "alias/acs/mse"
@@ -0,0 +1,138 @@
+import weakref
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# upper bounds of the latency histograms, millisecond
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+_LabelKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+def _key(name: str, labels: Dict[str, object]) -> _LabelKey:
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _ref(func: Callable):
+    # bound methods are held weakly, so registering one does not keep its object alive
+    if hasattr(func, "__self__") and hasattr(func, "__func__"):
+        return weakref.WeakMethod(func)
+    return lambda: func
+
+
+class Counter:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount: int = 1) -> None:
+        self.value += amount
+
+
+class Histogram:
+    """Counts of observations per fixed bucket, the last count is for values above every bound."""
+
+    __slots__ = ("bounds", "counts", "count", "sum")
+
+    def __init__(self, bounds: Sequence[float] = LATENCY_BUCKETS_MS):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def to_dict(self) -> dict:
+        buckets = {str(bound): count for bound, count in zip(self.bounds, self.counts)}
+        buckets["+Inf"] = self.counts[-1]
+        return {"buckets": buckets, "count": self.count, "sum": round(self.sum, 3)}
+
+
+class MetricsRegistry:
+    """Counters, gauges and histograms of the clients of this process.
+
+    Instrumented code checks enabled before touching the registry, so disabled metrics cost one
+    attribute read. Gauges and collectors are functions evaluated on snapshot(); gauges of the same
+    name and labels registered by several objects are summed.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._counters: Dict[_LabelKey, Counter] = {}
+        self._histograms: Dict[_LabelKey, Histogram] = {}
+        self._gauges: Dict[_LabelKey, List[Callable]] = {}
+        self._collectors: Dict[str, Callable] = {}
+
+    def enable(self, enabled: bool = True) -> None:
+        self.enabled = enabled
+
+    def counter(self, name: str, **labels) -> Counter:
+        key = _key(name, labels)
+        counter = self._counters.get(key)
+        if counter is None:
+            counter = Counter()
+            self._counters[key] = counter
+        return counter
+
+    def histogram(self, name: str, bounds: Sequence[float] = LATENCY_BUCKETS_MS, **labels) -> Histogram:
+        key = _key(name, labels)
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            histogram = Histogram(bounds)
+            self._histograms[key] = histogram
+        return histogram
+
+    def register_gauge(self, name: str, func: Callable[[], float], **labels) -> None:
+        self._gauges.setdefault(_key(name, labels), []).append(_ref(func))
+
+    def register_collector(self, name: str, func: Callable[[], dict]) -> None:
+        """func returns a dict of the state of one component, e.g. the snapshot of a queue."""
+        self._collectors[name] = _ref(func)
+
+    def unregister_collector(self, name: str) -> None:
+        self._collectors.pop(name, None)
+
+    def _collect_gauge(self, refs: List[Callable]) -> Optional[float]:
+        total, alive = 0, []
+        for ref in refs:
+            func = ref()
+            if func is not None:
+                total += func()
+                alive.append(ref)
+        refs[:] = alive
+        return total if alive else None
+
+    def snapshot(self) -> dict:
+        gauges = []
+        for (name, labels), refs in list(self._gauges.items()):
+            value = self._collect_gauge(refs)
+            if value is None:
+                del self._gauges[(name, labels)]
+                continue
+            gauges.append({"name": name, "labels": dict(labels), "value": value})
+        collectors = {}
+        for name, ref in list(self._collectors.items()):
+            func = ref()
+            if func is None:
+                del self._collectors[name]
+                continue
+            collectors[name] = func()
+        return {
+            "counters": [{"name": name, "labels": dict(labels), "value": counter.value}
+                         for (name, labels), counter in self._counters.items()],
+            "gauges": gauges,
+            "histograms": [dict(name=name, labels=dict(labels), **histogram.to_dict())
+                           for (name, labels), histogram in self._histograms.items()],
+            "collectors": collectors,
+        }
+
+    def reset(self) -> None:
+        """Drops the counters and histograms, gauges and collectors stay registered."""
+        self._counters.clear()
+        self._histograms.clear()
+
+
+metrics = MetricsRegistry()
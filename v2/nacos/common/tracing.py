@@ -0,0 +1,97 @@
+from typing import Optional
+
+from v2.nacos.common.nacos_exception import NacosException, CLIENT_INVALID_PARAM
+
+
+class Span:
+    """One timed phase of a call. This base class records nothing, it is the span of the no-op tracer.
+
+    Spans are used as context managers: an exception leaving the block is recorded on the span,
+    and the span ends when the block is left.
+    """
+
+    def set_attribute(self, key: str, value) -> None:
+        pass
+
+    def record_exception(self, exception: BaseException) -> None:
+        pass
+
+    def end(self) -> None:
+        pass
+
+    def __enter__(self) -> "Span":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc is not None:
+            self.record_exception(exc)
+        self.end()
+        return False
+
+
+NOOP_SPAN = Span()
+
+
+class Tracer:
+    """Creates the spans of the client, the default tracer is a no-op."""
+
+    def start_span(self, name: str, attributes: Optional[dict] = None) -> Span:
+        return NOOP_SPAN
+
+
+class OpenTelemetryTracer(Tracer):
+    """Tracer backed by OpenTelemetry, spans become children of the span current in the caller."""
+
+    def __init__(self, tracer_provider=None):
+        try:
+            from opentelemetry import trace
+        except ImportError:
+            raise NacosException(CLIENT_INVALID_PARAM, "OpenTelemetryTracer requires the opentelemetry-api package")
+        self._trace = trace
+        self._tracer = trace.get_tracer("nacos-sdk-python", tracer_provider=tracer_provider)
+
+    def start_span(self, name: str, attributes: Optional[dict] = None) -> Span:
+        return _OpenTelemetrySpan(self._trace, self._tracer.start_span(name, attributes=attributes))
+
+
+class _OpenTelemetrySpan(Span):
+
+    def __init__(self, trace, span):
+        self._span = span
+        # made current while the block runs, so nested spans get it as parent
+        self._scope = trace.use_span(span, end_on_exit=True)
+
+    def set_attribute(self, key: str, value) -> None:
+        self._span.set_attribute(key, value)
+
+    def record_exception(self, exception: BaseException) -> None:
+        self._span.record_exception(exception)
+
+    def end(self) -> None:
+        self._span.end()
+
+    def __enter__(self) -> "Span":
+        self._scope.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # use_span records the exception, sets the error status and ends the span
+        self._scope.__exit__(exc_type, exc, tb)
+        return False
+
+
+_tracer: Tracer = Tracer()
+
+
+def set_tracer(tracer: Optional[Tracer]) -> None:
+    """Sets the tracer of every client of the process, None restores the no-op tracer."""
+    global _tracer
+    _tracer = tracer if tracer is not None else Tracer()
+
+
+def get_tracer() -> Tracer:
+    return _tracer
+
+
+def start_span(name: str, attributes: Optional[dict] = None) -> Span:
+    return _tracer.start_span(name, attributes)
@@ -3,6 +3,7 @@ import os
 
 from v2.nacos.common.client_config import ClientConfig
 from v2.nacos.common.constants import Constants
+from v2.nacos.common.metrics import metrics
 from v2.nacos.config.util.config_client_util import get_config_cache_key
 from v2.nacos.utils.file_util import read_file, write_to_file
 
@@ -27,6 +28,9 @@ class ConfigInfoCache:
         cache_key = get_config_cache_key(data_id, group, self.namespace_id)
         file_path = os.path.join(self.config_cache_dir, cache_key)
         config_content = await read_file(self.logger, file_path)
+        if metrics.enabled:
+            metrics.counter("nacos_client_config_cache_total", cache="snapshot",
+                            result="hit" if config_content else "miss").inc()
         if not data_id.startswith(Constants.CIPHER_PRE_FIX):
             return config_content, ""
         else:
@@ -39,6 +43,9 @@ class ConfigInfoCache:
         cache_key = get_config_cache_key(data_id, group, self.namespace_id) + FAILOVER_FILE_SUFFIX
         file_path = os.path.join(self.config_cache_dir, cache_key)
         config_content = await read_file(self.logger, file_path)
+        if metrics.enabled:
+            metrics.counter("nacos_client_config_cache_total", cache="failover",
+                            result="hit" if config_content else "miss").inc()
         if not config_content:
             return "", ""
         self.logger.info(f"get fail over content, namespace:{self.namespace_id}, group:{group}, dataId:{data_id}")
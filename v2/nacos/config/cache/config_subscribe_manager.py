@@ -3,6 +3,7 @@ from logging import Logger
 from typing import Optional, Callable, List, Dict
 
 from v2.nacos.common.constants import Constants
+from v2.nacos.common.metrics import metrics
 from v2.nacos.config.cache.config_info_cache import ConfigInfoCache
 from v2.nacos.config.filter.config_filter import ConfigFilterChainManager
 from v2.nacos.config.model.config import SubscribeCacheData
@@ -22,6 +23,10 @@ class ConfigSubscribeManager:
         self.config_filter_chain_manager = config_filter_chain_manager
         self.config_info_cache = config_info_cache
         self.execute_config_listen_channel = execute_config_listen_channel
+        metrics.register_gauge("nacos_client_config_subscribe_cache_size", self.size, namespace=namespace_id)
+
+    def size(self) -> int:
+        return len(self.subscribe_cache_map)
 
     async def add_listener(self, data_id: str, group_name: str, tenant: str,
                            listener: Optional[Callable]):
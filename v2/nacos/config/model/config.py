@@ -1,9 +1,12 @@
 import asyncio
+import time
 from typing import Optional, Callable, List
 
 from pydantic import BaseModel
 
+from v2.nacos.common.metrics import metrics
 from v2.nacos.common.nacos_exception import NacosException, INVALID_PARAM
+from v2.nacos.common.tracing import start_span
 from v2.nacos.config.filter.config_filter import ConfigFilterChainManager
 from v2.nacos.config.model.config_param import ConfigParam, UsageType
 
@@ -86,7 +89,14 @@ class SubscribeCacheData:
                                         )
                     self.config_chain_manager.do_filters(param)
                     decrypted_content = param.content
-                    await listener_wrap.listener(self.tenant, self.group, self.data_id, decrypted_content)
+                    begin = time.perf_counter() if metrics.enabled else None
+                    with start_span("nacos.config.notify") as span:
+                        span.set_attribute("nacos.data_id", self.data_id)
+                        span.set_attribute("nacos.group", self.group)
+                        await listener_wrap.listener(self.tenant, self.group, self.data_id, decrypted_content)
+                    if begin is not None:
+                        metrics.histogram("nacos_client_listener_ms", module="config").observe(
+                            (time.perf_counter() - begin) * 1000)
 
 
 class CacheDataListenerWrap:
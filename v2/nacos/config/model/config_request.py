@@ -35,6 +35,9 @@ class ConfigChangeNotifyRequest(AbstractConfigRequest):
     def get_request_type(self):
         return "ConfigChangeNotifyRequest"
 
+    def get_dispatch_key(self) -> str:
+        return f"{self.tenant}+{self.group}+{self.dataId}"
+
 
 class ConfigQueryRequest(AbstractConfigRequest):
     tag: Optional[str] = ''
@@ -42,6 +45,9 @@ class ConfigQueryRequest(AbstractConfigRequest):
     def get_request_type(self):
         return "ConfigQueryRequest"
 
+    def is_read_only(self) -> bool:
+        return True
+
 
 class ConfigPublishRequest(AbstractConfigRequest):
     content: Optional[str]
@@ -120,3 +120,4 @@ class NacosConfigService(NacosClient):
     async def shutdown(self):
         """关闭资源服务"""
         await self.grpc_client_proxy.close_client()
+        await self.http_agent.close()
@@ -1,13 +1,11 @@
 import asyncio
-import base64
-import hashlib
-import hmac
 import logging
 import uuid
 from typing import Callable
 
 from v2.nacos.common.client_config import ClientConfig
 from v2.nacos.common.constants import Constants
+from v2.nacos.common.metrics import metrics
 from v2.nacos.common.nacos_exception import NacosException, SERVER_ERROR, CLIENT_OVER_THRESHOLD
 from v2.nacos.config.cache.config_info_cache import ConfigInfoCache
 from v2.nacos.config.cache.config_subscribe_manager import ConfigSubscribeManager
@@ -23,10 +21,12 @@ from v2.nacos.config.remote.config_grpc_connection_event_listener import ConfigG
 from v2.nacos.config.util.config_client_util import get_config_cache_key
 from v2.nacos.transport.http_agent import HttpAgent
 from v2.nacos.transport.nacos_server_connector import NacosServerConnector
+from v2.nacos.transport.request_signer import RequestSigner
 from v2.nacos.transport.rpc_client import ConnectionType, RpcClient
 from v2.nacos.transport.rpc_client_factory import RpcClientFactory
+from v2.nacos.transport.shared_rpc_client import shared_rpc_clients
+from v2.nacos.transport.single_flight import SingleFlight
 from v2.nacos.utils.common_util import get_current_time_millis
-from v2.nacos.utils.md5_util import md5
 
 
 class ConfigGRPCClientProxy:
@@ -38,11 +38,22 @@ class ConfigGRPCClientProxy:
         self.logger = logging.getLogger(Constants.CONFIG_MODULE)
         self.client_config = client_config
         self.namespace_id = client_config.namespace_id
-        self.nacos_server_connector = NacosServerConnector(self.logger, self.client_config, http_agent)
+        self.http_agent = http_agent
+        # with a shared connection the connector comes with the shared rpc client on start
+        self.nacos_server_connector = None if client_config.shared_connection else \
+            NacosServerConnector(self.logger, self.client_config, http_agent)
+        self.rpc_client_lease = None
         self.config_info_cache = config_info_cache
         self.uuid = uuid.uuid4()
         self.app_name = self.client_config.app_name if self.client_config.app_name else "unknown"
+        self.request_signer = RequestSigner(client_config, {
+            Constants.CLIENT_APPNAME_HEADER: self.app_name,
+            Constants.EX_CONFIG_INFO: "true",
+            Constants.CHARSET_KEY: "utf-8",
+        })
         self.rpc_client_manager = RpcClientFactory(self.logger)
+        self.single_flight = SingleFlight()
+        metrics.register_collector(f"config_proxy.{self.uuid}.single_flight", self.single_flight.snapshot)
         self.execute_config_listen_channel = asyncio.Queue()
         self.stop_event = asyncio.Event()
         self.listen_task = asyncio.create_task(self._execute_config_listen_task())
@@ -53,10 +64,35 @@ class ConfigGRPCClientProxy:
                                                                self.execute_config_listen_channel)
 
     async def start(self):
+        if self.client_config.shared_connection:
+            await self._start_shared()
+            return
         await self.nacos_server_connector.init()
         await self.fetch_rpc_client(0)
 
+    async def _start_shared(self):
+        self.rpc_client_lease = await shared_rpc_clients.acquire(self.logger, self.client_config,
+                                                                 Constants.CONFIG_MODULE)
+        self.nacos_server_connector = self.rpc_client_lease.nacos_server
+        rpc_client = self.rpc_client_lease.rpc_client
+        await self.rpc_client_lease.register_server_request_handler(CONFIG_CHANGE_NOTIFY_REQUEST_TYPE,
+                                                                    ConfigChangeNotifyRequestHandler(
+                                                                        self.logger,
+                                                                        self.config_subscribe_manager,
+                                                                        rpc_client.name))
+        await self.rpc_client_lease.register_connection_listener(ConfigGrpcConnectionEventListener(
+            self.logger,
+            self.config_subscribe_manager,
+            self.execute_config_listen_channel,
+            rpc_client,
+            0)
+        )
+        await self.rpc_client_lease.start()
+
     async def fetch_rpc_client(self, task_id: int = 0) -> RpcClient:
+        if self.rpc_client_lease and task_id == 0:
+            # the first listen task uses the shared connection, further shards get their own
+            return self.rpc_client_lease.rpc_client
         labels = {
             Constants.LABEL_SOURCE: Constants.LABEL_SOURCE_SDK,
             Constants.LABEL_MODULE: Constants.CONFIG_MODULE,
@@ -76,7 +112,8 @@ class ConfigGRPCClientProxy:
                 self.logger,
                 self.config_subscribe_manager,
                 self.execute_config_listen_channel,
-                rpc_client)
+                rpc_client,
+                task_id)
             )
             await rpc_client.start()
         return rpc_client
@@ -84,36 +121,8 @@ class ConfigGRPCClientProxy:
     async def request_config_server(self, rpc_client: RpcClient, request: AbstractConfigRequest, response_class):
         try:
             await self.nacos_server_connector.inject_security_info(request.get_headers())
-            now = get_current_time_millis()
-            request.put_all_headers({
-                Constants.CLIENT_APPNAME_HEADER: self.app_name,
-                Constants.CLIENT_REQUEST_TS_HEADER: str(now),
-                Constants.CLIENT_REQUEST_TOKEN_HEADER: md5(str(now) + self.client_config.app_key),
-                Constants.EX_CONFIG_INFO: "true",
-                Constants.CHARSET_KEY: "utf-8",
-                'Timestamp': str(now),
-            })
-
-            credentials = self.client_config.credentials_provider.get_credentials()
-            if credentials.get_access_key_id() and credentials.get_access_key_secret():
-                if request.tenant:
-                    resource = request.tenant + "+" + request.group
-                else:
-                    resource = request.group
-
-                if resource.strip():
-                    sign_str = f"{resource}+{now}"
-                else:
-                    sign_str = str(now)
-
-                request.put_all_headers({
-                    'Spas-AccessKey': credentials.get_access_key_id(),
-                    'Spas-Signature': base64.encodebytes(
-                        hmac.new(credentials.get_access_key_secret().encode(), sign_str.encode(),
-                                 digestmod=hashlib.sha1).digest()).decode().strip(),
-                })
-                if credentials.get_security_token():
-                    request.put_header("Spas-SecurityToken", credentials.get_security_token())
+            resource = request.tenant + "+" + request.group if request.tenant else request.group
+            self.request_signer.sign(request.get_headers(), resource)
 
             response = await rpc_client.request(request, self.client_config.grpc_config.grpc_timeout)
             if response.get_result_code() != 200:
@@ -130,6 +139,10 @@ class ConfigGRPCClientProxy:
             raise NacosException(SERVER_ERROR, "Request nacos config server failed: " + str(e))
 
     async def query_config(self, data_id: str, group: str):
+        # concurrent queries of the same config share one request
+        return await self.single_flight.do((data_id, group), lambda: self._query_config(data_id, group))
+
+    async def _query_config(self, data_id: str, group: str):
         self.logger.info("query config group:%s,dataId:%s,namespace:%s", group, data_id,
                          self.namespace_id)
 
@@ -250,6 +263,11 @@ class ConfigGRPCClientProxy:
 
     async def close_client(self):
         self.logger.info("close Nacos python config grpc client...")
+        metrics.unregister_collector(f"config_proxy.{self.uuid}.single_flight")
         self.stop_event.set()
         await self.listen_task
         await self.rpc_client_manager.shutdown_all_clients()
+        if self.rpc_client_lease:
+            await self.rpc_client_lease.release()
+        else:
+            await self.nacos_server_connector.close()
@@ -1,10 +1,14 @@
+import asyncio
 import logging
 import os
-from logging.handlers import TimedRotatingFileHandler
 
 from v2.nacos.common.client_config import ClientConfig
+from v2.nacos.common.metrics import metrics
 from v2.nacos.common.nacos_exception import NacosException, INVALID_PARAM
+from v2.nacos.common.tracing import set_tracer
 from v2.nacos.transport.http_agent import HttpAgent
+from v2.nacos.utils.log_util import get_queue_handler
+from v2.nacos.utils.loop_util import tune_event_loop
 
 
 class NacosClient:
@@ -22,7 +26,22 @@ class NacosClient:
             client_config.heart_beat_interval = 5 * 1000
 
         self.client_config = client_config
-        self.http_agent = HttpAgent(self.logger, client_config.tls_config, client_config.timeout_ms)
+        if client_config.metrics_enabled:
+            # the registry is shared by the clients of the process
+            metrics.enable()
+        if client_config.tracer is not None:
+            # like metrics, the tracer is shared by the clients of the process
+            set_tracer(client_config.tracer)
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        if loop is not None:
+            tune_event_loop(loop, client_config, self.logger)
+        self.http_agent = HttpAgent(self.logger, client_config.tls_config, client_config.timeout_ms,
+                                    pool_size=client_config.http_pool_size,
+                                    pool_size_per_host=client_config.http_pool_size_per_host,
+                                    keep_alive_timeout=client_config.http_keep_alive_timeout)
 
     def init_log(self, client_config: ClientConfig, module):
         log_level = client_config.log_level or logging.INFO
@@ -44,14 +63,11 @@ class NacosClient:
 
         log_path = client_config.log_dir + module + ".log"
         self.logger = logging.getLogger(module)
-
-        file_handler = TimedRotatingFileHandler(log_path, when="midnight", interval=1,
-                                                backupCount=client_config.log_rotation_backup_count,
-                                                encoding='utf-8')
         self.logger.setLevel(log_level)
 
-        formatter = logging.Formatter('%(asctime)s %(levelname)s %(message)s')
-        file_handler.setFormatter(formatter)
-        self.logger.addHandler(file_handler)
+        # the file is written from a background thread, and clients logging to the same file share the handler
+        handler = get_queue_handler(log_path, client_config.log_rotation_backup_count)
+        if handler not in self.logger.handlers:
+            self.logger.addHandler(handler)
         self.logger.propagate = False
-        self.logger.info(f"log directory: {client_config.log_dir}.")
+        self.logger.info("log directory: %s.", client_config.log_dir)
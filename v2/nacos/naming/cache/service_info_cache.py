@@ -6,6 +6,7 @@ from typing import Callable, Optional, List, Dict
 
 from v2.nacos.common.client_config import ClientConfig
 from v2.nacos.common.constants import Constants
+from v2.nacos.common.metrics import metrics
 from v2.nacos.naming.cache.subscribe_callback_wrapper import \
     SubscribeCallbackFuncWrapper
 from v2.nacos.naming.cache.subscribe_manager import SubscribeManager
@@ -25,6 +26,7 @@ class ServiceInfoCache:
         self.lock = asyncio.Lock()
         self.sub_callback_manager = SubscribeManager()
         self.update_cache_when_empty = client_config.update_cache_when_empty
+        metrics.register_gauge("nacos_client_service_info_cache_size", self.size, namespace=client_config.namespace_id)
         if client_config.load_cache_at_start:
             asyncio.create_task(self.load_cache_from_disk())
 
@@ -95,19 +97,29 @@ class ServiceInfoCache:
             self.service_info_map[cache_key] = service
 
             if not old_service or self.check_instance_changed(old_service, service):
-                self.logger.info(f"service key: {cache_key} was updated to: {str(service)}")
+                self.logger.info("service key: %s was updated, hosts:%s", cache_key, len(service.hosts))
+                self.logger.debug("service key: %s was updated to: %s", cache_key, service)
                 await write_to_file(self.logger, os.path.join(self.cache_dir, cache_key), to_json_string(service))
                 await self.sub_callback_manager.service_changed(cache_key, service)
-            self.logger.info(f"current service map size: {len(self.service_info_map)}")
+            self.logger.debug("current service map size: %s", len(self.service_info_map))
 
     async def get_service_info(self, service_name, group_name, clusters) -> Service:
         cache_key = get_service_cache_key(get_group_name(service_name, group_name), clusters)
         async with self.lock:
             service = self.service_info_map.get(cache_key)
-            self.logger.info(
-                f"get service info from cache, key: {cache_key}，instances:{service.hosts if service is not None else 'None'}")
+            if metrics.enabled:
+                metrics.counter("nacos_client_service_info_cache_total", result="miss" if service is None else "hit").inc()
+            self.logger.debug("get service info from cache, key: %s，instances:%s", cache_key,
+                              service.hosts if service is not None else None)
             return service
 
+    def peek_service_info(self, service_name, group_name, clusters) -> Optional[Service]:
+        # without the lock, so other threads can read it: an update replaces the entry instead of changing it
+        return self.service_info_map.get(get_service_cache_key(get_group_name(service_name, group_name), clusters))
+
+    def size(self) -> int:
+        return len(self.service_info_map)
+
     def check_instance_changed(self, old_service: Optional[Service], new_service: Service):
         if old_service is None:
             return True
@@ -1,6 +1,9 @@
 import asyncio
+import time
 from typing import Dict, List, Callable
 
+from v2.nacos.common.metrics import metrics
+from v2.nacos.common.tracing import start_span
 from v2.nacos.naming.cache.subscribe_callback_wrapper import \
     SubscribeCallbackFuncWrapper
 from v2.nacos.naming.model.service import Service
@@ -36,4 +39,10 @@ class SubscribeManager:
     async def service_changed(self, cache_key: str, service: Service):
         if cache_key in self.callback_func_wrapper_map:
             for callback_func in self.callback_func_wrapper_map[cache_key]:
-                await callback_func.notify_listener(service)
+                begin = time.perf_counter() if metrics.enabled else None
+                with start_span("nacos.naming.notify") as span:
+                    span.set_attribute("nacos.service", cache_key)
+                    await callback_func.notify_listener(service)
+                if begin is not None:
+                    metrics.histogram("nacos_client_listener_ms", module="naming").observe(
+                        (time.perf_counter() - begin) * 1000)
@@ -31,6 +31,9 @@ class ServiceQueryRequest(AbstractNamingRequest):
     def get_request_type(self) -> str:
         return 'ServiceQueryRequest'
 
+    def is_read_only(self) -> bool:
+        return True
+
 
 class InstanceRequest(AbstractNamingRequest):
     type: Optional[str]
@@ -60,6 +63,11 @@ class NotifySubscriberRequest(AbstractNamingRequest):
     def get_request_type(self) -> str:
         return 'NotifySubscriberRequest'
 
+    def get_dispatch_key(self) -> str:
+        if self.serviceInfo:
+            return f"{self.serviceInfo.groupName}@@{self.serviceInfo.name}"
+        return f"{self.groupName}@@{self.serviceName}"
+
 
 class ServiceListRequest(AbstractNamingRequest):
     pageNo: Optional[int]
@@ -68,6 +76,9 @@ class ServiceListRequest(AbstractNamingRequest):
     def get_request_type(self) -> str:
         return 'ServiceListRequest'
 
+    def is_read_only(self) -> bool:
+        return True
+
 
 class SubscribeServiceRequest(AbstractNamingRequest):
     subscribe: Optional[bool]
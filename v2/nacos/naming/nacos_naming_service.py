@@ -190,17 +190,23 @@ class NacosNamingService(NacosClient):
         if request.subscribe:
             service_info = await self.service_info_holder.get_service_info(request.service_name, request.group_name,
                                                                            "")
-        if service_info is None:
+        # 缓存可能来自启动时加载的磁盘文件，未订阅时需要先订阅以获取最新的服务信息
+        if service_info is None or not await self.grpc_client_proxy.redo_service.is_subscribe_registered(
+                request.service_name, request.group_name, ""):
             service_info = await self.grpc_client_proxy.subscribe(request.service_name, request.group_name, "")
 
+        return self.select_instances(service_info, cluster_selector, request.healthy_only)
+
+    @staticmethod
+    def select_instances(service_info: Service, cluster_selector: ClusterSelector, healthy_only) -> List[Instance]:
         instance_list = []
         if service_info is not None and len(service_info.hosts) > 0:
             instance_list = cluster_selector.select_instance(service_info)
 
         # 如果设置了healthy_only参数,表示需要查询健康或不健康的实例列表，为true时仅会返回健康的实例列表，反之则返回不健康的实例列表。默认为None
-        if request.healthy_only is not None:
+        if healthy_only is not None:
             instance_list = list(
-                filter(lambda host: host.healthy == request.healthy_only and host.enabled and host.weight > 0,
+                filter(lambda host: host.healthy == healthy_only and host.enabled and host.weight > 0,
                        instance_list))
 
         return instance_list
@@ -238,3 +244,4 @@ class NacosNamingService(NacosClient):
     async def shutdown(self) -> None:
         await self.grpc_client_proxy.close_client()
         self.service_info_updater.stop()
+        await self.http_agent.close()
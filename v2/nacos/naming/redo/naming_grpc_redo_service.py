@@ -170,6 +170,12 @@ class NamingGrpcRedoService(AbstractRedoService):
 		key = get_service_cache_key(service_key, cluster)
 		return await super().is_data_registered(key, SUBSCRIBE_REDO_DATA_TYPE)
 
+	def peek_subscribe_registered(self, service_name: str, group_name: str,
+			cluster: str) -> bool:
+		service_key = get_group_name(service_name, group_name)
+		key = get_service_cache_key(service_key, cluster)
+		return super().peek_data_registered(key, SUBSCRIBE_REDO_DATA_TYPE)
+
 	async def subscribe_registered(self, service_name: str, group_name: str,
 			cluster: str) -> None:
 		service_key = get_group_name(service_name, group_name)
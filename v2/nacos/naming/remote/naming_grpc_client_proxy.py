@@ -1,13 +1,11 @@
 import asyncio
-import base64
-import hashlib
-import hmac
 import logging
 import uuid
 from typing import Optional, List
 
 from v2.nacos.common.client_config import ClientConfig
 from v2.nacos.common.constants import Constants
+from v2.nacos.common.metrics import metrics
 from v2.nacos.common.nacos_exception import NacosException, SERVER_ERROR, \
     INVALID_PARAM
 from v2.nacos.naming.cache.service_info_cache import ServiceInfoCache
@@ -31,8 +29,11 @@ from v2.nacos.naming.util.naming_remote_constants import NamingRemoteConstants
 from v2.nacos.transport.http_agent import HttpAgent
 from v2.nacos.transport.nacos_server_connector import NacosServerConnector
 from v2.nacos.transport.rpc_client import ConnectionType
+from v2.nacos.transport.request_signer import RequestSigner
 from v2.nacos.transport.rpc_client_factory import RpcClientFactory
-from v2.nacos.utils.common_util import get_current_time_millis, to_json_string
+from v2.nacos.transport.shared_rpc_client import shared_rpc_clients
+from v2.nacos.transport.single_flight import SingleFlight
+from v2.nacos.utils.common_util import to_json_string
 
 
 class NamingGRPCClientProxy:
@@ -44,19 +45,29 @@ class NamingGRPCClientProxy:
                  service_info_cache: ServiceInfoCache):
         self.logger = logging.getLogger(Constants.NAMING_MODULE)
         self.client_config = client_config
+        self.request_signer = RequestSigner(client_config)
+        self.single_flight = SingleFlight()
         self.uuid = uuid.uuid4()
+        metrics.register_collector(f"naming_proxy.{self.uuid}.single_flight", self.single_flight.snapshot)
 
         self.service_info_cache = service_info_cache
+        self.http_client = http_client
         self.rpc_client = None
+        self.rpc_client_lease = None
         if not client_config.namespace_id or len(
                 client_config.namespace_id) == 0:
             self.namespace_id = "public"
         else:
             self.namespace_id = client_config.namespace_id
-        self.nacos_server_connector = NacosServerConnector(self.logger, client_config, http_client)
+        # with a shared connection the connector comes with the shared rpc client on start
+        self.nacos_server_connector = None if client_config.shared_connection else \
+            NacosServerConnector(self.logger, client_config, http_client)
         self.redo_service = NamingGrpcRedoService(self)
 
     async def start(self):
+        if self.client_config.shared_connection:
+            await self._start_shared()
+            return
         await self.nacos_server_connector.init()
         labels = {Constants.LABEL_SOURCE: Constants.LABEL_SOURCE_SDK,
                   Constants.LABEL_MODULE: Constants.NAMING_MODULE}
@@ -70,26 +81,23 @@ class NamingGRPCClientProxy:
 
         await self.rpc_client.start()
 
+    async def _start_shared(self):
+        self.rpc_client_lease = await shared_rpc_clients.acquire(self.logger, self.client_config,
+                                                                 Constants.NAMING_MODULE)
+        self.rpc_client = self.rpc_client_lease.rpc_client
+        self.nacos_server_connector = self.rpc_client_lease.nacos_server
+        await self.rpc_client_lease.register_server_request_handler(NOTIFY_SUBSCRIBER_REQUEST_TYPE,
+                                                                    NamingPushRequestHandler(self.logger,
+                                                                                             self.service_info_cache))
+        await self.rpc_client_lease.register_connection_listener(self.redo_service)
+        await self.rpc_client_lease.start()
+
     async def request_naming_server(self, request: AbstractNamingRequest, response_class):
         try:
             await self.nacos_server_connector.inject_security_info(request.get_headers())
 
-            credentials = self.client_config.credentials_provider.get_credentials()
-            if credentials.get_access_key_id() and credentials.get_access_key_secret():
-                service_name = get_group_name(request.serviceName, request.groupName)
-                if service_name.strip():
-                    sign_str = str(get_current_time_millis()) + Constants.SERVICE_INFO_SPLITER + service_name
-                else:
-                    sign_str = str(get_current_time_millis())
-
-                request.put_all_headers({
-                    "ak": credentials.get_access_key_id(),
-                    "data": sign_str,
-                    "signature": base64.encodebytes(hmac.new(credentials.get_access_key_secret().encode(), sign_str.encode(),
-                                                             digestmod=hashlib.sha1).digest()).decode().strip()
-                })
-                if credentials.get_security_token():
-                    request.put_header("Spas-SecurityToken", credentials.get_security_token())
+            self.request_signer.sign_naming(request.get_headers(),
+                                            get_group_name(request.serviceName, request.groupName))
 
             response = await self.rpc_client.request(request, self.client_config.grpc_config.grpc_timeout)
             if response.get_result_code() != 200:
@@ -105,8 +113,8 @@ class NamingGRPCClientProxy:
             raise NacosException(SERVER_ERROR, "Request nacos naming server failed: " + str(e))
 
     async def query_instance_of_service(self, service_name: str, group_name: str, clusters: str, health_only:bool):
-        self.logger.info(
-				f"Query instance of service:{service_name} group_name:{group_name}, namespace:{self.namespace_id}, clusters:{clusters}")
+        self.logger.info("Query instance of service:%s group_name:%s, namespace:%s, clusters:%s",
+                         service_name, group_name, self.namespace_id, clusters)
         request = ServiceQueryRequest(
                 namespace=self.namespace_id,
                 serviceName=service_name,
@@ -114,7 +122,10 @@ class NamingGRPCClientProxy:
                 cluster=clusters,
                 healthOnly=health_only,
         )
-        response = await self.request_naming_server(request, QueryServiceResponse)
+        # concurrent queries of the same service share one request
+        response = await self.single_flight.do(
+            ("query", service_name, group_name, clusters, health_only),
+            lambda: self.request_naming_server(request, QueryServiceResponse))
         return response.serviceInfo
 
     async def register_instance(self, service_name: str, group_name: str, instance: Instance):
@@ -124,8 +135,8 @@ class NamingGRPCClientProxy:
             return await self.register_persistent_instance(service_name, group_name, instance)
 
     async def register_ephemeral_instance(self, service_name: str, group_name: str, instance: Instance):
-        self.logger.info("register ephemeral instance service_name:%s, group_name:%s, namespace:%s, instance:%s" % (
-            service_name, group_name, self.namespace_id, str(instance)))
+        self.logger.info("register ephemeral instance service_name:%s, group_name:%s, namespace:%s, instance:%s",
+                         service_name, group_name, self.namespace_id, instance)
         await self.redo_service.cache_instance_for_redo(service_name, group_name, instance)
         request = InstanceRequest(
                 namespace=self.namespace_id,
@@ -138,8 +149,8 @@ class NamingGRPCClientProxy:
         return response.is_success()
 
     async def register_persistent_instance(self, service_name: str, group_name: str, instance: Instance):
-        self.logger.info("register persistent instance service_name:%s, group_name:%s, namespace:%s, instance:%s" % (
-            service_name, group_name, self.namespace_id, str(instance)))
+        self.logger.info("register persistent instance service_name:%s, group_name:%s, namespace:%s, instance:%s",
+                         service_name, group_name, self.namespace_id, instance)
         request = PersistentInstanceRequest(
             namespace=self.namespace_id,
             serviceName=service_name,
@@ -150,8 +161,8 @@ class NamingGRPCClientProxy:
         return response.is_success()
 
     async def batch_register_instance(self, service_name: str, group_name: str, instances: List[Instance]) -> bool:
-        self.logger.info("batch register instance service_name:%s, group_name:%s, namespace:%s,instances:%s" % (
-            service_name, group_name, self.namespace_id, str(instances)))
+        self.logger.info("batch register instance service_name:%s, group_name:%s, namespace:%s,instances:%s",
+                         service_name, group_name, self.namespace_id, instances)
         await self.redo_service.cache_instances_for_redo(service_name, group_name, instances)
         request = BatchInstanceRequest(
             namespace=self.namespace_id,
@@ -222,8 +233,8 @@ class NamingGRPCClientProxy:
             return await self.deregister_persistent_instance(service_name, group_name, instance)
 
     async def deregister_ephemeral_instance(self, service_name:str, group_name:str, instance:Instance) -> bool:
-        self.logger.info("deregister ephemeral instance ip:%s, port:%s, service_name:%s, group_name:%s, namespace:%s" % (
-            instance.ip, instance.port, service_name, group_name, self.namespace_id))
+        self.logger.info("deregister ephemeral instance ip:%s, port:%s, service_name:%s, group_name:%s, namespace:%s",
+                         instance.ip, instance.port, service_name, group_name, self.namespace_id)
         await self.redo_service.instance_deregister(service_name, group_name)
         request = InstanceRequest(
                 namespace=self.namespace_id,
@@ -236,8 +247,8 @@ class NamingGRPCClientProxy:
         return response.is_success()
 
     async def deregister_persistent_instance(self, service_name:str, group_name:str, instance:Instance) -> bool:
-        self.logger.info("deregister persistent instance ip:%s, port:%s, service_name:%s, group_name:%s, namespace:%s" % (
-            instance.ip, instance.port, service_name, group_name, self.namespace_id))
+        self.logger.info("deregister persistent instance ip:%s, port:%s, service_name:%s, group_name:%s, namespace:%s",
+                         instance.ip, instance.port, service_name, group_name, self.namespace_id)
         request = PersistentInstanceRequest(
                 namespace=self.namespace_id,
                 serviceName=service_name,
@@ -295,7 +306,8 @@ class NamingGRPCClientProxy:
     async def subscribe(self, service_name: str, group_name: str, clusters: str) -> Optional[Service]:
         service_info = await self.service_info_cache.get_service_info(service_name, group_name, clusters)
         if service_info is None or not await self.redo_service.is_subscribe_registered(service_name,group_name,clusters):
-            service_info = await self.do_subscribe(service_name, group_name, clusters)
+            service_info = await self.single_flight.do(("subscribe", service_name, group_name, clusters),
+                                                       lambda: self.do_subscribe(service_name, group_name, clusters))
         await self.service_info_cache.process_service(service_info)
         return service_info
 
@@ -315,7 +327,12 @@ class NamingGRPCClientProxy:
 
     async def close_client(self):
         self.logger.info("close Nacos python naming grpc client...")
+        metrics.unregister_collector(f"naming_proxy.{self.uuid}.single_flight")
+        if self.rpc_client_lease:
+            await self.rpc_client_lease.release()
+            return
         await self.rpc_client.shutdown()
+        await self.nacos_server_connector.close()
 
     def server_health(self):
         return self.rpc_client.is_running()
@@ -21,7 +21,9 @@ class NamingPushRequestHandler(IServerRequestHandler):
         if not isinstance(request, NotifySubscriberRequest):
             return None
 
-        self.logger.info("received naming push service info: %s,ackId:%s", str(request.serviceInfo),
-                         request.requestId)
+        # the host list only at debug level, a push of a large service is logged as a single short line
+        self.logger.info("received naming push service:%s, hosts:%s, ackId:%s", request.get_dispatch_key(),
+                         len(request.serviceInfo.hosts) if request.serviceInfo else 0, request.requestId)
+        self.logger.debug("received naming push service info: %s, ackId:%s", request.serviceInfo, request.requestId)
         await self.service_info_cache.process_service(request.serviceInfo)
         return NotifySubscriberResponse()
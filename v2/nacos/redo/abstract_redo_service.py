@@ -3,6 +3,7 @@ import logging
 from abc import abstractmethod, ABC
 from typing import Dict, Set, Optional
 
+from v2.nacos.common.metrics import metrics
 from v2.nacos.redo.async_rlock import AsyncRLock
 from v2.nacos.redo.redo_data import RedoData
 from v2.nacos.transport.connection_event_listener import ConnectionEventListener
@@ -19,6 +20,16 @@ class AbstractRedoService(ConnectionEventListener,ABC):
 		self._listen_task = asyncio.create_task(self._execute_redo_task())
 		self._redo_data_map : Dict[str, Dict[str, RedoData]] = {}
 		self._locks: Dict[str, AsyncRLock] = {}
+		metrics.register_gauge("nacos_client_redo_data_size", self.redo_data_size, module=module)
+		metrics.register_gauge("nacos_client_redo_pending_size", self.redo_pending_size, module=module)
+
+	def redo_data_size(self) -> int:
+		return sum(len(redo_data_dict) for redo_data_dict in self._redo_data_map.values())
+
+	def redo_pending_size(self) -> int:
+		"""Redo data that still has to be sent to the server."""
+		return sum(1 for redo_data_dict in self._redo_data_map.values() for redo_data in redo_data_dict.values()
+				   if redo_data.is_need_redo())
 
 	async def on_connected(self) -> None:
 		self._connected = True
@@ -163,6 +174,20 @@ class AbstractRedoService(ConnectionEventListener,ABC):
 			redo_data = actual_redo_data.get(key)
 			return redo_data is not None and redo_data.is_registered()
 
+	def peek_data_registered(self, key: str, data_type: str) -> bool:
+		"""
+		不加锁判断数据是否已注册到服务器，供事件循环以外的线程读取
+
+		Args:
+			key: redo数据的键
+			data_type: 存储在RedoData中的类类型
+
+		Returns:
+			bool: 如果已注册返回True，否则返回False
+		"""
+		redo_data = self._redo_data_map.get(data_type, {}).get(key)
+		return redo_data is not None and redo_data.is_registered()
+
 	async def find_redo_data(self, data_type: str) -> Set[RedoData]:
 		"""
 		查找所有需要redo的数据
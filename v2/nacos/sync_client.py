@@ -0,0 +1,335 @@
+import asyncio
+import concurrent.futures
+import functools
+import inspect
+import random
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+from v2.nacos.ai.model.ai_param import GetMcpServerParam, ReleaseMcpServerParam, RegisterMcpServerEndpointParam, \
+    SubscribeMcpServerParam, GetAgentCardParam, ReleaseAgentCardParam, RegisterAgentEndpointParam, \
+    DeregisterAgentEndpointParam, SubscribeAgentCardParam, GetPromptParam, SubscribePromptParam, DownloadSkillParam
+from v2.nacos.ai.nacos_ai_service import NacosAIService
+from v2.nacos.common.client_config import ClientConfig
+from v2.nacos.common.constants import Constants
+from v2.nacos.common.nacos_exception import NacosException, CLIENT_INVALID_PARAM, INVALID_PARAM, SERVER_ERROR
+from v2.nacos.config.model.config_param import ConfigParam
+from v2.nacos.config.nacos_config_service import NacosConfigService
+from v2.nacos.naming.cache.subscribe_callback_wrapper import ClusterSelector
+from v2.nacos.naming.model.instance import Instance
+from v2.nacos.naming.model.naming_param import RegisterInstanceParam, BatchRegisterInstanceParam, \
+    DeregisterInstanceParam, ListInstanceParam, SubscribeServiceParam, GetServiceParam, ListServiceParam
+from v2.nacos.naming.model.service import Service, ServiceList
+from v2.nacos.naming.nacos_naming_service import NacosNamingService
+from v2.nacos.transport.rpc_client import RpcClient
+from v2.nacos.utils import loop_util
+
+
+class NacosLoopThread:
+    """An event loop running on a daemon thread, hosting clients used from synchronous code.
+
+    Several services can share one thread; it is stopped by whoever created it.
+    """
+
+    def __init__(self, use_uvloop: bool = False, name: str = "nacos-loop"):
+        self.loop = loop_util.new_event_loop(use_uvloop)
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def in_loop_thread(self) -> bool:
+        return threading.get_ident() == self._thread.ident
+
+    def is_running(self) -> bool:
+        return self._thread.is_alive()
+
+    def run(self, coro, timeout: Optional[float] = None):
+        """Runs coro on the loop and waits for its result in the calling thread."""
+        if self.in_loop_thread():
+            coro.close()
+            # waiting here would block the loop that has to complete the call
+            raise NacosException(CLIENT_INVALID_PARAM, "a sync client can not be called from its event loop thread")
+        if not self.is_running():
+            coro.close()
+            raise NacosException(CLIENT_INVALID_PARAM, "the event loop thread of the client is stopped")
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise NacosException(SERVER_ERROR, f"call did not complete in {timeout}s")
+
+    def stop(self):
+        if not self.is_running():
+            return
+        self.run(self._cancel_tasks())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
+
+    async def _cancel_tasks(self):
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self.loop.shutdown_asyncgens()
+        await self.loop.shutdown_default_executor()
+
+
+class _SyncService:
+
+    def __init__(self, service, client_config: ClientConfig, loop_thread: NacosLoopThread, owns_loop_thread: bool,
+                 call_timeout: Optional[float]):
+        self.service = service
+        self.loop_thread = loop_thread
+        self._owns_loop_thread = owns_loop_thread
+        # a request is retried up to RETRY_TIMES times, each within timeout_ms
+        self.call_timeout = call_timeout if call_timeout is not None else \
+            client_config.timeout_ms * RpcClient.RETRY_TIMES / 1000
+        self._callbacks: Dict[Callable, Callable] = {}
+        self._callbacks_lock = threading.Lock()
+
+    @staticmethod
+    def _create(create, client_config: ClientConfig, loop_thread: Optional[NacosLoopThread]):
+        owns_loop_thread = loop_thread is None
+        if owns_loop_thread:
+            loop_thread = NacosLoopThread(client_config.use_uvloop)
+        try:
+            return loop_thread.run(create(client_config)), loop_thread, owns_loop_thread
+        except BaseException:
+            if owns_loop_thread:
+                loop_thread.stop()
+            raise
+
+    def _call(self, coro):
+        return self.loop_thread.run(coro, self.call_timeout)
+
+    def _callback(self, callback: Optional[Callable]) -> Optional[Callable]:
+        """The callback to hand to the async service, the same one for the same callback.
+
+        A plain function runs in the default executor of the loop, so a slow or blocking callback
+        does not stall pushes and requests, and it may call the sync client itself.
+        """
+        if callback is None or inspect.iscoroutinefunction(callback):
+            return callback
+        with self._callbacks_lock:
+            wrapped = self._callbacks.get(callback)
+            if wrapped is None:
+                async def run_in_executor(*args):
+                    await asyncio.get_running_loop().run_in_executor(None, functools.partial(callback, *args))
+
+                wrapped = self._callbacks[callback] = run_in_executor
+            return wrapped
+
+    def _with_callback(self, param):
+        if param.subscribe_callback is None:
+            return param
+        return param.model_copy(update={"subscribe_callback": self._callback(param.subscribe_callback)})
+
+    def shutdown(self):
+        try:
+            # a config service waits for its listen task, longer than a request may take
+            self.loop_thread.run(self.service.shutdown())
+        finally:
+            if self._owns_loop_thread:
+                self.loop_thread.stop()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.shutdown()
+
+
+class SyncNacosNamingService(_SyncService):
+    """Thread-safe synchronous facade of NacosNamingService running on a NacosLoopThread.
+
+    list_instances and select_one_healthy_instance of subscribed services read the service cache
+    kept current by pushes in the calling thread; every other call runs on the loop thread.
+    """
+
+    @staticmethod
+    def create(client_config: ClientConfig, loop_thread: Optional[NacosLoopThread] = None,
+               call_timeout: Optional[float] = None) -> 'SyncNacosNamingService':
+        service, loop_thread, owns = _SyncService._create(NacosNamingService.create_naming_service, client_config,
+                                                          loop_thread)
+        return SyncNacosNamingService(service, client_config, loop_thread, owns, call_timeout)
+
+    def register_instance(self, request: RegisterInstanceParam) -> bool:
+        return self._call(self.service.register_instance(request))
+
+    def batch_register_instances(self, request: BatchRegisterInstanceParam) -> bool:
+        return self._call(self.service.batch_register_instances(request))
+
+    def batch_deregister_instances(self, request: BatchRegisterInstanceParam) -> bool:
+        return self._call(self.service.batch_deregister_instances(request))
+
+    def deregister_instance(self, request: DeregisterInstanceParam) -> bool:
+        return self._call(self.service.deregister_instance(request))
+
+    def update_instance(self, request: RegisterInstanceParam) -> bool:
+        return self._call(self.service.update_instance(request))
+
+    def get_service(self, request: GetServiceParam) -> Service:
+        return self._call(self.service.get_service(request))
+
+    def list_services(self, request: ListServiceParam) -> ServiceList:
+        return self._call(self.service.list_services(request))
+
+    def list_instances(self, request: ListInstanceParam) -> List[Instance]:
+        group_name = request.group_name or Constants.DEFAULT_GROUP
+        # the cache is only current while the service is subscribed, entries loaded from disk at start
+        # or left from before a reconnect are refreshed on the loop thread first
+        if request.subscribe and request.service_name and \
+                self.service.grpc_client_proxy.redo_service.peek_subscribe_registered(request.service_name,
+                                                                                      group_name, ""):
+            service_info = self.service.service_info_holder.peek_service_info(request.service_name, group_name, "")
+            if service_info is not None:
+                return NacosNamingService.select_instances(service_info, ClusterSelector(request.clusters),
+                                                           request.healthy_only)
+        return self._call(self.service.list_instances(request))
+
+    def select_one_healthy_instance(self, service_name: str, group_name: str = Constants.DEFAULT_GROUP,
+                                    clusters: Optional[List[str]] = None, subscribe: bool = True) -> Instance:
+        """A healthy instance picked at random by weight."""
+        instances = self.list_instances(ListInstanceParam(service_name=service_name, group_name=group_name,
+                                                          clusters=clusters or [], subscribe=subscribe,
+                                                          healthy_only=True))
+        if not instances:
+            raise NacosException(INVALID_PARAM, f"no healthy instance of service {service_name}")
+        return random.choices(instances, weights=[instance.weight for instance in instances])[0]
+
+    def subscribe(self, request: SubscribeServiceParam) -> None:
+        return self._call(self.service.subscribe(self._with_callback(request)))
+
+    def unsubscribe(self, request: SubscribeServiceParam) -> None:
+        return self._call(self.service.unsubscribe(self._with_callback(request)))
+
+    def server_health(self) -> bool:
+        return self._call(self.service.server_health())
+
+
+class SyncNacosConfigService(_SyncService):
+    """Thread-safe synchronous facade of NacosConfigService running on a NacosLoopThread.
+
+    With cache_configs, the first get_config of a config also adds a listener, and later calls
+    return the content it last received in the calling thread. A local publish or remove drops the
+    cached content, so the next get_config asks the server.
+    """
+
+    def __init__(self, service, client_config: ClientConfig, loop_thread: NacosLoopThread, owns_loop_thread: bool,
+                 call_timeout: Optional[float], cache_configs: bool = True):
+        super().__init__(service, client_config, loop_thread, owns_loop_thread, call_timeout)
+        self.cache_configs = cache_configs
+        # written on the loop thread, read by the callers
+        self._contents: Dict[Tuple[str, str], str] = {}
+        self._listening = set()
+
+    @staticmethod
+    def create(client_config: ClientConfig, loop_thread: Optional[NacosLoopThread] = None,
+               call_timeout: Optional[float] = None, cache_configs: bool = True) -> 'SyncNacosConfigService':
+        service, loop_thread, owns = _SyncService._create(NacosConfigService.create_config_service, client_config,
+                                                          loop_thread)
+        return SyncNacosConfigService(service, client_config, loop_thread, owns, call_timeout, cache_configs)
+
+    def get_config(self, param: ConfigParam) -> str:
+        key = (param.data_id, param.group or Constants.DEFAULT_GROUP)
+        content = self._contents.get(key)
+        if content is not None:
+            return content
+        if not self.cache_configs:
+            return self._call(self.service.get_config(param))
+        return self._call(self._get_and_listen(param, key))
+
+    async def _get_and_listen(self, param: ConfigParam, key: Tuple[str, str]) -> str:
+        content = await self.service.get_config(param)
+        if key not in self._listening:
+            await self.service.add_listener(key[0], key[1], self._on_config_change)
+            # only once the listener is in place, a failed add_listener is tried again on the next call
+            self._listening.add(key)
+        self._contents[key] = content
+        return content
+
+    async def _on_config_change(self, tenant, group, data_id, content):
+        if (data_id, group) in self._contents:
+            self._contents[(data_id, group)] = content
+
+    def publish_config(self, param: ConfigParam) -> bool:
+        try:
+            return self._call(self.service.publish_config(param))
+        finally:
+            self._contents.pop((param.data_id, param.group or Constants.DEFAULT_GROUP), None)
+
+    def remove_config(self, param: ConfigParam):
+        try:
+            return self._call(self.service.remove_config(param))
+        finally:
+            self._contents.pop((param.data_id, param.group or Constants.DEFAULT_GROUP), None)
+
+    def add_listener(self, data_id: str, group: str, listener: Callable) -> None:
+        return self._call(self.service.add_listener(data_id, group, self._callback(listener)))
+
+    def remove_listener(self, data_id: str, group: str, listener: Callable):
+        return self._call(self.service.remove_listener(data_id, group, self._callback(listener)))
+
+    def server_health(self) -> bool:
+        return self._call(self.service.server_health())
+
+
+class SyncNacosAIService(_SyncService):
+    """Thread-safe synchronous facade of NacosAIService running on a NacosLoopThread."""
+
+    @staticmethod
+    def create(client_config: ClientConfig, loop_thread: Optional[NacosLoopThread] = None,
+               call_timeout: Optional[float] = None) -> 'SyncNacosAIService':
+        service, loop_thread, owns = _SyncService._create(NacosAIService.create_ai_service, client_config,
+                                                          loop_thread)
+        return SyncNacosAIService(service, client_config, loop_thread, owns, call_timeout)
+
+    def get_mcp_server(self, param: GetMcpServerParam):
+        return self._call(self.service.get_mcp_server(param))
+
+    def release_mcp_server(self, param: ReleaseMcpServerParam) -> str:
+        return self._call(self.service.release_mcp_server(param))
+
+    def register_mcp_server_endpoint(self, param: RegisterMcpServerEndpointParam):
+        return self._call(self.service.register_mcp_server_endpoint(param))
+
+    def subscribe_mcp_server(self, param: SubscribeMcpServerParam):
+        return self._call(self.service.subscribe_mcp_server(self._with_callback(param)))
+
+    def unsubscribe_mcp_server(self, param: SubscribeMcpServerParam):
+        return self._call(self.service.unsubscribe_mcp_server(self._with_callback(param)))
+
+    def get_agent_card(self, param: GetAgentCardParam):
+        return self._call(self.service.get_agent_card(param))
+
+    def release_agent_card(self, param: ReleaseAgentCardParam):
+        return self._call(self.service.release_agent_card(param))
+
+    def register_agent_endpoint(self, param: RegisterAgentEndpointParam):
+        return self._call(self.service.register_agent_endpoint(param))
+
+    def deregister_agent_endpoint(self, param: DeregisterAgentEndpointParam):
+        return self._call(self.service.deregister_agent_endpoint(param))
+
+    def subscribe_agent_card(self, param: SubscribeAgentCardParam):
+        return self._call(self.service.subscribe_agent_card(self._with_callback(param)))
+
+    def unsubscribe_agent_card(self, param: SubscribeAgentCardParam):
+        return self._call(self.service.unsubscribe_agent_card(self._with_callback(param)))
+
+    def get_prompt(self, param: GetPromptParam):
+        return self._call(self.service.get_prompt(param))
+
+    def subscribe_prompt(self, param: SubscribePromptParam):
+        return self._call(self.service.subscribe_prompt(self._with_callback(param)))
+
+    def unsubscribe_prompt(self, param: SubscribePromptParam):
+        return self._call(self.service.unsubscribe_prompt(self._with_callback(param)))
+
+    def download_skill_zip(self, param: DownloadSkillParam) -> bytes:
+        return self._call(self.service.download_skill_zip(param))
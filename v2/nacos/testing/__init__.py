@@ -0,0 +1,13 @@
+from .fake_server import FakeNacosServer, FakeConnection, Fault
+from .client_fixture import FakeServerTestCase, create_grpc_client, query_request, server_addresses, unused_port
+
+__all__ = [
+    "FakeNacosServer",
+    "FakeConnection",
+    "Fault",
+    "FakeServerTestCase",
+    "create_grpc_client",
+    "query_request",
+    "server_addresses",
+    "unused_port",
+]
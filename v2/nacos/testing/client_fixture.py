@@ -0,0 +1,61 @@
+"""Shared setup of transport tests running a GrpcClient against FakeNacosServer instances."""
+import logging
+import socket
+import unittest
+from typing import Optional
+
+from v2.nacos.common.client_config import ClientConfig, GRPCConfig
+from v2.nacos.naming.model.naming_request import ServiceQueryRequest
+from v2.nacos.testing.fake_server import FakeNacosServer
+from v2.nacos.transport.grpc_client import GrpcClient
+from v2.nacos.transport.http_agent import HttpAgent
+from v2.nacos.transport.nacos_server_connector import NacosServerConnector
+
+
+def unused_port() -> int:
+    """A local port nothing listens on, for a server that is down."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def server_addresses(*grpc_ports: int) -> str:
+    """server_addresses reaching the fake servers listening on grpc_ports, the client adds the offset."""
+    return ",".join(f"127.0.0.1:{port - 1000}" for port in grpc_ports)
+
+
+def query_request(service_name: str = "svc") -> ServiceQueryRequest:
+    """A read only naming request every fake server answers."""
+    return ServiceQueryRequest(namespace="public", serviceName=service_name, groupName="DEFAULT_GROUP",
+                               cluster="", healthOnly=False)
+
+
+def create_grpc_client(logger, name: str, client_config: ClientConfig) -> GrpcClient:
+    connector = NacosServerConnector(logger, client_config, HttpAgent(logger, None, 3))
+    return GrpcClient(logger, name, client_config, connector)
+
+
+class FakeServerTestCase(unittest.IsolatedAsyncioTestCase):
+    """Test case starting fake servers and clients, each is shut down after the test, clients first."""
+
+    logger = logging.getLogger("test")
+
+    async def start_server(self, **kwargs) -> FakeNacosServer:
+        server = FakeNacosServer(**kwargs)
+        await server.start()
+        self.addAsyncCleanup(server.stop)
+        return server
+
+    @staticmethod
+    def client_config(*grpc_ports: int, grpc_config: Optional[GRPCConfig] = None) -> ClientConfig:
+        client_config = ClientConfig(server_addresses=server_addresses(*grpc_ports))
+        if grpc_config is not None:
+            client_config.set_grpc_config(grpc_config)
+        return client_config
+
+    async def create_client(self, name: str, client_config: ClientConfig, start: bool = True) -> GrpcClient:
+        client = create_grpc_client(self.logger, name, client_config)
+        self.addAsyncCleanup(client.shutdown)
+        if start:
+            await client.start()
+        return client
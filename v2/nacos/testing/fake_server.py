@@ -0,0 +1,565 @@
+"""An in-process gRPC server speaking the Nacos protocol, for tests and benchmarks.
+
+It serves the Request and BiRequestStream services of nacos_grpc_service.proto on 127.0.0.1 and
+keeps configs, instances and AI resources in memory:
+
+* server checks, health checks, connection setup and ability negotiation
+* config query, publish, remove and batch listen, listeners get a ConfigChangeNotifyRequest push
+* instance register/deregister, subscribe, service query and list, subscribers get a
+  NotifySubscriberRequest push, ephemeral instances go away with the connection that registered them
+* mcp server, agent card and prompt queries of resources put in with the ``put_*`` methods
+
+Latency, errors, connection resets and push floods are scriptable. Queries of one connection are
+served at most ``max_concurrent_streams`` at a time, which models the per HTTP/2 connection
+ceiling of a real server: a single connection tops out at ``max_concurrent_streams / latency``
+requests per second.
+
+Clients reach it with ``server_addresses=f"127.0.0.1:{port - 1000}"``, the client adds the
+gRPC port offset.
+"""
+import asyncio
+import itertools
+import json
+import time
+import uuid
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import grpc
+
+from v2.nacos.ai.model.a2a.a2a import AgentCardDetailInfo
+from v2.nacos.ai.model.ai_request import QueryMcpServerRequest, QueryAgentCardRequest, QueryPromptRequest
+from v2.nacos.ai.model.ai_response import QueryMcpServerResponse, QueryAgentCardResponse, QueryPromptResponse
+from v2.nacos.ai.model.mcp.mcp import McpServerDetailInfo
+from v2.nacos.ai.model.prompt.prompt import Prompt
+from v2.nacos.common.nacos_exception import SERVER_ERROR, SERVER_NOT_IMPLEMENTED, NOT_FOUND, CONFLICT
+from v2.nacos.config.model.config_request import ConfigQueryRequest, ConfigPublishRequest, ConfigRemoveRequest, \
+    ConfigBatchListenRequest, ConfigChangeNotifyRequest
+from v2.nacos.config.model.config_response import ConfigQueryResponse, ConfigPublishResponse, ConfigRemoveResponse, \
+    ConfigChangeBatchListenResponse, ConfigContext
+from v2.nacos.naming.model.instance import Instance
+from v2.nacos.naming.model.naming_request import InstanceRequest, PersistentInstanceRequest, BatchInstanceRequest, \
+    SubscribeServiceRequest, ServiceQueryRequest, ServiceListRequest, NotifySubscriberRequest
+from v2.nacos.naming.model.naming_response import InstanceResponse, BatchInstanceResponse, \
+    SubscribeServiceResponse, QueryServiceResponse, ServiceListResponse
+from v2.nacos.naming.model.service import Service
+from v2.nacos.naming.util.naming_remote_constants import NamingRemoteConstants
+from v2.nacos.transport.ability import AbilityKey
+from v2.nacos.transport.grpc_util import GrpcUtils
+from v2.nacos.transport.grpcauto import nacos_grpc_service_pb2_grpc
+from v2.nacos.transport.model.internal_request import ServerCheckRequest, HealthCheckRequest, \
+    ConnectionSetupRequest, SetupAckRequest, ConnectResetRequest
+from v2.nacos.transport.model.internal_response import ServerCheckResponse, HealthCheckResponse, ErrorResponse
+from v2.nacos.transport.model.rpc_request import Request
+from v2.nacos.transport.model.rpc_response import Response
+from v2.nacos.utils.md5_util import md5
+
+# config not found, the error code the config client treats as an empty config
+CONFIG_NOT_FOUND = 300
+
+DEFAULT_ABILITIES = {
+    AbilityKey.SERVER_PERSISTENT_INSTANCE_BY_GRPC.key_name: True,
+    AbilityKey.SERVER_MCP_REGISTRY.key_name: True,
+    AbilityKey.SERVER_AGENT_REGISTRY.key_name: True,
+}
+
+_REQUEST_TYPES = {request_class.__name__: request_class for request_class in [
+    ServerCheckRequest, HealthCheckRequest, ConnectionSetupRequest,
+    ConfigQueryRequest, ConfigPublishRequest, ConfigRemoveRequest, ConfigBatchListenRequest,
+    InstanceRequest, PersistentInstanceRequest, BatchInstanceRequest, SubscribeServiceRequest,
+    ServiceQueryRequest, ServiceListRequest,
+    QueryMcpServerRequest, QueryAgentCardRequest, QueryPromptRequest,
+]}
+_INTERNAL_REQUEST_TYPES = {"ServerCheckRequest", "HealthCheckRequest", "ConnectionSetupRequest"}
+
+_CLOSE = object()
+_DROP = object()
+
+
+def _decode_request(payload, request_class):
+    # the client leaves out None fields, which the request models declare without a default
+    data = json.loads(payload.body.value)
+    for name, field in request_class.model_fields.items():
+        if field.is_required():
+            data.setdefault(name, None)
+    request = request_class.model_validate(data)
+    request.put_all_headers(dict(payload.metadata.headers))
+    return request
+
+
+class FakeConnection:
+    """One client connection, known from its server check on and registered with its bi stream."""
+
+    def __init__(self, connection_id: str, peer: str):
+        self.connection_id = connection_id
+        self.peer = peer
+        self.labels: dict = {}
+        self.client_abilities: Dict[str, bool] = {}
+        self.setup = asyncio.Event()
+        self.ack_count = 0
+        self.outbox: asyncio.Queue = asyncio.Queue()
+        self.tasks = set()
+
+
+class Fault:
+    """An injected failure of the requests of one type, or of every non internal request.
+
+    With ``status`` the call fails with that gRPC status like a broken transport, otherwise it is
+    answered with an error response. ``times`` limits how many requests fail, None fails all.
+    """
+
+    def __init__(self, request_type: Optional[str], error_code: int, message: str, times: Optional[int],
+                 status: Optional[grpc.StatusCode]):
+        self.request_type = request_type
+        self.error_code = error_code
+        self.message = message
+        self.times = times
+        self.status = status
+
+    def matches(self, request_type: str) -> bool:
+        return self.times != 0 and (self.request_type is None or self.request_type == request_type)
+
+
+class FakeNacosServer(nacos_grpc_service_pb2_grpc.RequestServicer,
+                      nacos_grpc_service_pb2_grpc.BiRequestStreamServicer):
+
+    def __init__(self, latency_ms: float = 0, max_concurrent_streams: int = 0,
+                 abilities: Optional[Dict[str, bool]] = None, ability_negotiation: bool = True):
+        self.latency_ms = latency_ms
+        self.max_concurrent_streams = max_concurrent_streams
+        self.abilities = dict(DEFAULT_ABILITIES if abilities is None else abilities)
+        self.ability_negotiation = ability_negotiation
+        self.request_count = 0
+        self.connection_count = 0
+        self.push_count = 0
+        self.requests_by_type: Counter = Counter()
+        self.peers: Dict[str, asyncio.Semaphore] = {}
+        self.connections: Dict[str, FakeConnection] = {}
+        self.port = None
+
+        self.latencies: Dict[str, float] = {}
+        self.faults: List[Fault] = []
+
+        # (tenant, group, data id) -> (content, md5, last modified)
+        self.configs: Dict[Tuple[str, str, str], Tuple[str, str, int]] = {}
+        self.config_listeners: Dict[Tuple[str, str, str], set] = {}
+        # (namespace, group, service) -> {(ip, port, cluster): (instance, owning connection id or None)}
+        self.services: Dict[Tuple[str, str, str], Dict[tuple, Tuple[Instance, Optional[str]]]] = {}
+        self.subscribers: Dict[Tuple[str, str, str], set] = {}
+        # (namespace, name) -> {version: resource}, the last one put is the latest
+        self.mcp_servers: Dict[Tuple[str, str], Dict[str, McpServerDetailInfo]] = {}
+        self.agent_cards: Dict[Tuple[str, str], Dict[str, AgentCardDetailInfo]] = {}
+        self.prompts: Dict[Tuple[str, str], Dict[str, Prompt]] = {}
+
+        self._connection_ids: Dict[str, str] = {}
+        self._push_ids = itertools.count(1)
+        self._server = None
+        self._handlers = {
+            "ServerCheckRequest": self._server_check,
+            "HealthCheckRequest": self._health_check,
+            "ConfigQueryRequest": self._query_config,
+            "ConfigPublishRequest": self._publish_config,
+            "ConfigRemoveRequest": self._remove_config,
+            "ConfigBatchListenRequest": self._listen_configs,
+            "InstanceRequest": self._instance,
+            "PersistentInstanceRequest": self._instance,
+            "BatchInstanceRequest": self._batch_instance,
+            "SubscribeServiceRequest": self._subscribe_service,
+            "ServiceQueryRequest": self._query_service,
+            "ServiceListRequest": self._list_services,
+            "QueryMcpServerRequest": self._query_mcp_server,
+            "QueryAgentCardRequest": self._query_agent_card,
+            "QueryPromptRequest": self._query_prompt,
+        }
+
+    async def start(self) -> int:
+        self._server = grpc.aio.server()
+        nacos_grpc_service_pb2_grpc.add_RequestServicer_to_server(self, self._server)
+        nacos_grpc_service_pb2_grpc.add_BiRequestStreamServicer_to_server(self, self._server)
+        self.port = self._server.add_insecure_port('127.0.0.1:0')
+        await self._server.start()
+        return self.port
+
+    async def stop(self):
+        if self._server:
+            await self._server.stop(None)
+
+    # scripting
+
+    def set_latency(self, latency_ms: float, request_type: Optional[str] = None) -> None:
+        """Delay of the requests of request_type, or the default delay of every non internal request."""
+        if request_type is None:
+            self.latency_ms = latency_ms
+        else:
+            self.latencies[request_type] = latency_ms
+
+    def inject_error(self, request_type: Optional[str] = None, error_code: int = SERVER_ERROR,
+                     message: str = "injected error", times: Optional[int] = None,
+                     status: Optional[grpc.StatusCode] = None) -> Fault:
+        fault = Fault(request_type, error_code, message, times, status)
+        self.faults.append(fault)
+        return fault
+
+    def clear_faults(self) -> None:
+        self.latencies.clear()
+        self.faults.clear()
+
+    def reset_connections(self, server_ip: Optional[str] = None, server_port: Optional[int] = None) -> int:
+        """Asks every client to reconnect, like a server going offline.
+
+        Without a server the client only switches when its health check fails, with one it
+        reconnects to that server, which may be this one.
+        """
+        request = ConnectResetRequest(serverIp=server_ip, serverPort=str(server_port) if server_port else None)
+        return self.push(request)
+
+    def drop_connections(self) -> int:
+        """Breaks the bi stream of every connection without notice, like a crashed server or a lost link."""
+        connections = list(self.connections.values())
+        for connection in connections:
+            connection.outbox.put_nowait(_DROP)
+        return len(connections)
+
+    def push(self, request: Request, connection_ids: Optional[Iterable[str]] = None) -> int:
+        """Pushes request to the given connections or to all of them, returns how many got it."""
+        if connection_ids is None:
+            connection_ids = list(self.connections)
+        pushed = 0
+        for connection_id in connection_ids:
+            connection = self.connections.get(connection_id)
+            if connection is None:
+                continue
+            request.requestId = str(next(self._push_ids))
+            connection.outbox.put_nowait(GrpcUtils.convert_request_to_payload(request))
+            pushed += 1
+        self.push_count += pushed
+        return pushed
+
+    def push_flood(self, request: Request, count: int, connection_ids: Optional[Iterable[str]] = None) -> int:
+        connection_ids = list(self.connections if connection_ids is None else connection_ids)
+        return sum(self.push(request, connection_ids) for _ in range(count))
+
+    async def wait_for_connections(self, count: int, timeout: float = 5) -> None:
+        """Waits until count connections finished their setup."""
+        deadline = time.monotonic() + timeout
+        while sum(1 for connection in self.connections.values() if connection.setup.is_set()) < count:
+            if time.monotonic() > deadline:
+                raise asyncio.TimeoutError(f"{count} connections are not set up in {timeout}s")
+            await asyncio.sleep(0.01)
+
+    def publish_config(self, data_id: str, group: str, content: str, tenant: str = '') -> None:
+        """Changes a config on the server side, its listeners are notified."""
+        key = (tenant, group, data_id)
+        self.configs[key] = (content, md5(content), int(time.time() * 1000))
+        self._notify_config(key)
+
+    def remove_config(self, data_id: str, group: str, tenant: str = '') -> None:
+        key = (tenant, group, data_id)
+        if self.configs.pop(key, None) is not None:
+            self._notify_config(key)
+
+    def register_instance(self, service_name: str, instance: Instance, group_name: str = "DEFAULT_GROUP",
+                          namespace: str = "public") -> None:
+        """Adds an instance owned by no connection, its subscribers are notified."""
+        key = (namespace, group_name, service_name)
+        self.services.setdefault(key, {})[self._instance_key(instance)] = (instance, None)
+        self._notify_service(key)
+
+    def deregister_instance(self, service_name: str, instance: Instance, group_name: str = "DEFAULT_GROUP",
+                            namespace: str = "public") -> None:
+        key = (namespace, group_name, service_name)
+        if self.services.get(key, {}).pop(self._instance_key(instance), None) is not None:
+            self._notify_service(key)
+
+    def put_mcp_server(self, detail: McpServerDetailInfo, namespace_id: str = "public") -> None:
+        version = detail.versionDetail.version if detail.versionDetail else detail.version
+        self._put_versioned(self.mcp_servers, (namespace_id, detail.name), version, detail)
+
+    def put_agent_card(self, card: AgentCardDetailInfo, namespace_id: str = "public") -> None:
+        self._put_versioned(self.agent_cards, (namespace_id, card.name), card.version, card)
+
+    def put_prompt(self, prompt: Prompt, namespace_id: str = "public") -> None:
+        self._put_versioned(self.prompts, (namespace_id, prompt.promptKey), prompt.version, prompt)
+
+    # Request service
+
+    async def request(self, request, context):
+        self.request_count += 1
+        request_type = request.metadata.type
+        fault = self._take_fault(request_type)
+        if fault is not None and fault.status is not None:
+            await context.abort(fault.status, fault.message)
+        response = await self._serve(request, context.peer(), fault)
+        return GrpcUtils.convert_response_to_payload(response)
+
+    async def _serve(self, payload, peer: str, fault: Optional[Fault]) -> Response:
+        request_type = payload.metadata.type
+        self.requests_by_type[request_type] += 1
+        handler = self._handlers.get(request_type)
+        if handler is None:
+            return ErrorResponse(resultCode=500, errorCode=SERVER_NOT_IMPLEMENTED,
+                                 message=f"unsupported request {request_type}")
+        request = _decode_request(payload, _REQUEST_TYPES[request_type])
+        if request.get_module() != 'internal':
+            async with self._slots_of(peer):
+                latency_ms = self.latencies.get(request_type, self.latency_ms)
+                if latency_ms > 0:
+                    await asyncio.sleep(latency_ms / 1000)
+        if fault is not None:
+            response = ErrorResponse(resultCode=500, errorCode=fault.error_code, message=fault.message)
+        else:
+            response = handler(request, self._connection_ids.get(peer))
+        if isinstance(response, ServerCheckResponse):
+            # the connection id of the channel, its bi stream and requests come from the same peer
+            self._connection_ids[peer] = response.connectionId
+        response.requestId = request.requestId
+        return response
+
+    def _take_fault(self, request_type: str) -> Optional[Fault]:
+        # connecting and health checks are left alone, connection faults are scripted on their own
+        if request_type in _INTERNAL_REQUEST_TYPES:
+            return None
+        for fault in self.faults:
+            if fault.matches(request_type):
+                if fault.times is not None:
+                    fault.times -= 1
+                return fault
+        return None
+
+    def _slots_of(self, peer: str) -> asyncio.Semaphore:
+        slots = self.peers.get(peer)
+        if slots is None:
+            slots = asyncio.Semaphore(self.max_concurrent_streams if self.max_concurrent_streams > 0 else 1 << 30)
+            self.peers[peer] = slots
+        return slots
+
+    # BiRequestStream service
+
+    async def requestBiStream(self, request_iterator, context):
+        peer = context.peer()
+        connection_id = self._connection_ids.setdefault(peer, str(uuid.uuid4()))
+        connection = FakeConnection(connection_id, peer)
+        self.connections[connection_id] = connection
+        reader = asyncio.create_task(self._read_stream(connection, request_iterator))
+        try:
+            while True:
+                payload = await connection.outbox.get()
+                if payload is _CLOSE:
+                    return
+                if payload is _DROP:
+                    await context.abort(grpc.StatusCode.UNAVAILABLE, "connection dropped by the server")
+                yield payload
+        finally:
+            reader.cancel()
+            for task in connection.tasks:
+                task.cancel()
+            self._close_connection(connection)
+
+    async def _read_stream(self, connection: FakeConnection, request_iterator):
+        try:
+            async for payload in request_iterator:
+                payload_type = payload.metadata.type
+                if payload_type == "ConnectionSetupRequest":
+                    setup = _decode_request(payload, ConnectionSetupRequest)
+                    connection.labels = setup.labels
+                    connection.client_abilities = setup.abilityTable or {}
+                    if self.ability_negotiation:
+                        self.push(SetupAckRequest(abilityTable=dict(self.abilities)), [connection.connection_id])
+                    connection.setup.set()
+                elif payload_type in _REQUEST_TYPES:
+                    # requests sent over the bi stream are answered on it, each on its own
+                    task = asyncio.create_task(self._answer_on_stream(connection, payload))
+                    connection.tasks.add(task)
+                    task.add_done_callback(connection.tasks.discard)
+                else:
+                    # the response of the client to a push
+                    connection.ack_count += 1
+        except (asyncio.CancelledError, grpc.RpcError):
+            pass
+        connection.outbox.put_nowait(_CLOSE)
+
+    async def _answer_on_stream(self, connection: FakeConnection, payload):
+        self.request_count += 1
+        fault = self._take_fault(payload.metadata.type)
+        if fault is not None and fault.status is not None:
+            connection.outbox.put_nowait(_DROP)
+            return
+        response = await self._serve(payload, connection.peer, fault)
+        connection.outbox.put_nowait(GrpcUtils.convert_response_to_payload(response))
+
+    def _close_connection(self, connection: FakeConnection):
+        if self.connections.get(connection.connection_id) is connection:
+            del self.connections[connection.connection_id]
+        self._connection_ids.pop(connection.peer, None)
+        for listeners in self.config_listeners.values():
+            listeners.discard(connection.connection_id)
+        for subscribers in self.subscribers.values():
+            subscribers.discard(connection.connection_id)
+        # ephemeral instances live as long as the connection that registered them
+        for key, instances in self.services.items():
+            owned = [instance_key for instance_key, (_, owner) in instances.items()
+                     if owner == connection.connection_id]
+            for instance_key in owned:
+                del instances[instance_key]
+            if owned:
+                self._notify_service(key)
+
+    # internal
+
+    def _server_check(self, request: ServerCheckRequest, connection_id: Optional[str]) -> Response:
+        self.connection_count += 1
+        return ServerCheckResponse(connectionId=str(uuid.uuid4()), supportAbilityNegotiation=self.ability_negotiation)
+
+    def _health_check(self, request: HealthCheckRequest, connection_id: Optional[str]) -> Response:
+        return HealthCheckResponse()
+
+    # config
+
+    def _query_config(self, request: ConfigQueryRequest, connection_id: Optional[str]) -> Response:
+        config = self.configs.get((request.tenant or '', request.group, request.dataId))
+        if config is None:
+            return ConfigQueryResponse(resultCode=500, errorCode=CONFIG_NOT_FOUND, message="config data not exist",
+                                       lastModified=0)
+        content, content_md5, last_modified = config
+        return ConfigQueryResponse(content=content, md5=content_md5, lastModified=last_modified)
+
+    def _publish_config(self, request: ConfigPublishRequest, connection_id: Optional[str]) -> Response:
+        key = (request.tenant or '', request.group, request.dataId)
+        current = self.configs.get(key)
+        if request.casMd5 and (current is None or current[1] != request.casMd5):
+            return ConfigPublishResponse(resultCode=500, errorCode=CONFLICT, message="cas publish fail")
+        self.publish_config(request.dataId, request.group, request.content or '', request.tenant or '')
+        return ConfigPublishResponse()
+
+    def _remove_config(self, request: ConfigRemoveRequest, connection_id: Optional[str]) -> Response:
+        self.remove_config(request.dataId, request.group, request.tenant or '')
+        return ConfigRemoveResponse()
+
+    def _listen_configs(self, request: ConfigBatchListenRequest, connection_id: Optional[str]) -> Response:
+        changed = []
+        for context in request.configListenContexts:
+            key = (context.tenant, context.group, context.dataId)
+            listeners = self.config_listeners.setdefault(key, set())
+            if not request.listen:
+                listeners.discard(connection_id)
+                continue
+            listeners.add(connection_id)
+            config = self.configs.get(key)
+            if (config[1] if config else '') != (context.md5 or ''):
+                changed.append(ConfigContext(group=context.group, dataId=context.dataId, tenant=context.tenant))
+        return ConfigChangeBatchListenResponse(changedConfigs=changed)
+
+    def _notify_config(self, key: Tuple[str, str, str]):
+        tenant, group, data_id = key
+        self.push(ConfigChangeNotifyRequest(group=group, dataId=data_id, tenant=tenant),
+                  list(self.config_listeners.get(key, ())))
+
+    # naming
+
+    def _instance(self, request: InstanceRequest, connection_id: Optional[str]) -> Response:
+        key = (request.namespace, request.groupName, request.serviceName)
+        instances = self.services.setdefault(key, {})
+        owner = connection_id if request.instance.ephemeral else None
+        if request.type == NamingRemoteConstants.DE_REGISTER_INSTANCE:
+            instances.pop(self._instance_key(request.instance), None)
+        else:
+            instances[self._instance_key(request.instance)] = (request.instance, owner)
+        self._notify_service(key)
+        return InstanceResponse()
+
+    def _batch_instance(self, request: BatchInstanceRequest, connection_id: Optional[str]) -> Response:
+        # a batch register replaces the instances the connection registered before
+        key = (request.namespace, request.groupName, request.serviceName)
+        instances = self.services.setdefault(key, {})
+        for instance_key in [k for k, (_, owner) in instances.items() if owner == connection_id]:
+            del instances[instance_key]
+        for instance in request.instances or []:
+            instances[self._instance_key(instance)] = (instance, connection_id)
+        self._notify_service(key)
+        return BatchInstanceResponse()
+
+    def _subscribe_service(self, request: SubscribeServiceRequest, connection_id: Optional[str]) -> Response:
+        key = (request.namespace, request.groupName, request.serviceName)
+        subscribers = self.subscribers.setdefault(key, set())
+        if request.subscribe:
+            subscribers.add(connection_id)
+        else:
+            subscribers.discard(connection_id)
+        return SubscribeServiceResponse(serviceInfo=self._service_of(key, request.clusters or ''))
+
+    def _query_service(self, request: ServiceQueryRequest, connection_id: Optional[str]) -> Response:
+        key = (request.namespace, request.groupName, request.serviceName)
+        return QueryServiceResponse(serviceInfo=self._service_of(key, request.cluster or '', bool(request.healthOnly)))
+
+    def _list_services(self, request: ServiceListRequest, connection_id: Optional[str]) -> Response:
+        names = sorted(service for (namespace, group, service), instances in self.services.items()
+                       if namespace == request.namespace and group == request.groupName and instances)
+        page_no, page_size = max(request.pageNo or 1, 1), request.pageSize or 10
+        return ServiceListResponse(count=len(names), serviceNames=names[(page_no - 1) * page_size:page_no * page_size])
+
+    def _service_of(self, key: Tuple[str, str, str], clusters: str = '', healthy_only: bool = False) -> Service:
+        _, group, service_name = key
+        cluster_names = {cluster for cluster in clusters.split(",") if cluster}
+        hosts = []
+        for instance, _ in self.services.get(key, {}).values():
+            if cluster_names and instance.clusterName not in cluster_names:
+                continue
+            if healthy_only and not instance.healthy:
+                continue
+            hosts.append(instance.model_copy(update={
+                "serviceName": f"{group}@@{service_name}",
+                "instanceId": instance.instanceId or
+                              f"{instance.ip}#{instance.port}#{instance.clusterName}#{group}@@{service_name}"}))
+        return Service(name=service_name, groupName=group, clusters=clusters, hosts=hosts,
+                       lastRefTime=int(time.time() * 1000), cacheMillis=10000)
+
+    def _notify_service(self, key: Tuple[str, str, str]):
+        namespace, group, service_name = key
+        self.push(NotifySubscriberRequest(namespace=namespace, groupName=group, serviceName=service_name,
+                                          serviceInfo=self._service_of(key)),
+                  list(self.subscribers.get(key, ())))
+
+    @staticmethod
+    def _instance_key(instance: Instance) -> tuple:
+        return instance.ip, instance.port, instance.clusterName
+
+    # ai
+
+    def _query_mcp_server(self, request: QueryMcpServerRequest, connection_id: Optional[str]) -> Response:
+        detail = self._get_versioned(self.mcp_servers, (request.namespaceId, request.mcpName), request.version)
+        if detail is None:
+            return QueryMcpServerResponse(resultCode=500, errorCode=NOT_FOUND,
+                                          message=f"mcp server {request.mcpName} not found")
+        return QueryMcpServerResponse(mcpServerDetailInfo=detail)
+
+    def _query_agent_card(self, request: QueryAgentCardRequest, connection_id: Optional[str]) -> Response:
+        card = self._get_versioned(self.agent_cards, (request.namespaceId, request.agentName), request.version)
+        if card is None:
+            return QueryAgentCardResponse(resultCode=500, errorCode=NOT_FOUND,
+                                          message=f"agent {request.agentName} not found")
+        return QueryAgentCardResponse(agentCardDetailInfo=card)
+
+    def _query_prompt(self, request: QueryPromptRequest, connection_id: Optional[str]) -> Response:
+        prompt = self._get_versioned(self.prompts, (request.namespaceId, request.promptKey), request.version)
+        if prompt is None:
+            return QueryPromptResponse(resultCode=500, errorCode=NOT_FOUND,
+                                       message=f"prompt {request.promptKey} not found")
+        if request.md5 and request.md5 == prompt.md5:
+            # unchanged since the version the client has
+            return QueryPromptResponse()
+        return QueryPromptResponse(promptInfo=prompt)
+
+    @staticmethod
+    def _put_versioned(store: dict, key: tuple, version: Optional[str], resource) -> None:
+        versions = store.setdefault(key, {})
+        versions.pop(version or '', None)
+        versions[version or ''] = resource
+
+    @staticmethod
+    def _get_versioned(store: dict, key: tuple, version: Optional[str]):
+        versions = store.get(key)
+        if not versions:
+            return None
+        if version:
+            return versions.get(version)
+        return next(reversed(versions.values()))
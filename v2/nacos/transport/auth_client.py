@@ -1,9 +1,57 @@
+import asyncio
+import hashlib
 import json
+import os
 import time
+from typing import Optional
 
 from v2.nacos.common.client_config import ClientConfig
+from v2.nacos.common.constants import Constants
 from v2.nacos.common.nacos_exception import NacosException, SERVER_ERROR
 from v2.nacos.transport.http_agent import HttpAgent
+from v2.nacos.utils.aes_util import encrypt_gcm, decrypt_gcm
+from v2.nacos.utils.file_util import read_file, write_to_file, is_file_exist
+
+
+class AccessTokenCache:
+    """Access token kept on disk so that a restarted client can use it before logging in again.
+
+    The file is encrypted with a key derived from the credentials, so it is only readable with the
+    password it was obtained with.
+    """
+
+    TOKEN_FIELDS = frozenset({"accessToken", "tokenTtl", "refreshTime", "expiredTime"})
+
+    def __init__(self, logger, client_config: ClientConfig):
+        self.logger = logger
+        identity = "|".join([client_config.username or "", ",".join(client_config.server_list),
+                             client_config.endpoint or "", client_config.context_path])
+        cache_dir = client_config.cache_dir or os.path.join(os.path.expanduser("~"), "nacos", "cache")
+        self.file_path = os.path.join(cache_dir, "auth", hashlib.sha256(identity.encode("utf-8")).hexdigest())
+        self._key = hashlib.sha256(f"{identity}|{client_config.password}".encode("utf-8")).digest()
+
+    async def load(self) -> Optional[dict]:
+        """The cached token, None when there is none or it can not be used, the client logs in then."""
+        try:
+            if not is_file_exist(self.file_path):
+                return None
+            content = await read_file(self.logger, self.file_path)
+            if not content:
+                return None
+            token = json.loads(decrypt_gcm(content, self._key))
+            if not isinstance(token, dict) or not self.TOKEN_FIELDS <= token.keys():
+                raise ValueError("cached token is incomplete")
+            return token
+        except Exception as e:
+            self.logger.warning(f"[access-token-cache] ignore unreadable cache {self.file_path}, error: {e}")
+            return None
+
+    async def save(self, token: dict) -> None:
+        try:
+            await write_to_file(self.logger, self.file_path, encrypt_gcm(json.dumps(token), self._key))
+            os.chmod(self.file_path, 0o600)
+        except Exception as e:
+            self.logger.warning(f"[access-token-cache] failed to save cache {self.file_path}, error: {e}")
 
 
 class AuthClient:
@@ -18,30 +66,90 @@ class AuthClient:
         self.token_ttl = 0
         self.last_refresh_time = 0
         self.token_expired_time = None
+        self.refresh_ratio = client_config.auth_token_refresh_ratio
+        # the login in progress, concurrent callers wait for it instead of logging in themselves
+        self.login_task: Optional[asyncio.Task] = None
+        self.refresh_task: Optional[asyncio.Task] = None
+        self.token_cache = AccessTokenCache(logger, client_config) if client_config.auth_token_cache_enabled else None
+        self.cache_loaded = False
 
     async def get_access_token(self, force_refresh=False):
         current_time = time.time()
         if self.access_token and not force_refresh and self.token_expired_time > current_time:
             return self.access_token
 
+        if not force_refresh and self.token_cache and not self.cache_loaded:
+            self.cache_loaded = True
+            cached = await self.token_cache.load()
+            if cached and cached.get("expiredTime", 0) > current_time:
+                self._apply_token(cached["accessToken"], cached["tokenTtl"], cached["refreshTime"])
+                self.logger.info(f"[get_access_token] use cached access token, TTL: {self.token_ttl}")
+                return self.access_token
+
+        if self.login_task is None or self.login_task.done():
+            self.login_task = asyncio.create_task(self._login(force_refresh))
+        # a caller giving up must not cancel the login the others wait for
+        return await asyncio.shield(self.login_task)
+
+    async def _login(self, force_refresh: bool):
         params = {
             "username": self.username,
             "password": self.password
         }
         ctx_prefix = self.client_config.build_context_prefix()
-        server_list = self.get_server_list()
-        for server_address in server_list:
-            url = server_address + ctx_prefix + "/v1/auth/users/login"
-            resp, error = await self.http_agent.request(url, "POST", None, params, None)
-            if not resp or error:
-                self.logger.warning(f"[get-access-token] request {url} failed, error: {error}")
-                continue
-
-            response_data = json.loads(resp.decode("UTF-8"))
-            self.access_token = response_data.get('accessToken')
-            self.token_ttl = response_data.get('tokenTtl', 18000)  # 默认使用返回值，无返回则使用18000秒
-            self.token_expired_time = current_time + self.token_ttl - 10  # 更新 Token 的过期时间
-            self.logger.info(
-                f"[get_access_token] AccessToken: {self.access_token}, TTL: {self.token_ttl}, force_refresh: {force_refresh}")
-            return self.access_token
+        current_time = time.time()
+        # every server is asked at once, the first answer wins instead of waiting out the dead ones in turn
+        attempts = [asyncio.create_task(self._login_to(server_address + ctx_prefix + "/v1/auth/users/login", params))
+                    for server_address in self.get_server_list()]
+        try:
+            for attempt in asyncio.as_completed(attempts):
+                response_data = await attempt
+                if not response_data:
+                    continue
+                self._apply_token(response_data.get('accessToken'),
+                                  response_data.get('tokenTtl', 18000),  # 默认使用返回值，无返回则使用18000秒
+                                  current_time)
+                self.logger.info(
+                    f"[get_access_token] AccessToken: {self.access_token}, TTL: {self.token_ttl}, force_refresh: {force_refresh}")
+                if self.token_cache:
+                    await self.token_cache.save({"accessToken": self.access_token, "tokenTtl": self.token_ttl,
+                                                 "refreshTime": self.last_refresh_time,
+                                                 "expiredTime": self.token_expired_time})
+                return self.access_token
+        finally:
+            for attempt in attempts:
+                attempt.cancel()
+            await asyncio.gather(*attempts, return_exceptions=True)
         raise NacosException(SERVER_ERROR, "get access token failed")
+
+    async def _login_to(self, url: str, params: dict) -> Optional[dict]:
+        resp, error = await self.http_agent.request(url, "POST", None, params, None)
+        if not resp or error:
+            self.logger.warning(f"[get-access-token] request {url} failed, error: {error}")
+            return None
+        return json.loads(resp.decode("UTF-8"))
+
+    def _apply_token(self, access_token: str, token_ttl: int, refresh_time: float):
+        self.access_token = access_token
+        self.token_ttl = token_ttl
+        self.last_refresh_time = refresh_time
+        self.token_expired_time = refresh_time + self.token_ttl - 10  # 更新 Token 的过期时间
+        if self.refresh_task is None:
+            self.refresh_task = asyncio.create_task(self._refresh_periodically())
+
+    async def _refresh_periodically(self):
+        # log in again before the token expires, so requests never wait for a login
+        while True:
+            refresh_at = self.last_refresh_time + self.token_ttl * self.refresh_ratio
+            await asyncio.sleep(max(1.0, refresh_at - time.time()))
+            try:
+                await self.get_access_token(True)
+            except NacosException as e:
+                self.logger.warning(f"[refresh-access-token] failed, retry later, error: {e}")
+                await asyncio.sleep(Constants.AUTH_TOKEN_REFRESH_RETRY_INTERVAL)
+
+    async def close(self):
+        for task in (self.refresh_task, self.login_task):
+            if task and not task.done():
+                task.cancel()
+        self.refresh_task = None
@@ -0,0 +1,77 @@
+import asyncio
+import itertools
+import time
+from v2.nacos.common.constants import Constants
+from v2.nacos.common.nacos_exception import NacosException, CLIENT_OVER_THRESHOLD, CLIENT_DISCONNECT
+from v2.nacos.transport.grpcauto.nacos_grpc_service_pb2 import Payload
+
+PRIORITY_CONTROL = 0  # connection setup
+PRIORITY_ACK = 1  # responses to server pushes, the server waits for them before pushing again
+PRIORITY_REQUEST = 2  # requests sent on the bi stream
+_PRIORITY_CLOSED = -1  # wakes the reader of a closed queue
+
+
+class BiStreamSendQueue:
+    """Bounded priority queue of the payloads waiting to be written to a bi stream.
+
+    Control payloads leave first, then acks, then requests, each in the order they were put. A put
+    waits while the queue is full and fails after put_timeout_ms, so a stream that stopped being
+    read fails its senders instead of buffering without bound.
+    """
+
+    def __init__(self, max_size: int = Constants.GRPC_BI_STREAM_QUEUE_SIZE,
+                 put_timeout_ms: float = Constants.GRPC_BI_STREAM_PUT_TIMEOUT_MILLS):
+        self.max_size = max(1, max_size)
+        self.put_timeout_ms = put_timeout_ms
+        self._queue = asyncio.PriorityQueue(self.max_size)
+        self._seq = itertools.count()
+        self.closed = False
+        self.sent = 0
+        self.max_depth = 0
+        self.total_wait_ms = 0.0
+        self.max_wait_ms = 0.0
+
+    async def put(self, payload: Payload, priority: int = PRIORITY_REQUEST) -> None:
+        if self.closed:
+            raise NacosException(CLIENT_DISCONNECT, "bi stream is closed")
+        # the sequence keeps equal priorities in order, payloads themselves are never compared
+        item = (priority, next(self._seq), time.perf_counter(), payload)
+        try:
+            await asyncio.wait_for(self._queue.put(item), self.put_timeout_ms / 1000)
+        except asyncio.TimeoutError:
+            raise NacosException(CLIENT_OVER_THRESHOLD,
+                                 f"bi stream send queue is full, size:{self.max_size}, timeout:{self.put_timeout_ms}ms")
+        self.max_depth = max(self.max_depth, self._queue.qsize())
+
+    async def get(self) -> Payload:
+        """The next payload to send, raises NacosException once the queue is closed."""
+        if self.closed:
+            raise NacosException(CLIENT_DISCONNECT, "bi stream is closed")
+        item = await self._queue.get()
+        _, _, enqueued, payload = item
+        if payload is None:
+            # left for any other reader
+            self._queue.put_nowait(item)
+            raise NacosException(CLIENT_DISCONNECT, "bi stream is closed")
+        wait_ms = (time.perf_counter() - enqueued) * 1000
+        self.sent += 1
+        self.total_wait_ms += wait_ms
+        self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+        return payload
+
+    def qsize(self) -> int:
+        return 0 if self.closed else self._queue.qsize()
+
+    def close(self) -> None:
+        """Drops the queued payloads, nothing reads them any more."""
+        if self.closed:
+            return
+        self.closed = True
+        while not self._queue.empty():
+            self._queue.get_nowait()
+        self._queue.put_nowait((_PRIORITY_CLOSED, next(self._seq), time.perf_counter(), None))
+
+    def snapshot(self) -> dict:
+        return {"depth": self.qsize(), "max_depth": self.max_depth, "sent": self.sent,
+                "avg_wait_ms": self.total_wait_ms / self.sent if self.sent else 0.0,
+                "max_wait_ms": self.max_wait_ms}
@@ -0,0 +1,93 @@
+import random
+import time
+from enum import Enum
+from typing import Optional
+
+from v2.nacos.common.constants import Constants
+
+
+class CircuitState(Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class DecorrelatedJitterBackoff:
+    """Decorrelated jitter backoff: every delay is drawn from [base, 3 * previous delay], capped.
+
+    Clients that failed at the same moment spread out instead of retrying in lockstep.
+    """
+
+    def __init__(self, base_ms: float = Constants.GRPC_RECONNECT_BACKOFF_BASE_MILLS,
+                 cap_ms: float = Constants.GRPC_RECONNECT_BACKOFF_MAX_MILLS):
+        self.base_ms = base_ms
+        self.cap_ms = max(cap_ms, base_ms)
+        self._previous_ms = base_ms
+
+    def next_delay_ms(self) -> float:
+        self._previous_ms = min(self.cap_ms, random.uniform(self.base_ms, self._previous_ms * 3))
+        return self._previous_ms
+
+    def reset(self) -> None:
+        self._previous_ms = self.base_ms
+
+
+class CircuitBreaker:
+    """Breaker of one server.
+
+    CLOSED lets every attempt through. After failure_threshold consecutive failures it turns
+    OPEN and rejects attempts for a jittered, growing period. When the period is over the next
+    attempt is let through as a HALF_OPEN trial: its success closes the breaker, its failure
+    opens it again for a longer period.
+    """
+
+    def __init__(self, failure_threshold: int = Constants.GRPC_CIRCUIT_FAILURE_THRESHOLD,
+                 open_base_ms: float = Constants.GRPC_CIRCUIT_OPEN_BASE_MILLS,
+                 open_max_ms: float = Constants.GRPC_CIRCUIT_OPEN_MAX_MILLS):
+        self.failure_threshold = max(1, failure_threshold)
+        self.state = CircuitState.CLOSED
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        self.trial_started: Optional[float] = None
+        self._backoff = DecorrelatedJitterBackoff(open_base_ms, open_max_ms)
+
+    def is_available(self, now: Optional[float] = None) -> bool:
+        now = time.monotonic() if now is None else now
+        if self.state == CircuitState.CLOSED:
+            return True
+        if self.state == CircuitState.OPEN:
+            return now >= self.open_until
+        # half open: one trial at a time, a trial whose result never came is given up after a while
+        return self.trial_started is None or now - self.trial_started >= self._backoff.cap_ms / 1000
+
+    def on_attempt(self, now: Optional[float] = None) -> None:
+        now = time.monotonic() if now is None else now
+        if self.state != CircuitState.CLOSED and self.is_available(now):
+            self.state = CircuitState.HALF_OPEN
+            self.trial_started = now
+
+    def on_cancel(self) -> None:
+        # a trial given up before its result says nothing about the server, the next attempt is the trial
+        self.trial_started = None
+
+    def on_success(self) -> None:
+        self.state = CircuitState.CLOSED
+        self.consecutive_failures = 0
+        self.trial_started = None
+        self._backoff.reset()
+
+    def on_failure(self, now: Optional[float] = None) -> None:
+        now = time.monotonic() if now is None else now
+        self.consecutive_failures += 1
+        if self.state == CircuitState.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            self.state = CircuitState.OPEN
+            self.open_until = now + self._backoff.next_delay_ms() / 1000
+            self.trial_started = None
+
+    def snapshot(self) -> dict:
+        return {
+            "state": self.state.value,
+            "consecutive_failures": self.consecutive_failures,
+            "open_remaining_ms": max(0.0, (self.open_until - time.monotonic()) * 1000)
+            if self.state == CircuitState.OPEN else 0.0,
+        }
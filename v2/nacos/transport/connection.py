@@ -24,6 +24,8 @@ class Connection(IConnection, ABC):
         self.abandon = False
         self.server_info = server_info
         self.ability_table : Optional[Dict[str,bool]] = None
+        # requests sent on this connection and not answered yet
+        self.in_flight = 0
 
     def get_connection_id(self) -> str:
         return self.connection_id
@@ -0,0 +1,102 @@
+import asyncio
+from typing import Dict, Optional
+
+from v2.nacos.common.constants import Constants
+from v2.nacos.common.nacos_exception import NacosException, CLIENT_OVER_THRESHOLD, INVALID_PARAM
+from v2.nacos.utils.common_util import get_current_time_millis
+
+
+class SlidingWindow:
+    """Request count of the last interval_ms, kept in slot_count slots that expire one by one."""
+
+    def __init__(self, threshold: int, slot_count: int = Constants.FLOW_CONTROL_SLOT,
+                 interval_ms: int = Constants.FLOW_CONTROL_INTERVAL):
+        self.threshold = threshold
+        self.slot_count = slot_count
+        self.slot_ms = max(1, interval_ms // slot_count)
+        self._slot_ids = [-1] * slot_count
+        self._counts = [0] * slot_count
+
+    def try_acquire(self, now_ms: int) -> int:
+        """Counts the request and returns 0, or returns how long to wait until a slot expires."""
+        current = now_ms // self.slot_ms
+        oldest = current - self.slot_count + 1
+        total = 0
+        expire_at = None
+        for i in range(self.slot_count):
+            slot_id = self._slot_ids[i]
+            if slot_id < oldest or self._counts[i] == 0:
+                continue
+            total += self._counts[i]
+            slot_expire_at = (slot_id + self.slot_count) * self.slot_ms
+            if expire_at is None or slot_expire_at < expire_at:
+                expire_at = slot_expire_at
+        if total < self.threshold:
+            index = current % self.slot_count
+            if self._slot_ids[index] != current:
+                self._slot_ids[index] = current
+                self._counts[index] = 0
+            self._counts[index] += 1
+            return 0
+        return max(1, expire_at - now_ms)
+
+
+class FlowController:
+    """Limits the requests a client sends per request type, so bulk jobs do not overload the server.
+
+    Every request type has its own sliding window of FLOW_CONTROL_INTERVAL milliseconds. The
+    threshold of a type comes from rules, keyed by request type or by module, and falls back to the
+    default threshold. A request over the limit waits up to wait_ms for the window to move on and is
+    rejected with CLIENT_OVER_THRESHOLD after that.
+    """
+
+    def __init__(self, threshold: int = Constants.FLOW_CONTROL_THRESHOLD, wait_ms: int = Constants.FLOW_CONTROL_WAIT_MILLS,
+                 rules: Optional[Dict[str, int]] = None):
+        # a window with a threshold of 0 or less could never admit a request nor say how long to wait
+        invalid_rules = {key: value for key, value in (rules or {}).items() if value <= 0}
+        if threshold <= 0 or invalid_rules:
+            raise NacosException(INVALID_PARAM, f"flow control thresholds must be positive, threshold:{threshold}, "
+                                                f"invalid rules:{invalid_rules}")
+        self.threshold = threshold
+        self.wait_ms = wait_ms
+        self.rules = dict(rules or {})
+        self._windows: Dict[str, SlidingWindow] = {}
+        self.passed: Dict[str, int] = {}
+        self.delayed: Dict[str, int] = {}
+        self.rejected: Dict[str, int] = {}
+
+    def _window(self, module: str, request_type: str) -> SlidingWindow:
+        window = self._windows.get(request_type)
+        if window is None:
+            threshold = self.rules.get(request_type, self.rules.get(module, self.threshold))
+            window = SlidingWindow(threshold)
+            self._windows[request_type] = window
+        return window
+
+    async def acquire(self, module: str, request_type: str, timeout_ms: int) -> None:
+        window = self._window(module, request_type)
+        now = get_current_time_millis()
+        deadline = now + min(self.wait_ms, timeout_ms)
+        delayed = False
+        while True:
+            wait = window.try_acquire(now)
+            if wait == 0:
+                self.passed[request_type] = self.passed.get(request_type, 0) + 1
+                if delayed:
+                    self.delayed[request_type] = self.delayed.get(request_type, 0) + 1
+                return
+            if now + wait > deadline:
+                self.rejected[request_type] = self.rejected.get(request_type, 0) + 1
+                raise NacosException(CLIENT_OVER_THRESHOLD,
+                                     f"request {request_type} over flow control threshold {window.threshold} "
+                                     f"per {Constants.FLOW_CONTROL_INTERVAL}ms")
+            delayed = True
+            await asyncio.sleep(wait / 1000)
+            now = get_current_time_millis()
+
+    def snapshot(self) -> dict:
+        return {
+            "passed": dict(self.passed),
+            "delayed": dict(self.delayed),
+            "rejected": dict(self.rejected),
+        }
@@ -1,4 +1,5 @@
 import asyncio
+import logging
 from typing import Optional, Dict
 
 import grpc
@@ -7,21 +8,31 @@ import pydantic
 from v2.nacos.common.client_config import ClientConfig
 from v2.nacos.common.constants import Constants
 from v2.nacos.common.nacos_exception import NacosException, CLIENT_DISCONNECT
+from v2.nacos.common.tracing import start_span
 from v2.nacos.transport.ability import SDK_ABILITY_TABLE, AbilityKey, \
     AbilityStatus
+from v2.nacos.transport.bi_stream_queue import PRIORITY_CONTROL, PRIORITY_ACK
+from v2.nacos.transport.circuit_breaker import DecorrelatedJitterBackoff
 from v2.nacos.transport.connection import Connection
+from v2.nacos.transport.flow_control import FlowController
+from v2.nacos.transport.grpc_codec import create_payload_codec
 from v2.nacos.transport.grpc_connection import GrpcConnection
 from v2.nacos.transport.grpc_util import GrpcUtils
 from v2.nacos.transport.grpcauto.nacos_grpc_service_pb2_grpc import BiRequestStreamStub, RequestStub
+from v2.nacos.transport.hedging import HedgePolicy
 from v2.nacos.transport.model.internal_request import ConnectionSetupRequest, \
-    ServerCheckRequest, SETUP_REQUEST_TYPE
-from v2.nacos.transport.model.internal_response import ServerCheckResponse
+    ServerCheckRequest, InternalRequest, SETUP_REQUEST_TYPE, CONNECTION_RESET_REQUEST_TYPE
+from v2.nacos.transport.model.internal_response import ServerCheckResponse, ConnectResetResponse
 from v2.nacos.transport.model.rpc_request import Request
+from v2.nacos.transport.model.rpc_response import Response
 from v2.nacos.transport.model.server_info import ServerInfo
 from v2.nacos.transport.nacos_server_connector import NacosServerConnector
+from v2.nacos.transport.push_dispatcher import PushDispatcher
+from v2.nacos.transport.push_recorder import get_push_recorder
 from v2.nacos.transport.rec_ability_context import RecAbilityContext
 from v2.nacos.transport.rpc_client import RpcClient, RpcClientStatus, ConnectionType
 from v2.nacos.transport.server_request_handler import SetupAckRequestHandler
+from v2.nacos.utils.log_util import LogRateLimiter
 
 
 class GrpcClient(RpcClient):
@@ -32,8 +43,20 @@ class GrpcClient(RpcClient):
         self.tls_config = client_config.tls_config
         self.grpc_config = client_config.grpc_config
         self.tenant = client_config.namespace_id
-        self.rec_ability_context = RecAbilityContext(logger=self.logger,connection=None)
-        self.setup_ack_request_handler = SetupAckRequestHandler(self.rec_ability_context)
+        self.codec = create_payload_codec(self.grpc_config.codec, self.logger)
+        self.push_log_limiter = LogRateLimiter(Constants.PUSH_LOG_INTERVAL)
+        self.push_dispatcher = PushDispatcher(self.logger, self.name, self.grpc_config.push_workers,
+                                              self.grpc_config.push_queue_size)
+        self.push_recorder = None
+        if self.grpc_config.push_record_path:
+            self.push_recorder = get_push_recorder(self.grpc_config.push_record_path,
+                                                   self.grpc_config.push_record_max_bytes, self.logger)
+        if self.grpc_config.hedge_enabled:
+            self.hedge_policy = HedgePolicy(self.grpc_config.hedge_percentile, self.grpc_config.hedge_min_delay_ms,
+                                            self.grpc_config.hedge_budget_percent)
+        if client_config.flow_control_enabled:
+            self.flow_controller = FlowController(client_config.flow_control_threshold,
+                                                  client_config.flow_control_wait_ms, client_config.flow_control_rules)
 
 
 
@@ -69,6 +92,9 @@ class GrpcClient(RpcClient):
         except asyncio.TimeoutError as e:
             await channel.close()
             raise NacosException(CLIENT_DISCONNECT, 'failed to connect nacos server') from e
+        except asyncio.CancelledError:
+            await channel.close()
+            raise
         else:
             return channel
 
@@ -77,9 +103,9 @@ class GrpcClient(RpcClient):
             try:
                 server_check_request = ServerCheckRequest()
                 response_payload = await channel_stub.request(
-                    GrpcUtils.convert_request_to_payload(server_check_request),
+                    GrpcUtils.convert_request_to_payload(server_check_request, self.codec),
                     timeout=self.grpc_config.grpc_timeout / 1000.0)
-                server_check_response = GrpcUtils.parse(response_payload)
+                server_check_response = GrpcUtils.parse(response_payload, self.codec)
                 if not server_check_response or not isinstance(server_check_response, ServerCheckResponse):
                     return None
 
@@ -106,7 +132,23 @@ class GrpcClient(RpcClient):
             return self.current_connection.get_connection_ability(ability_key)
         return None
 
+    def get_connection_pool_size(self) -> int:
+        return max(1, self.grpc_config.channel_pool_size)
+
+    def get_connect_race_size(self) -> int:
+        return max(1, self.grpc_config.connect_race_size)
+
+    def get_connect_race_stagger_ms(self) -> int:
+        return self.grpc_config.connect_race_stagger_ms
+
+    def get_reconnect_backoff(self) -> DecorrelatedJitterBackoff:
+        return DecorrelatedJitterBackoff(self.grpc_config.reconnect_backoff_base_ms,
+                                         self.grpc_config.reconnect_backoff_max_ms)
+
     async def connect_to_server(self, server_info: ServerInfo) -> Optional[Connection]:
+        # every connection negotiates abilities on its own, pooled connections are set up concurrently
+        rec_ability_context = RecAbilityContext(logger=self.logger, connection=None)
+        managed_channel, grpc_conn = None, None
         try:
             managed_channel = await self._create_new_managed_channel(server_info.server_ip, server_info.server_port)
             # Create a stub
@@ -122,9 +164,12 @@ class GrpcClient(RpcClient):
                 f"connect to server success,labels:{self.labels},tenant:{self.tenant},connection_id:{connection_id}")
             bi_request_stream_stub = BiRequestStreamStub(managed_channel)
             grpc_conn = GrpcConnection(server_info, connection_id, managed_channel,
-                                       channel_stub, bi_request_stream_stub)
+                                       channel_stub, bi_request_stream_stub, self.codec,
+                                       self.grpc_config.bi_stream_request_enabled,
+                                       self.grpc_config.bi_stream_queue_size)
+            grpc_conn.setup_ack_request_handler = SetupAckRequestHandler(rec_ability_context)
             if server_check_response.supportAbilityNegotiation:
-                self.rec_ability_context.reset(grpc_conn)
+                rec_ability_context.reset(grpc_conn)
                 grpc_conn.set_ability_table(None)
 
             connection_setup_request = ConnectionSetupRequest(clientVersion=Constants.CLIENT_VERSION,
@@ -132,22 +177,73 @@ class GrpcClient(RpcClient):
                                                               labels=self.labels,
                                                               abilityTable=SDK_ABILITY_TABLE)
             asyncio.create_task(self._server_request_watcher(grpc_conn))
-            await grpc_conn.send_bi_request(GrpcUtils.convert_request_to_payload(connection_setup_request))
-            if self.rec_ability_context.is_need_to_sync():
-                await self.rec_ability_context.await_abilities(self.grpc_config.capability_negotiation_timeout)
-                if not self.rec_ability_context.check(grpc_conn):
+            await grpc_conn.send_bi_request(GrpcUtils.convert_request_to_payload(connection_setup_request, self.codec),
+                                            PRIORITY_CONTROL)
+            if rec_ability_context.is_need_to_sync():
+                # the setup ack is sent once the server registered the connection
+                await rec_ability_context.await_abilities(self.grpc_config.capability_negotiation_timeout)
+                if not rec_ability_context.check(grpc_conn):
                     return None
-            await asyncio.sleep(0.1)
+            else:
+                # give a server without ability negotiation time to register the connection
+                await asyncio.sleep(0.1)
             return grpc_conn
+        except asyncio.CancelledError:
+            if grpc_conn is not None:
+                grpc_conn.set_abandon(True)
+                await grpc_conn.close()
+            elif managed_channel is not None:
+                await managed_channel.close()
+            raise
         except Exception as e:
             self.logger.error(f"connect to server fail,labels:{self.labels},name:{self.name},error={e}")
-            self.rec_ability_context.release(None)
+            rec_ability_context.release(None)
             raise NacosException(CLIENT_DISCONNECT, f"failed to connect nacos server,name:{self.name},error={e}")
 
+    def _log_server_payload(self, grpc_conn: GrpcConnection, payload):
+        # the full payload only at debug level, a push storm gets one info line per type and interval
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("receive stream server request, connection_id:%s, original info: %s",
+                              grpc_conn.get_connection_id(), payload)
+            return
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
+        payload_type = payload.metadata.type
+        suppressed = self.push_log_limiter.acquire(payload_type)
+        if suppressed is not None:
+            self.logger.info("receive stream server request, connection_id:%s, type:%s, size:%s, suppressed:%s",
+                             grpc_conn.get_connection_id(), payload_type, len(payload.body.value), suppressed)
+
+    async def _dispatch_server_request(self, request: Request, grpc_connection: GrpcConnection):
+        # the setup ack completes the connect in progress, it is answered right away
+        if request.get_request_type() == SETUP_REQUEST_TYPE:
+            await self._handle_server_request(request, grpc_connection)
+            return
+        await self.push_dispatcher.submit(request.get_dispatch_key(),
+                                          lambda: self._handle_server_request(request, grpc_connection),
+                                          request.get_request_type(), priority=isinstance(request, InternalRequest))
+
     async def _handle_server_request(self, request: Request, grpc_connection: GrpcConnection):
+        # the ack carries the requestId of the push, so the span links the push to its ack
+        with start_span("nacos.push.handle") as span:
+            span.set_attribute("nacos.request_type", request.get_request_type())
+            span.set_attribute("nacos.request_id", request.requestId or "")
+            span.set_attribute("nacos.connection_id", grpc_connection.get_connection_id() or "")
+            await self._reply_server_request(request, grpc_connection)
+
+    async def _reply_server_request(self, request: Request, grpc_connection: GrpcConnection):
         request_type = request.get_request_type()
         if request_type == SETUP_REQUEST_TYPE:
-            await self.setup_ack_request_handler.request_reply(request)
+            if grpc_connection.setup_ack_request_handler:
+                await grpc_connection.setup_ack_request_handler.request_reply(request)
+            return
+
+        if request_type == CONNECTION_RESET_REQUEST_TYPE and grpc_connection is not self.current_connection:
+            # only the reset connection goes away, requests keep using the current one
+            self.logger.info("%s server reset a connection that is not the current one, connectionId:%s",
+                             self.name, grpc_connection.get_connection_id())
+            await self._send_server_response(request, ConnectResetResponse(), grpc_connection)
+            await self.replace_pool_connection(grpc_connection)
             return
 
         server_request_handler_instance = self.server_request_handler_mapping.get(request_type)
@@ -160,11 +256,14 @@ class GrpcClient(RpcClient):
             self.logger.warning("failed to process server request,connection_id:%s,ackID:%s",
                                 grpc_connection.get_connection_id(), request.get_request_id())
             return
+        await self._send_server_response(request, response, grpc_connection)
 
+    async def _send_server_response(self, request: Request, response: Response, grpc_connection: GrpcConnection):
         try:
             response.set_request_id(request.requestId)
 
-            await grpc_connection.send_bi_request(GrpcUtils.convert_response_to_payload(response))
+            await grpc_connection.send_bi_request(GrpcUtils.convert_response_to_payload(response, self.codec),
+                                                  PRIORITY_ACK)
 
         except Exception as e:
             if isinstance(e, EOFError):
@@ -176,29 +275,54 @@ class GrpcClient(RpcClient):
 
     async def _server_request_watcher(self, grpc_conn: GrpcConnection):
         try:
+            grpc_conn.mark_bi_stream_active(True)
             async for payload in grpc_conn.bi_stream_send():
                 try:
-                    self.logger.info("receive stream server request, connection_id:%s, original info: %s"
-                                     % (grpc_conn.get_connection_id(), str(payload)))
-                    request = GrpcUtils.parse(payload)
+                    self._log_server_payload(grpc_conn, payload)
+                    request = GrpcUtils.parse(payload, self.codec)
+                    if isinstance(request, Response):
+                        if not grpc_conn.complete_request(request):
+                            self.logger.warning("[%s] no pending request for response, requestId:%s",
+                                                grpc_conn.connection_id, request.requestId)
+                        continue
+                    # only pushes are recorded, not the connection's own control requests
+                    if self.push_recorder is not None and not isinstance(request, InternalRequest):
+                        self.push_recorder.record(payload)
                     if request:
-                        await self._handle_server_request(request, grpc_conn)
+                        await self._dispatch_server_request(request, grpc_conn)
 
                 except Exception as e:
                     self.logger.error(f"[{grpc_conn.connection_id}] handle server request occur exception: {e}")
         except Exception as e:
             self.logger.warning(f"[{grpc_conn.connection_id}] bi stream broken: {e}")
-            if not self.is_shutdown():
+            if grpc_conn in self.pool_connections or grpc_conn is self.hedge_connection:
+                await self.remove_pool_connection(grpc_conn)
+            elif not self.is_shutdown() and not grpc_conn.is_abandon():
                 async with self.lock:
                     if self.is_running():
                         self.rpc_client_status = RpcClientStatus.UNHEALTHY
                 await self.switch_server_async(None, False)
+        finally:
+            grpc_conn.mark_bi_stream_active(False)
 
     @staticmethod
     async def _shunt_down_channel(channel):
         if channel:
             await channel.close()
 
+    async def shutdown(self):
+        await super().shutdown()
+        await self.push_dispatcher.shutdown()
+        if self.push_recorder is not None:
+            await asyncio.to_thread(self.push_recorder.flush)
+
+    def metrics_snapshot(self) -> dict:
+        snapshot = super().metrics_snapshot()
+        snapshot["push_dispatcher"] = self.push_dispatcher.snapshot()
+        connection = self.current_connection
+        snapshot["bi_stream_queue"] = connection.queue.snapshot() if isinstance(connection, GrpcConnection) else None
+        return snapshot
+
     def get_connection_type(self):
         return ConnectionType.GRPC
 
@@ -0,0 +1,123 @@
+import json
+import logging
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Type
+
+from v2.nacos.common.constants import Constants
+from v2.nacos.common.nacos_exception import NacosException, CLIENT_INVALID_PARAM
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is an optional dependency
+    orjson = None
+
+CODEC_JSON = "json"
+CODEC_PYDANTIC = "pydantic"
+CODEC_ORJSON = "orjson"
+
+
+def _to_json_fallback(obj):
+    # keep the behavior of GrpcUtils.to_json for objects that are not pydantic models
+    if hasattr(obj, 'model_dump'):
+        return obj.model_dump(by_alias=True, exclude_none=True)
+    if hasattr(obj, '__dict__'):
+        return dict(obj.__dict__)
+    raise TypeError(f"Object of type {obj.__class__.__name__} is not JSON serializable")
+
+
+class PayloadCodec(ABC):
+    """Encodes request/response models into payload body bytes and back."""
+
+    def __init__(self):
+        self._dumpers: Dict[type, Callable] = {}
+
+    @abstractmethod
+    def name(self) -> str:
+        pass
+
+    @abstractmethod
+    def encode(self, obj) -> bytes:
+        pass
+
+    @abstractmethod
+    def decode(self, data: bytes, clazz: Type):
+        pass
+
+    def _dumper_of(self, clazz: type) -> Callable:
+        dumper = self._dumpers.get(clazz)
+        if dumper is None:
+            dumper = self._build_dumper(clazz)
+            self._dumpers[clazz] = dumper
+        return dumper
+
+    @staticmethod
+    def _build_dumper(clazz: type) -> Callable:
+        if hasattr(clazz, 'model_dump'):
+            return lambda obj: obj.model_dump(by_alias=True, exclude_none=True)
+        return _to_json_fallback
+
+
+class JsonPayloadCodec(PayloadCodec):
+    """Standard library codec, the default and the fallback of the other codecs."""
+
+    def name(self) -> str:
+        return CODEC_JSON
+
+    def encode(self, obj) -> bytes:
+        return json.dumps(self._dumper_of(obj.__class__)(obj), default=_to_json_fallback).encode('utf-8')
+
+    def decode(self, data: bytes, clazz: Type):
+        return clazz.model_validate(json.loads(data.decode('utf-8')))
+
+
+class OrjsonPayloadCodec(PayloadCodec):
+    """orjson based codec, dumps models to plain dicts once and lets orjson write the bytes."""
+
+    def name(self) -> str:
+        return CODEC_ORJSON
+
+    def encode(self, obj) -> bytes:
+        return orjson.dumps(self._dumper_of(obj.__class__)(obj), default=_to_json_fallback)
+
+    def decode(self, data: bytes, clazz: Type):
+        return clazz.model_validate(orjson.loads(data))
+
+
+class PydanticPayloadCodec(PayloadCodec):
+    """Serializes and validates straight between models and JSON bytes with the schema
+    serializer/validator pydantic-core compiles once per class, without building
+    intermediate dicts."""
+
+    def name(self) -> str:
+        return CODEC_PYDANTIC
+
+    @staticmethod
+    def _build_dumper(clazz: type) -> Callable:
+        serializer = getattr(clazz, '__pydantic_serializer__', None)
+        if serializer is None:
+            return lambda obj: json.dumps(obj, default=_to_json_fallback).encode('utf-8')
+        return lambda obj: serializer.to_json(obj, by_alias=True, exclude_none=True, fallback=_to_json_fallback)
+
+    def encode(self, obj) -> bytes:
+        return self._dumper_of(obj.__class__)(obj)
+
+    def decode(self, data: bytes, clazz: Type):
+        return clazz.__pydantic_validator__.validate_json(data)
+
+
+def create_payload_codec(codec_name: str = Constants.GRPC_DEFAULT_CODEC, logger=None) -> PayloadCodec:
+    codec_name = (codec_name or CODEC_JSON).lower()
+    if codec_name == CODEC_JSON:
+        return JsonPayloadCodec()
+    if codec_name == CODEC_PYDANTIC:
+        return PydanticPayloadCodec()
+    if codec_name == CODEC_ORJSON:
+        if orjson is None:
+            (logger or logging.getLogger(__name__)).warning(
+                "orjson is not installed, fall back to the json payload codec")
+            return JsonPayloadCodec()
+        return OrjsonPayloadCodec()
+    raise NacosException(CLIENT_INVALID_PARAM, f"unsupported payload codec: {codec_name}")
+
+
+DEFAULT_PAYLOAD_CODEC = JsonPayloadCodec()
@@ -1,9 +1,15 @@
 import asyncio
+import itertools
+from typing import Dict
 
 import grpc
 
-from v2.nacos.common.nacos_exception import NacosException
+from v2.nacos.common.constants import Constants
+from v2.nacos.common.nacos_exception import NacosException, CLIENT_DISCONNECT, SERVER_ERROR
+from v2.nacos.common.tracing import start_span
+from v2.nacos.transport.bi_stream_queue import BiStreamSendQueue, PRIORITY_REQUEST
 from v2.nacos.transport.connection import Connection
+from v2.nacos.transport.grpc_codec import PayloadCodec, DEFAULT_PAYLOAD_CODEC
 from v2.nacos.transport.grpc_util import GrpcUtils
 from v2.nacos.transport.grpcauto.nacos_grpc_service_pb2 import Payload
 from v2.nacos.transport.grpcauto.nacos_grpc_service_pb2_grpc import RequestStub, BiRequestStreamStub
@@ -12,35 +18,95 @@ from v2.nacos.transport.model.rpc_response import Response
 
 
 class GrpcConnection(Connection):
-    def __init__(self, server_info, connection_id, channel, client: RequestStub, bi_stream_client: BiRequestStreamStub):
+    def __init__(self, server_info, connection_id, channel, client: RequestStub, bi_stream_client: BiRequestStreamStub,
+                 codec: PayloadCodec = DEFAULT_PAYLOAD_CODEC, bi_stream_request_enabled: bool = False,
+                 send_queue_size: int = Constants.GRPC_BI_STREAM_QUEUE_SIZE):
         super().__init__(connection_id=connection_id, server_info=server_info)
         self.channel = channel
         self.client = client
         self.bi_stream_client = bi_stream_client
-        self.queue = asyncio.Queue()
+        self.codec = codec
+        self.queue = BiStreamSendQueue(send_queue_size)
+        self.bi_stream_request_enabled = bi_stream_request_enabled
+        self.bi_stream_active = False
+        # requests sent on the bi stream, waiting for the response with the same requestId
+        self.pending_requests: Dict[str, asyncio.Future] = {}
+        self._request_id_seq = itertools.count(1)
+        # answers the ability table the server pushes after the connection setup
+        self.setup_ack_request_handler = None
 
     async def request(self, request: Request, timeout_millis) -> Response:
-        payload = GrpcUtils.convert_request_to_payload(request)
-        response_payload = await self.client.request(payload, timeout=timeout_millis / 1000.0)
-        return GrpcUtils.parse(response_payload)
+        self.in_flight += 1
+        try:
+            with start_span("nacos.grpc.request") as span:
+                span.set_attribute("nacos.request_type", request.get_request_type())
+                span.set_attribute("nacos.connection_id", self.connection_id or "")
+                span.set_attribute("nacos.server", self.server_info.get_address())
+                if self.bi_stream_request_enabled and self.bi_stream_active:
+                    span.set_attribute("nacos.bi_stream", True)
+                    return await self.request_over_bi_stream(request, timeout_millis)
+                payload = GrpcUtils.convert_request_to_payload(request, self.codec)
+                response_payload = await self.client.request(payload, timeout=timeout_millis / 1000.0)
+                return GrpcUtils.parse(response_payload, self.codec)
+        finally:
+            self.in_flight -= 1
+
+    async def request_over_bi_stream(self, request: Request, timeout_millis) -> Response:
+        request_id = f"{self.connection_id}_{next(self._request_id_seq)}"
+        # the id belongs to this send, the caller's request may be retried or hedged on another connection
+        request = request.model_copy(update={"requestId": request_id})
+        future = asyncio.get_running_loop().create_future()
+        self.pending_requests[request_id] = future
+        try:
+            with start_span("nacos.grpc.bi_stream_request") as span:
+                span.set_attribute("nacos.request_id", request_id)
+                await self.send_bi_request(GrpcUtils.convert_request_to_payload(request, self.codec), PRIORITY_REQUEST)
+                return await asyncio.wait_for(future, timeout_millis / 1000.0)
+        except asyncio.TimeoutError:
+            raise NacosException(SERVER_ERROR,
+                                 f"request timeout over bi stream, requestId:{request_id}, timeout:{timeout_millis}ms")
+        finally:
+            self.pending_requests.pop(request_id, None)
+
+    def complete_request(self, response: Response) -> bool:
+        future = self.pending_requests.pop(response.requestId, None)
+        if future is None:
+            return False
+        if not future.done():
+            future.set_result(response)
+        return True
+
+    def mark_bi_stream_active(self, active: bool) -> None:
+        self.bi_stream_active = active
+        if active:
+            return
+        self.queue.close()
+        # the stream is gone, so no response will arrive for the in-flight requests
+        pending, self.pending_requests = self.pending_requests, {}
+        for request_id, future in pending.items():
+            if not future.done():
+                future.set_exception(
+                    NacosException(CLIENT_DISCONNECT, f"bi stream closed before response, requestId:{request_id}"))
 
     def set_channel(self, channel: grpc.Channel) -> None:
         self.channel = channel
 
     async def close(self) -> None:
+        self.mark_bi_stream_active(False)
         if self.channel:
             await self.channel.close()
 
-    async def send_bi_request(self, payload: Payload) -> None:
-        await self.queue.put(payload)
+    async def send_bi_request(self, payload: Payload, priority: int = PRIORITY_REQUEST) -> None:
+        await self.queue.put(payload, priority)
 
     async def request_payloads(self):
         while True:
             try:
                 payload = await self.queue.get()
-                yield payload
             except NacosException:
-                pass
+                # the queue is closed, ending the iterator half closes the stream
+                return
+            yield payload
 
     def bi_stream_send(self):
         return self.bi_stream_client.requestBiStream(self.request_payloads())
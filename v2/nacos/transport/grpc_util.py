@@ -1,4 +1,4 @@
-import json
+from typing import Dict, Optional
 
 from google.protobuf.any_pb2 import Any
 
@@ -6,6 +6,7 @@ from v2.nacos.ai.model.ai_response import QueryMcpServerResponse, \
     ReleaseMcpServerResponse, McpServerEndpointResponse, QueryAgentCardResponse, \
     ReleaseAgentCardResponse, AgentEndpointResponse, QueryPromptResponse
 from v2.nacos.common.nacos_exception import NacosException, SERVER_ERROR
+from v2.nacos.common.tracing import start_span
 from v2.nacos.config.model.config_request import ConfigChangeNotifyRequest
 from v2.nacos.config.model.config_response import ConfigPublishResponse, ConfigQueryResponse, \
     ConfigChangeBatchListenResponse, ConfigRemoveResponse
@@ -13,10 +14,11 @@ from v2.nacos.naming.model.naming_request import NotifySubscriberRequest
 from v2.nacos.naming.model.naming_response import InstanceResponse, \
     SubscribeServiceResponse, BatchInstanceResponse, \
     ServiceListResponse, QueryServiceResponse
+from v2.nacos.transport.grpc_codec import PayloadCodec, DEFAULT_PAYLOAD_CODEC
 from v2.nacos.transport.grpcauto.nacos_grpc_service_pb2 import Payload, Metadata
 from v2.nacos.transport.model import ServerCheckResponse
 from v2.nacos.transport.model.internal_request import ClientDetectionRequest, \
-    SetupAckRequest
+    SetupAckRequest, ConnectResetRequest
 from v2.nacos.transport.model.internal_response import ErrorResponse, HealthCheckResponse
 from v2.nacos.transport.model.rpc_request import Request
 from v2.nacos.transport.model.rpc_response import Response
@@ -35,6 +37,7 @@ class GrpcUtils:
         "ServiceListResponse": ServiceListResponse,
         "BatchInstanceResponse": BatchInstanceResponse,
         "ClientDetectionRequest": ClientDetectionRequest,
+        "ConnectResetRequest": ConnectResetRequest,
         "HealthCheckResponse": HealthCheckResponse,
         "SubscribeServiceResponse": SubscribeServiceResponse,
         "ConfigPublishResponse": ConfigPublishResponse,
@@ -52,38 +55,56 @@ class GrpcUtils:
         "QueryPromptResponse": QueryPromptResponse,
     }
 
-    @staticmethod
-    def convert_request_to_payload(request: Request):
-        payload_metadata = Metadata(type=request.get_request_type(), clientIp=NetUtils.get_local_ip(),
-                                    headers=request.get_headers())
+    _metadata_templates: Dict[str, Metadata] = {}
 
-        payload_body_bytes = json.dumps(request, default=GrpcUtils.to_json).encode('utf-8')
-        payload_body = Any(value=payload_body_bytes)
-        payload = Payload(metadata=payload_metadata, body=payload_body)
-        return payload
+    @staticmethod
+    def build_metadata(message_type: str, headers: Optional[dict] = None) -> Metadata:
+        # type and client ip never change for a message type, so copy them from a prebuilt template
+        template = GrpcUtils._metadata_templates.get(message_type)
+        if template is None:
+            template = Metadata(type=message_type, clientIp=NetUtils.get_local_ip())
+            GrpcUtils._metadata_templates[message_type] = template
+        metadata = Metadata()
+        metadata.CopyFrom(template)
+        if headers:
+            metadata.headers.update(headers)
+        return metadata
 
     @staticmethod
-    def convert_response_to_payload(response: Response):
-        metadata = Metadata(type=response.get_response_type(), clientIp=NetUtils.get_local_ip())
+    def convert_request_to_payload(request: Request, codec: PayloadCodec = DEFAULT_PAYLOAD_CODEC):
+        with start_span("nacos.grpc.encode") as span:
+            span.set_attribute("nacos.type", request.get_request_type())
+            payload_metadata = GrpcUtils.build_metadata(request.get_request_type(), request.get_headers())
+            body = codec.encode(request)
+            span.set_attribute("nacos.body_size", len(body))
+            return Payload(metadata=payload_metadata, body=Any(value=body))
 
-        payload_body_bytes = json.dumps(response, default=GrpcUtils.to_json).encode('utf-8')
-        payload_body = Any(value=payload_body_bytes)
-        payload = Payload(metadata=metadata, body=payload_body)
-        return payload
+    @staticmethod
+    def convert_response_to_payload(response: Response, codec: PayloadCodec = DEFAULT_PAYLOAD_CODEC):
+        with start_span("nacos.grpc.encode") as span:
+            span.set_attribute("nacos.type", response.get_response_type())
+            span.set_attribute("nacos.request_id", response.requestId or "")
+            metadata = GrpcUtils.build_metadata(response.get_response_type())
+            body = codec.encode(response)
+            span.set_attribute("nacos.body_size", len(body))
+            return Payload(metadata=metadata, body=Any(value=body))
 
     @staticmethod
-    def parse(payload: Payload):
+    def parse(payload: Payload, codec: PayloadCodec = DEFAULT_PAYLOAD_CODEC):
         metadata_type = payload.metadata.type
-        if metadata_type and metadata_type in GrpcUtils.remote_type.keys():
-            json_dict = json.loads(payload.body.value.decode('utf-8'))
-            response_class = GrpcUtils.remote_type[metadata_type]
-            obj = response_class.model_validate(json_dict)
+        with start_span("nacos.grpc.decode") as span:
+            span.set_attribute("nacos.type", metadata_type)
+            span.set_attribute("nacos.body_size", len(payload.body.value))
+            response_class = GrpcUtils.remote_type.get(metadata_type) if metadata_type else None
+            if response_class is not None:
+                obj = codec.decode(payload.body.value, response_class)
 
-            if isinstance(obj, Request):
-                obj.put_all_headers(payload.metadata.headers)
-            return obj
-        else:
-            raise NacosException(SERVER_ERROR, "unknown payload type:" + payload.metadata.type)
+                if isinstance(obj, Request):
+                    obj.put_all_headers(payload.metadata.headers)
+                span.set_attribute("nacos.request_id", obj.requestId or "")
+                return obj
+            else:
+                raise NacosException(SERVER_ERROR, "unknown payload type:" + payload.metadata.type)
 
     @staticmethod
     def to_json(obj):
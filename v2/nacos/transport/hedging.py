@@ -0,0 +1,63 @@
+from collections import deque
+from typing import Optional
+
+from v2.nacos.common.constants import Constants
+
+
+class HedgePolicy:
+    """Decides when a read only request is sent a second time and whether the budget allows it.
+
+    The hedge delay is a percentile of the latencies of recent reads, so only the slow tail gets
+    hedged. Every read earns budget_percent credits and a hedge spends 100, which keeps hedges
+    below that share of the reads even while a server stalls.
+    """
+
+    MIN_SAMPLES = 20
+
+    RECOMPUTE_EVERY = 32
+
+    MAX_CREDITS = 1000
+
+    def __init__(self, percentile: float = Constants.GRPC_HEDGE_PERCENTILE,
+                 min_delay_ms: float = Constants.GRPC_HEDGE_MIN_DELAY_MILLS,
+                 budget_percent: float = Constants.GRPC_HEDGE_BUDGET_PERCENT,
+                 window: int = Constants.GRPC_HEDGE_LATENCY_WINDOW):
+        self.percentile = percentile
+        self.min_delay_ms = min_delay_ms
+        self.budget_percent = budget_percent
+        self._latencies = deque(maxlen=window)
+        self._since_recompute = 0
+        self._delay_ms: Optional[float] = None
+        self._credits = 0
+        self.hedges_sent = 0
+        self.hedges_won = 0
+        self.hedges_rejected = 0
+
+    def record_latency(self, latency_ms: float) -> None:
+        self._latencies.append(latency_ms)
+        self._since_recompute += 1
+        if self._since_recompute >= self.RECOMPUTE_EVERY or \
+                (self._delay_ms is None and len(self._latencies) >= self.MIN_SAMPLES):
+            self._since_recompute = 0
+            ordered = sorted(self._latencies)
+            index = min(len(ordered) - 1, int(len(ordered) * self.percentile / 100))
+            self._delay_ms = max(self.min_delay_ms, ordered[index])
+
+    def delay_ms(self) -> Optional[float]:
+        """None until enough reads were seen to know what slow means."""
+        return self._delay_ms
+
+    def on_read(self) -> None:
+        self._credits = min(self.MAX_CREDITS, self._credits + self.budget_percent)
+
+    def try_acquire(self) -> bool:
+        if self._credits >= 100:
+            self._credits -= 100
+            self.hedges_sent += 1
+            return True
+        self.hedges_rejected += 1
+        return False
+
+    def snapshot(self) -> dict:
+        return {"delay_ms": self._delay_ms, "hedges_sent": self.hedges_sent, "hedges_won": self.hedges_won,
+                "hedges_rejected": self.hedges_rejected}
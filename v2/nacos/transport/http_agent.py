@@ -1,18 +1,30 @@
+import asyncio
 import ssl
+import time
 from http import HTTPStatus
-from urllib.parse import urlencode
+from typing import Callable, List, Optional
+from urllib.parse import urlencode, urlsplit
 import aiohttp
 
 from v2.nacos.common.client_config import TLSConfig
+from v2.nacos.common.constants import Constants
 
 HTTP_STATUS_SUCCESS = 200
 
 
 class HttpAgent:
-    def __init__(self, logger, tls_config: TLSConfig, default_timeout):
+    def __init__(self, logger, tls_config: TLSConfig, default_timeout,
+                 pool_size=Constants.HTTP_POOL_SIZE,
+                 pool_size_per_host=Constants.HTTP_POOL_SIZE_PER_HOST,
+                 keep_alive_timeout=Constants.HTTP_KEEP_ALIVE_TIMEOUT,
+                 dns_cache_ttl=Constants.HTTP_DNS_CACHE_TTL):
         self.logger = logger
         self.tls_config = tls_config
         self.default_timeout = default_timeout
+        self.pool_size = pool_size
+        self.pool_size_per_host = pool_size_per_host
+        self.keep_alive_timeout = keep_alive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
 
         self.ssl_context = None
         if tls_config and tls_config.enabled:
@@ -23,7 +35,83 @@ class HttpAgent:
                 ctx.load_cert_chain(certfile=self.tls_config.cert_file, keyfile=self.tls_config.key_file)
             self.ssl_context = ctx
 
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._session_loop = None
+        # created on first use: a lock is bound to the loop it is awaited on, like the session
+        self._session_lock: Optional[asyncio.Lock] = None
+        self._session_lock_loop = None
+        # called with (host, port, elapsed_ms, success) after every request
+        self.result_listeners: List[Callable[[str, int, float, bool], None]] = []
+
+    def add_result_listener(self, listener: Callable[[str, int, float, bool], None]) -> None:
+        self.result_listeners.append(listener)
+
+    def remove_result_listener(self, listener: Callable[[str, int, float, bool], None]) -> None:
+        if listener in self.result_listeners:
+            self.result_listeners.remove(listener)
+
+    def _notify_result(self, url: str, start: float, success: bool) -> None:
+        if not self.result_listeners:
+            return
+        parts = urlsplit(url)
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        for listener in self.result_listeners:
+            try:
+                listener(parts.hostname, port, elapsed_ms, success)
+            except Exception as e:
+                self.logger.warning(f"[http-request] result listener error: {e}")
+
+    def _lock_for(self, loop) -> asyncio.Lock:
+        if self._session_lock is None or self._session_lock_loop is not loop:
+            self._session_lock = asyncio.Lock()
+            self._session_lock_loop = loop
+        return self._session_lock
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+        if self._session is not None and not self._session.closed and self._session_loop is loop:
+            return self._session
+
+        async with self._lock_for(loop):
+            if self._session is None or self._session.closed or self._session_loop is not loop:
+                # a session is bound to the loop it was created on, so a client reused from
+                # another event loop gets a fresh pool instead of a broken one.
+                if self._session is not None and not self._session.closed:
+                    await self._discard_session(self._session, self._session_loop)
+                connector_kwargs = {"ssl": self.ssl_context} if self.ssl_context else {}
+                connector = aiohttp.TCPConnector(limit=self.pool_size,
+                                                 limit_per_host=self.pool_size_per_host,
+                                                 keepalive_timeout=self.keep_alive_timeout,
+                                                 use_dns_cache=True,
+                                                 ttl_dns_cache=self.dns_cache_ttl,
+                                                 **connector_kwargs)
+                self._session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.default_timeout),
+                                                      connector=connector)
+                self._session_loop = loop
+                self.logger.debug(
+                    f"[http-agent] create http session, pool_size: {self.pool_size}, "
+                    f"pool_size_per_host: {self.pool_size_per_host}, keep_alive_timeout: {self.keep_alive_timeout}")
+            return self._session
+
+    @staticmethod
+    async def _discard_session(session: aiohttp.ClientSession, loop: asyncio.AbstractEventLoop):
+        # a session can only be closed on its own loop, a closed loop took its connections with it
+        if not loop.is_closed():
+            asyncio.run_coroutine_threadsafe(session.close(), loop)
+            return
+        connector = session.connector
+        session.detach()
+        if connector is not None:
+            await connector.close()
+
     async def request(self, url: str, method: str, headers: dict = None, params: dict = None, data: dict = None):
+        _, body, _, err = await self.request_with_status(url, method, headers, params, data)
+        return body, err
+
+    async def request_with_status(self, url: str, method: str, headers: dict = None, params: dict = None,
+                                  data: dict = None):
+        """Like request, returns (status, body, response headers, error), status is None when nothing was received."""
         if not headers:
             headers = {}
 
@@ -35,24 +123,33 @@ class HttpAgent:
         self.logger.debug(
             f"[http-request] url: {url}, headers: {headers}, params: {params}, data: {data}, timeout: {self.default_timeout}")
 
+        start = time.perf_counter()
         try:
             if not url.startswith("http"):
                 url = f"http://{url}"
 
-            connector = aiohttp.TCPConnector(ssl=self.ssl_context) if self.ssl_context else aiohttp.TCPConnector()
-            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.default_timeout),
-                                             connector=connector) as session:
-                async with session.request(method, url, headers=headers, data=data) as response:
-                    if response.status == HTTPStatus.OK:
-                        return await response.read(), None
-                    else:
-                        error_msg = f"HTTP error: {response.status} - {response.reason}"
-                        self.logger.debug(f"[http-request] {error_msg}")
-                        return None, error_msg
-
-        except aiohttp.ClientError as e:
+            session = await self._get_session()
+            start = time.perf_counter()
+            async with session.request(method, url, headers=headers, data=data) as response:
+                # any answer below 500 means the server is up and serving
+                self._notify_result(url, start, response.status < HTTPStatus.INTERNAL_SERVER_ERROR)
+                if response.status == HTTPStatus.OK:
+                    return response.status, await response.read(), response.headers, None
+                else:
+                    error_msg = f"HTTP error: {response.status} - {response.reason}"
+                    self.logger.debug(f"[http-request] {error_msg}")
+                    return response.status, None, response.headers, error_msg
+
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
             self.logger.warning(f"[http-request] client error: {e}")
-            return None, e
+            self._notify_result(url, start, False)
+            return None, None, None, e
         except Exception as e:
             self.logger.warning(f"[http-request] unexpected error: {e}")
-            return None, e
+            return None, None, None, e
+
+    async def close(self):
+        async with self._lock_for(asyncio.get_running_loop()):
+            session, self._session, self._session_loop = self._session, None, None
+        if session is not None and not session.closed:
+            await session.close()
@@ -21,8 +21,8 @@ class HealthCheckRequest(InternalRequest):
 
 
 class ConnectResetRequest(InternalRequest):
-    serverIp: Optional[str]
-    serverPort: Optional[str]
+    serverIp: Optional[str] = None
+    serverPort: Optional[str] = None
 
     def get_request_type(self) -> str:
         return CONNECTION_RESET_REQUEST_TYPE
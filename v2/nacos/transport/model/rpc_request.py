@@ -28,6 +28,18 @@ class Request(BaseModel, ABC):
     def get_request_id(self) -> str:
         return self.requestId
 
+    def is_read_only(self) -> bool:
+        """Whether the request only reads server state and is not bound to the connection it is sent on.
+
+        Such requests may be served by any connection to the server, requests registering ephemeral
+        data or subscribing to pushes must stay on the connection that owns them.
+        """
+        return False
+
+    def get_dispatch_key(self) -> str:
+        """Server pushes with the same key are handled one at a time in arrival order."""
+        return self.get_request_type()
+
     @abstractmethod
     def get_module(self) -> str:
         pass
@@ -1,12 +1,20 @@
 import asyncio
-from random import randrange
-from typing import List, Optional
+import os
+import time
+from http import HTTPStatus
+from random import randrange, uniform
+from typing import Awaitable, Callable, Dict, List, Optional
 
 from v2.nacos.common.client_config import ClientConfig
 from v2.nacos.common.constants import Constants
 from v2.nacos.common.nacos_exception import NacosException, INVALID_PARAM, INVALID_SERVER_STATUS
+from v2.nacos.common.tracing import start_span
 from v2.nacos.transport.auth_client import AuthClient
+from v2.nacos.transport.circuit_breaker import CircuitBreaker
 from v2.nacos.transport.http_agent import HttpAgent
+from v2.nacos.transport.server_selector import LatencyServerSelector, SERVER_SELECT_LATENCY, server_key
+from v2.nacos.utils.file_util import is_file_exist, read_file, write_to_file
+from v2.nacos.utils.md5_util import md5
 
 
 class NacosServerConnector:
@@ -18,82 +26,298 @@ class NacosServerConnector:
 
         self.client_config = client_config
         self.server_list = client_config.server_list
+        self.server_keys = frozenset(server_key(server) for server in self.server_list)
         self.current_index = 0
         self.http_agent = http_agent
         self.endpoint = client_config.endpoint
         self.server_list_lock = asyncio.Lock()
 
-        self.refresh_server_list_internal = 30  # second
+        self.refresh_server_list_internal = Constants.SERVER_LIST_REFRESH_INTERVAL  # second
+        # conditional request headers and content digest of the last answer of each address server
+        self.endpoint_validators: Dict[str, Dict[str, str]] = {}
+        self.endpoint_content_md5: Dict[str, str] = {}
+        # called after the server list changed, rpc clients leave servers that were removed
+        self.server_list_listeners: List[Callable[[], Awaitable]] = []
         if len(self.server_list) != 0:
             self.current_index = randrange(0, len(self.server_list))
+        self.refresh_task = None
+        self.probe_task = None
 
+        self.server_selector = None
+        if client_config.server_select_strategy == SERVER_SELECT_LATENCY:
+            self.server_selector = LatencyServerSelector()
+        self.circuit_breaker_enabled = client_config.grpc_config.circuit_breaker_enabled
+        self.circuit_breakers: Dict[str, CircuitBreaker] = {}
+        if self.server_selector or self.circuit_breaker_enabled:
+            http_agent.add_result_listener(self.record_server_result)
+
+        self.auth_client = None
         if client_config.username and client_config.password:
             self.auth_client = AuthClient(self.logger, client_config, self.get_server_list, http_agent)
-            asyncio.create_task(self.auth_client.get_access_token(True))
+            asyncio.create_task(self._prefetch_access_token())
 
     async def init(self):
-        if len(self.server_list) != 0:
-            return
-
-        await self._get_server_list_from_endpoint()
         if len(self.server_list) == 0:
-            raise NacosException(INVALID_SERVER_STATUS, "server list is empty")
-        asyncio.create_task(self._refresh_server_srv_if_need())
+            cached_server_list = await self._load_cached_server_list()
+            if cached_server_list:
+                # start with the last known list, the address server is asked in the background
+                self._set_server_list(cached_server_list)
+                self.current_index = randrange(0, len(self.server_list))
+                self.logger.info("use cached nacos server list %s, refresh it from endpoint %s",
+                                 str(cached_server_list), self.endpoint)
+                self.refresh_task = asyncio.create_task(self._refresh_server_srv_if_need(refresh_now=True))
+            else:
+                await self._get_server_list_from_endpoint()
+                if len(self.server_list) == 0:
+                    raise NacosException(INVALID_SERVER_STATUS, "server list is empty")
+                self.refresh_task = asyncio.create_task(self._refresh_server_srv_if_need())
 
-    async def _get_server_list_from_endpoint(self) -> Optional[List[str]]:
+        if self.server_selector and self.probe_task is None:
+            # measure every server once so that the first connection already goes to a near one
+            await self.probe_servers()
+            self.probe_task = asyncio.create_task(self._probe_servers_periodically())
+
+    def _endpoints(self) -> List[str]:
         if not self.endpoint or self.endpoint.strip() == "":
+            return []
+        return [endpoint.strip() for endpoint in self.endpoint.split(",") if endpoint.strip()]
+
+    async def _get_server_list_from_endpoint(self) -> Optional[List[str]]:
+        endpoints = self._endpoints()
+        if not endpoints:
             return None
 
-        url = self.endpoint.strip() + self.client_config.endpoint_context_path + "/serverlist"
-        server_list = []
+        # every address server is asked at once, the first good answer is used
+        attempts = [asyncio.create_task(self._fetch_server_list(endpoint)) for endpoint in endpoints]
+        server_list = None
         try:
-            response, err = await self.http_agent.request(url, "GET", self.client_config.endpoint_query_header, None,
-                                                          None)
+            for attempt in asyncio.as_completed(attempts):
+                server_list = await attempt
+                if server_list:
+                    break
+        finally:
+            for attempt in attempts:
+                attempt.cancel()
+            await asyncio.gather(*attempts, return_exceptions=True)
+
+        if server_list and set(server_list) != set(self.server_list):
+            async with self.server_list_lock:
+                old_server_list = self.server_list
+                self._set_server_list(server_list)
+                self.current_index = randrange(0, len(self.server_list))
+                self.logger.info("nacos server list is updated from %s to %s",
+                                 str(old_server_list), str(server_list))
+            await self._save_server_list(server_list)
+            await self._notify_server_list_change()
+        return server_list
+
+    async def _fetch_server_list(self, endpoint: str) -> Optional[List[str]]:
+        """Server list of one address server, the current list when it did not change, None on failure."""
+        url = endpoint + self.client_config.endpoint_context_path + "/serverlist"
+        headers = dict(self.client_config.endpoint_query_header or {})
+        headers.update(self.endpoint_validators.get(endpoint, {}))
+        try:
+            status, response, response_headers, err = await self.http_agent.request_with_status(url, "GET", headers,
+                                                                                                None, None)
+            if status == HTTPStatus.NOT_MODIFIED:
+                self.logger.debug("[get-server-list] server list not modified,url:%s", url)
+                return list(self.server_list)
             if err:
                 self.logger.error("[get-server-list] get server list from endpoint failed,url:%s, err:%s", url, err)
                 return None
-            else:
-                self.logger.debug("[get-server-list] content from endpoint,url:%s,response:%s", url, response)
-                if response:
-                    for server_info in response.decode('utf-8').strip().split("\n"):
-                        sp = server_info.strip().split(":")
-                        if len(sp) == 1:
-                            server_list.append((sp[0] + ":" + str(Constants.DEFAULT_PORT)))
-                        else:
-                            server_list.append(server_info)
-
-                    if len(server_list) != 0 and set(server_list) != set(self.server_list):
-                        async with self.server_list_lock:
-                            old_server_list = self.server_list
-                            self.server_list = server_list
-                            self.current_index = randrange(0, len(self.server_list))
-                            self.logger.info("nacos server list is updated from %s to %s",
-                                             str(old_server_list), str(server_list))
+
+            validators = {}
+            if response_headers.get("ETag"):
+                validators["If-None-Match"] = response_headers["ETag"]
+            if response_headers.get("Last-Modified"):
+                validators["If-Modified-Since"] = response_headers["Last-Modified"]
+            self.endpoint_validators[endpoint] = validators
+
+            self.logger.debug("[get-server-list] content from endpoint,url:%s,response:%s", url, response)
+            if not response:
+                return None
+            # address servers without validators still answer the same content most of the time
+            content_md5 = md5(response.decode('utf-8'))
+            if content_md5 == self.endpoint_content_md5.get(endpoint):
+                return list(self.server_list)
+            server_list = []
+            for server_info in response.decode('utf-8').strip().split("\n"):
+                sp = server_info.strip().split(":")
+                if len(sp) == 1:
+                    server_list.append((sp[0] + ":" + str(Constants.DEFAULT_PORT)))
+                else:
+                    server_list.append(server_info.strip())
+            self.endpoint_content_md5[endpoint] = content_md5
+            return server_list
         except Exception as e:
             self.logger.error("[get-server-list] get server list from endpoint failed,url:%s, err:%s", url, e)
-        return server_list
+            return None
 
-    async def _refresh_server_srv_if_need(self):
+    async def _refresh_server_srv_if_need(self, refresh_now: bool = False):
         while True:
-            await asyncio.sleep(self.refresh_server_list_internal)
+            if not refresh_now:
+                # jitter keeps clients started together from asking the address server in phase
+                jitter = Constants.SERVER_LIST_REFRESH_JITTER
+                await asyncio.sleep(self.refresh_server_list_internal * uniform(1 - jitter, 1 + jitter))
+            refresh_now = False
 
             server_list = await self._get_server_list_from_endpoint()
 
             if not server_list or len(server_list) == 0:
                 self.logger.warning("failed to get server list from endpoint, endpoint: " + self.endpoint)
 
+    def _server_list_cache_file(self) -> str:
+        cache_dir = self.client_config.cache_dir or os.path.join(os.path.expanduser("~"), "nacos", "cache")
+        key = md5(",".join(self._endpoints()) + self.client_config.endpoint_context_path)
+        return os.path.join(cache_dir, "server_list", key)
+
+    async def _load_cached_server_list(self) -> Optional[List[str]]:
+        if not self._endpoints():
+            return None
+        cache_file = self._server_list_cache_file()
+        if not is_file_exist(cache_file):
+            return None
+        content = await read_file(self.logger, cache_file)
+        return [server for server in content.split("\n") if server.strip()] or None
+
+    async def _save_server_list(self, server_list: List[str]):
+        try:
+            await write_to_file(self.logger, self._server_list_cache_file(), "\n".join(server_list))
+        except Exception as e:
+            self.logger.warning("failed to save server list to cache, error:%s", e)
+
+    def add_server_list_listener(self, listener: Callable[[], Awaitable]) -> None:
+        self.server_list_listeners.append(listener)
+
+    def remove_server_list_listener(self, listener: Callable[[], Awaitable]) -> None:
+        if listener in self.server_list_listeners:
+            self.server_list_listeners.remove(listener)
+
+    async def _notify_server_list_change(self):
+        for listener in list(self.server_list_listeners):
+            try:
+                await listener()
+            except Exception as e:
+                self.logger.warning("failed to notify server list change, error:%s", e)
+
+    def _set_server_list(self, server_list: List[str]):
+        self.server_list = server_list
+        self.server_keys = frozenset(server_key(server) for server in server_list)
+
     def get_server_list(self):
         return self.server_list
 
     def get_next_server(self):
         if not self.server_list:
             raise NacosException(INVALID_SERVER_STATUS, 'server list is empty')
-        self.current_index = (self.current_index + 1) % len(self.server_list)
-        return self.server_list[self.current_index]
+        servers = self.server_list
+        if self.circuit_breaker_enabled:
+            now = time.monotonic()
+            servers = [server for server in servers if self._circuit_breaker_of(server_key(server)).is_available(now)]
+            if not servers:
+                raise NacosException(INVALID_SERVER_STATUS, 'circuits of all servers are open')
+
+        if self.server_selector:
+            server = self.server_selector.choose(servers)
+        else:
+            for _ in range(len(self.server_list)):
+                self.current_index = (self.current_index + 1) % len(self.server_list)
+                if self.server_list[self.current_index] in servers:
+                    break
+            server = self.server_list[self.current_index]
+        return server
+
+    def _circuit_breaker_of(self, key: str) -> CircuitBreaker:
+        breaker = self.circuit_breakers.get(key)
+        if breaker is None:
+            grpc_config = self.client_config.grpc_config
+            breaker = CircuitBreaker(grpc_config.circuit_failure_threshold, grpc_config.circuit_open_base_ms,
+                                     grpc_config.circuit_open_max_ms)
+            self.circuit_breakers[key] = breaker
+        return breaker
+
+    def get_circuit_breaker_states(self) -> Dict[str, dict]:
+        """State of the circuit of every server that has one, keyed by "ip:port"."""
+        return {key: breaker.snapshot() for key, breaker in self.circuit_breakers.items()}
+
+    def record_server_attempt(self, ip: str, port: int, cancelled: bool = False) -> None:
+        """Called when a connection to the server listening on ip:port (http port) is attempted, or with
+        cancelled when that attempt was given up without a result. An attempt to a server whose open
+        period is over is its half open trial."""
+        if not self.circuit_breaker_enabled:
+            return
+        breaker = self._circuit_breaker_of(f"{ip}:{port}")
+        if cancelled:
+            breaker.on_cancel()
+        else:
+            breaker.on_attempt()
+
+    def record_server_result(self, ip: str, port: int, rtt_ms: Optional[float], success: bool,
+                             request_type: str = "http") -> None:
+        """Feeds the result of a request of request_type sent to the server listening on ip:port
+        (http port) to the selector and the circuit breaker. Hosts outside the server list are ignored."""
+        if not self.server_selector and not self.circuit_breaker_enabled:
+            return
+        key = f"{ip}:{port}"
+        if key not in self.server_keys:
+            return
+        if self.server_selector:
+            self.server_selector.record_request(key, request_type, rtt_ms, success)
+        if self.circuit_breaker_enabled:
+            if success:
+                self._circuit_breaker_of(key).on_success()
+            else:
+                self._circuit_breaker_of(key).on_failure()
+
+    async def probe_servers(self):
+        async def probe(address: str):
+            ip, port = server_key(address).rsplit(":", 1)
+            start = time.perf_counter()
+            try:
+                _, writer = await asyncio.wait_for(
+                    asyncio.open_connection(ip, int(port) + self.client_config.grpc_config.port_offset),
+                    Constants.SERVER_PROBE_TIMEOUT)
+            except (OSError, asyncio.TimeoutError):
+                self.server_selector.record(f"{ip}:{port}", None, False)
+                return
+            # an accepted tcp connection says nothing about the health the circuit breaker tracks
+            self.server_selector.record(f"{ip}:{port}", (time.perf_counter() - start) * 1000, True)
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+
+        await asyncio.gather(*[probe(address) for address in list(self.server_list)])
+        self.logger.debug("server probe result: %s", self.server_selector.snapshot())
+
+    async def _probe_servers_periodically(self):
+        while True:
+            await asyncio.sleep(Constants.SERVER_PROBE_INTERVAL)
+            try:
+                await self.probe_servers()
+            except Exception as e:
+                self.logger.warning("failed to probe servers, error:%s", e)
+
+    async def close(self):
+        self.http_agent.remove_result_listener(self.record_server_result)
+        for task in (self.refresh_task, self.probe_task):
+            if task and not task.done():
+                task.cancel()
+        if self.auth_client:
+            await self.auth_client.close()
+
+    async def _prefetch_access_token(self):
+        # logs in ahead of the first request, or picks up the cached token
+        try:
+            await self.auth_client.get_access_token(False)
+        except NacosException as e:
+            self.logger.warning("failed to get access token ahead of the first request, error:%s", e)
 
     async def inject_security_info(self, headers):
         if self.client_config.username and self.client_config.password:
-            access_token = await self.auth_client.get_access_token(False)
+            with start_span("nacos.auth"):
+                access_token = await self.auth_client.get_access_token(False)
             if access_token is not None and access_token != "":
                 headers[Constants.ACCESS_TOKEN] = access_token
             return
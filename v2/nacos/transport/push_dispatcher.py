@@ -0,0 +1,173 @@
+import asyncio
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+from v2.nacos.common.constants import Constants
+from v2.nacos.common.metrics import metrics
+from v2.nacos.utils.log_util import LogRateLimiter
+
+
+class _HandleStats:
+
+    def __init__(self):
+        self.count = 0
+        self.failed = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.max_wait_ms = 0.0
+
+    def record(self, wait_ms: float, handle_ms: float, success: bool) -> None:
+        self.count += 1
+        self.failed += 0 if success else 1
+        self.total_ms += handle_ms
+        self.max_ms = max(self.max_ms, handle_ms)
+        self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+
+    def to_dict(self) -> dict:
+        return {"count": self.count, "failed": self.failed, "max_ms": self.max_ms, "max_wait_ms": self.max_wait_ms,
+                "avg_ms": self.total_ms / self.count if self.count else 0.0}
+
+
+_Job = Tuple[Callable[[], Awaitable], str, float]
+
+
+class PushDispatcher:
+    """Handles server pushes on a bounded pool of workers.
+
+    Pushes with the same key are handled one at a time in arrival order, pushes with different keys
+    run concurrently. Priority pushes (connection control) have their own worker and never wait
+    behind slow handlers. submit never waits, so the stream reader keeps delivering responses and
+    control requests. At most max_pending normal pushes are queued; beyond that a push replaces the
+    newest waiting push of its key, pushes carry the latest state, and a push of a key without one
+    waiting is dropped unanswered, which the server takes as a failed push and sends again.
+    """
+
+    def __init__(self, logger, name: str, max_workers: int = Constants.GRPC_PUSH_WORKERS,
+                 max_pending: int = Constants.GRPC_PUSH_QUEUE_SIZE):
+        self.logger = logger
+        self.name = name
+        self.max_workers = max(1, max_workers)
+        self.max_pending = max(1, max_pending)
+        # jobs of every key that is queued or being handled, a key is in _ready_keys at most once
+        self._jobs_by_key: Dict[str, Deque[_Job]] = {}
+        self._ready_keys: Optional[asyncio.Queue] = None
+        self._priority_jobs: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._stats: Dict[str, _HandleStats] = {}
+        self._stopped = False
+        self.pending = 0
+        self.max_pending_seen = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self._shed_log_limiter = LogRateLimiter(Constants.PUSH_LOG_INTERVAL)
+
+    def _start(self):
+        self._stopped = False
+        self._ready_keys = asyncio.Queue()
+        self._priority_jobs = asyncio.Queue()
+        self._workers = [asyncio.create_task(self._work()) for _ in range(self.max_workers)]
+        self._workers.append(asyncio.create_task(self._work_priority()))
+
+    async def submit(self, key: str, handle: Callable[[], Awaitable], label: str, priority: bool = False) -> None:
+        if not self._workers:
+            self._start()
+        job = (handle, label, time.perf_counter())
+        if priority:
+            self._priority_jobs.put_nowait(job)
+            return
+        jobs = self._jobs_by_key.get(key)
+        if self.pending >= self.max_pending:
+            self._shed(jobs, job, label)
+            return
+        self.pending += 1
+        self.max_pending_seen = max(self.max_pending_seen, self.pending)
+        if jobs is not None:
+            # a worker owns the key, it picks the job up after the ones before it
+            jobs.append(job)
+            return
+        self._jobs_by_key[key] = deque([job])
+        self._ready_keys.put_nowait(key)
+
+    def _shed(self, jobs: Optional[Deque[_Job]], job: _Job, label: str) -> None:
+        # jobs[0] may be running already, a job behind it is sure to wait
+        if jobs is not None and len(jobs) > 1:
+            jobs[-1] = job
+            self.coalesced += 1
+            result = "coalesced"
+        else:
+            self.dropped += 1
+            result = "dropped"
+        if metrics.enabled:
+            metrics.counter("nacos_client_push_shed_total", type=label, result=result).inc()
+        suppressed = self._shed_log_limiter.acquire(result)
+        if suppressed is not None:
+            self.logger.warning("%s push queue is full (%s), %s push %s, suppressed:%s", self.name,
+                                self.max_pending, result, label, suppressed)
+
+    async def _work(self):
+        # a handler may swallow the cancel of shutdown (wait_for does when its inner call completes at the
+        # same time), so the flag ends the loop as well
+        while not self._stopped:
+            key = await self._ready_keys.get()
+            jobs = self._jobs_by_key[key]
+            try:
+                await self._run(jobs[0])
+            finally:
+                jobs.popleft()
+                self.pending -= 1
+                if jobs:
+                    # back to the end of the line, other keys get their turn first
+                    self._ready_keys.put_nowait(key)
+                else:
+                    del self._jobs_by_key[key]
+
+    async def _work_priority(self):
+        while not self._stopped:
+            await self._run(await self._priority_jobs.get())
+
+    async def _run(self, job: _Job):
+        handle, label, submitted = job
+        begin = time.perf_counter()
+        success = False
+        try:
+            await handle()
+            success = True
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.logger.error("%s failed to handle push %s, error:%s", self.name, label, str(e))
+        finally:
+            end = time.perf_counter()
+            handle_ms = (end - begin) * 1000
+            stats = self._stats.get(label)
+            if stats is None:
+                stats = _HandleStats()
+                self._stats[label] = stats
+            stats.record((begin - submitted) * 1000, handle_ms, success)
+            if metrics.enabled:
+                metrics.histogram("nacos_client_push_handle_ms", type=label).observe(handle_ms)
+                if not success:
+                    metrics.counter("nacos_client_push_handle_failures_total", type=label).inc()
+            if handle_ms > Constants.GRPC_PUSH_SLOW_HANDLE_MILLS:
+                self.logger.warning("%s slow push handling, %s took %.1fms, queue depth:%s", self.name, label,
+                                    handle_ms, self.pending)
+
+    def snapshot(self) -> dict:
+        return {
+            "queue_depth": self.pending,
+            "max_queue_depth": self.max_pending_seen,
+            "coalesced": self.coalesced,
+            "dropped": self.dropped,
+            "priority_queue_depth": self._priority_jobs.qsize() if self._priority_jobs else 0,
+            "handlers": {label: stats.to_dict() for label, stats in self._stats.items()},
+        }
+
+    async def shutdown(self):
+        workers, self._workers = self._workers, []
+        self._stopped = True
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        self._jobs_by_key.clear()
+        self.pending = 0
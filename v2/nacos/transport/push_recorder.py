@@ -0,0 +1,210 @@
+import asyncio
+import atexit
+import logging
+import queue
+import struct
+import threading
+import time
+from typing import Dict, Iterator, Optional, Tuple
+
+from v2.nacos.common.nacos_exception import NacosException, CLIENT_INVALID_PARAM
+from v2.nacos.transport.grpc_codec import PayloadCodec, DEFAULT_PAYLOAD_CODEC
+from v2.nacos.transport.grpc_util import GrpcUtils
+from v2.nacos.transport.grpcauto.nacos_grpc_service_pb2 import Payload
+from v2.nacos.transport.server_request_handler import IServerRequestHandler
+
+PUSH_RECORD_MAGIC = b"NPR1"
+# receive time (epoch seconds) and size of the serialized Payload that follows
+_RECORD_HEADER = struct.Struct("<dI")
+
+_recorders: Dict[str, "PushRecorder"] = {}
+_lock = threading.Lock()
+
+
+class PushRecorder:
+    """Appends the raw Payload of every server push to a file, with its receive time.
+
+    A file starts with PUSH_RECORD_MAGIC, then holds one record per push: the receive time and
+    size packed as _RECORD_HEADER, then the serialized Payload. record only queues a push, a
+    background thread writes the records so the event loop never waits on the disk; flush waits
+    until the queued records are written out. At most max_bytes are recorded when it is set, later
+    pushes are dropped. A write error stops the recording, later pushes are dropped as well.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 0, logger=None):
+        self.logger = logger or logging.getLogger(__name__)
+        self.path = path
+        self.max_bytes = max_bytes
+        self.recorded = 0
+        self.dropped = 0
+        self._lock = threading.Lock()
+        self._closed = False
+        self._file = open(path, "ab")
+        self._size = self._file.tell()
+        if self._size == 0:
+            self._file.write(PUSH_RECORD_MAGIC)
+            self._size = len(PUSH_RECORD_MAGIC)
+        self._queue: queue.Queue = queue.Queue()
+        self._writer = threading.Thread(target=self._write_records, name="nacos-push-recorder", daemon=True)
+        self._writer.start()
+
+    def record(self, payload: Payload, received: Optional[float] = None) -> bool:
+        data = payload.SerializeToString()
+        with self._lock:
+            if self._closed or (self.max_bytes and self._size + _RECORD_HEADER.size + len(data) > self.max_bytes):
+                self.dropped += 1
+                return False
+            self._size += _RECORD_HEADER.size + len(data)
+            self.recorded += 1
+            self._queue.put(_RECORD_HEADER.pack(time.time() if received is None else received, len(data)) + data)
+            return True
+
+    def _write_records(self):
+        while True:
+            record = self._queue.get()
+            try:
+                if record is None:
+                    return
+                self._file.write(record)
+            except Exception as e:
+                self.logger.error("stop recording pushes to %s, write failed: %s", self.path, e)
+                self._stop_after_failure()
+                return
+            finally:
+                self._queue.task_done()
+
+    def _stop_after_failure(self):
+        # record queues nothing once closed, so what is left can be dropped and flush and close return
+        with self._lock:
+            self._closed = True
+            self.recorded -= 1
+            self.dropped += 1
+        while True:
+            try:
+                record = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if record is not None:
+                with self._lock:
+                    self.recorded -= 1
+                    self.dropped += 1
+            self._queue.task_done()
+
+    def flush(self):
+        """Blocks until the records queued so far are written to the file."""
+        self._queue.join()
+        with self._lock:
+            if not self._file.closed:
+                try:
+                    self._file.flush()
+                except OSError as e:
+                    self.logger.error("failed to flush pushes to %s: %s", self.path, e)
+
+    def close(self):
+        with self._lock:
+            if not self._closed:
+                self._closed = True
+                self._queue.put(None)
+        self._writer.join()
+        with self._lock:
+            if self._file.closed:
+                return
+            try:
+                self._file.close()
+            except OSError as e:
+                self.logger.error("failed to close push record file %s: %s", self.path, e)
+
+
+def get_push_recorder(path: str, max_bytes: int = 0, logger=None) -> PushRecorder:
+    """Recorder appending to path, one per path in the process so clients can share a file.
+
+    Clients sharing a path must agree on max_bytes.
+    """
+    with _lock:
+        recorder = _recorders.get(path)
+        if recorder is None:
+            recorder = PushRecorder(path, max_bytes, logger)
+            _recorders[path] = recorder
+        elif recorder.max_bytes != max_bytes:
+            raise NacosException(CLIENT_INVALID_PARAM,
+                                 f"push recorder {path} already records with max_bytes:{recorder.max_bytes}, "
+                                 f"not {max_bytes}")
+        return recorder
+
+
+@atexit.register
+def _close_recorders():
+    with _lock:
+        for recorder in _recorders.values():
+            recorder.close()
+        _recorders.clear()
+
+
+def read_pushes(path: str) -> Iterator[Tuple[float, Payload]]:
+    """Yields the receive time and Payload of every push recorded in path.
+
+    A record cut short, as the last one of a process that was killed, ends the iteration.
+    """
+    with open(path, "rb") as record_file:
+        if record_file.read(len(PUSH_RECORD_MAGIC)) != PUSH_RECORD_MAGIC:
+            raise NacosException(CLIENT_INVALID_PARAM, f"{path} is not a push record file")
+        while True:
+            header = record_file.read(_RECORD_HEADER.size)
+            if len(header) < _RECORD_HEADER.size:
+                return
+            received, size = _RECORD_HEADER.unpack(header)
+            data = record_file.read(size)
+            if len(data) < size:
+                return
+            payload = Payload()
+            payload.ParseFromString(data)
+            yield received, payload
+
+
+class PushReplayer:
+    """Feeds recorded pushes to server request handlers, without a server or connection.
+
+    handlers maps a request type to its handler, like RpcClient.server_request_handler_mapping,
+    for example NOTIFY_SUBSCRIBER_REQUEST_TYPE to a NamingPushRequestHandler. Pushes of other types
+    are skipped.
+    """
+
+    def __init__(self, logger, handlers: Dict[str, IServerRequestHandler],
+                 codec: PayloadCodec = DEFAULT_PAYLOAD_CODEC):
+        self.logger = logger
+        self.handlers = handlers
+        self.codec = codec
+        self.handled = 0
+        self.skipped = 0
+        self.failed = 0
+
+    async def replay(self, path: str, real_time: bool = False, speed: float = 1.0) -> int:
+        """Handles the pushes of path one after the other and returns how many were handled.
+
+        As fast as possible by default. With real_time the gaps between the recorded receive times
+        are kept, divided by speed.
+        """
+        handled = self.handled
+        first_received = None
+        begin = time.perf_counter()
+        for received, payload in read_pushes(path):
+            if real_time:
+                if first_received is None:
+                    first_received = received
+                delay = (received - first_received) / speed - (time.perf_counter() - begin)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            await self.handle(payload)
+        return self.handled - handled
+
+    async def handle(self, payload: Payload):
+        handler = self.handlers.get(payload.metadata.type)
+        if handler is None:
+            self.skipped += 1
+            return
+        try:
+            await handler.request_reply(GrpcUtils.parse(payload, self.codec))
+            self.handled += 1
+        except Exception as e:
+            self.failed += 1
+            self.logger.error("replay push %s failed: %s", payload.metadata.type, e)
@@ -0,0 +1,89 @@
+import base64
+import hashlib
+import hmac
+from typing import Dict, Optional
+
+from v2.nacos.common.client_config import ClientConfig
+from v2.nacos.common.constants import Constants
+from v2.nacos.common.tracing import start_span
+from v2.nacos.utils.common_util import get_current_time_millis
+from v2.nacos.utils.md5_util import md5
+
+
+class RequestSigner:
+    """Adds the identity and signature headers to requests sent to the server.
+
+    The static headers are built once. The request token and the signatures only change with the
+    millisecond, so they are computed once per millisecond and resource. The HMAC key state is
+    reused until the credentials provider returns another secret.
+    """
+
+    def __init__(self, client_config: ClientConfig, static_headers: Optional[Dict[str, str]] = None):
+        self.credentials_provider = client_config.credentials_provider
+        self.app_key = client_config.app_key
+        self.static_headers = dict(static_headers or {})
+        self._hmac_secret = None
+        self._hmac_base = None
+        self._millis = None
+        self._millis_str = ""
+        self._token = ""
+        self._signatures: Dict[str, str] = {}
+
+    def _tick(self) -> str:
+        now = get_current_time_millis()
+        if now != self._millis:
+            self._millis = now
+            self._millis_str = str(now)
+            self._token = md5(self._millis_str + self.app_key)
+            self._signatures.clear()
+        return self._millis_str
+
+    def _sign(self, secret: str, sign_str: str) -> str:
+        if secret != self._hmac_secret:
+            self._hmac_base = hmac.new(secret.encode(), digestmod=hashlib.sha1)
+            self._hmac_secret = secret
+            self._signatures.clear()
+        signature = self._signatures.get(sign_str)
+        if signature is None:
+            mac = self._hmac_base.copy()
+            mac.update(sign_str.encode())
+            signature = base64.b64encode(mac.digest()).decode()
+            self._signatures[sign_str] = signature
+        return signature
+
+    def sign(self, headers: dict, resource: str) -> None:
+        """Headers of config and ai requests: static headers, request time and token, Spas signature of resource."""
+        with start_span("nacos.sign"):
+            self._sign_resource(headers, resource)
+
+    def _sign_resource(self, headers: dict, resource: str) -> None:
+        now = self._tick()
+        headers.update(self.static_headers)
+        headers[Constants.CLIENT_REQUEST_TS_HEADER] = now
+        headers[Constants.CLIENT_REQUEST_TOKEN_HEADER] = self._token
+        headers['Timestamp'] = now
+
+        credentials = self.credentials_provider.get_credentials()
+        if credentials.get_access_key_id() and credentials.get_access_key_secret():
+            sign_str = f"{resource}+{now}" if resource.strip() else now
+            headers['Spas-AccessKey'] = credentials.get_access_key_id()
+            headers['Spas-Signature'] = self._sign(credentials.get_access_key_secret(), sign_str)
+            if credentials.get_security_token():
+                headers['Spas-SecurityToken'] = credentials.get_security_token()
+
+    def sign_naming(self, headers: dict, service_name: str) -> None:
+        """Headers of naming requests: static headers and the signature of the grouped service name."""
+        with start_span("nacos.sign"):
+            self._sign_service(headers, service_name)
+
+    def _sign_service(self, headers: dict, service_name: str) -> None:
+        headers.update(self.static_headers)
+        credentials = self.credentials_provider.get_credentials()
+        if credentials.get_access_key_id() and credentials.get_access_key_secret():
+            now = self._tick()
+            sign_str = now + Constants.SERVICE_INFO_SPLITER + service_name if service_name.strip() else now
+            headers["ak"] = credentials.get_access_key_id()
+            headers["data"] = sign_str
+            headers["signature"] = self._sign(credentials.get_access_key_secret(), sign_str)
+            if credentials.get_security_token():
+                headers["Spas-SecurityToken"] = credentials.get_security_token()
@@ -1,13 +1,20 @@
 import asyncio
 import logging
+import time
 from abc import ABC, abstractmethod
 from enum import Enum, auto
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 
 from v2.nacos.common.constants import Constants
-from v2.nacos.common.nacos_exception import NacosException, CLIENT_DISCONNECT, SERVER_ERROR, UN_REGISTER
+from v2.nacos.common.metrics import metrics
+from v2.nacos.common.nacos_exception import NacosException, CLIENT_DISCONNECT, CLIENT_OVER_THRESHOLD, \
+    SERVER_ERROR, UN_REGISTER
+from v2.nacos.common.tracing import start_span
+from v2.nacos.transport.circuit_breaker import DecorrelatedJitterBackoff
 from v2.nacos.transport.connection import Connection
 from v2.nacos.transport.connection_event_listener import ConnectionEventListener
+from v2.nacos.transport.flow_control import FlowController
+from v2.nacos.transport.hedging import HedgePolicy
 from v2.nacos.transport.model.internal_request import CONNECTION_RESET_REQUEST_TYPE, \
     CLIENT_DETECTION_REQUEST_TYPE, HealthCheckRequest, ConnectResetRequest
 from v2.nacos.transport.model.internal_response import ErrorResponse, ConnectResetResponse
@@ -78,12 +85,26 @@ class RpcClient(ABC):
         self.connection_event_listeners = []
         self.server_request_handler_mapping = {}
         self.nacos_server = nacos_server
+        self.nacos_server.add_server_list_listener(self.notify_server_srv_change)
         self.tenant = None
         self.lock = asyncio.Lock()
         self.last_active_timestamp = get_current_time_millis()
         self.event_listener_task = None
         self.health_check_task = None
         self.reconnection_task = None
+        # extra connections to the server of current_connection, they only serve read only requests
+        self.pool_connections: List[Connection] = []
+        self.pool_task = None
+        # hedging of read only requests, disabled while hedge_policy is None
+        self.hedge_policy: Optional[HedgePolicy] = None
+        # standby connection to a server other than the current one, the preferred target of hedges
+        self.hedge_connection: Optional[Connection] = None
+        self.hedge_connection_task = None
+        # limit of the requests sent per request type, disabled while flow_controller is None
+        self.flow_controller: Optional[FlowController] = None
+        # time it took the last start or reconnect to get a connection
+        self.connect_time_ms: Optional[float] = None
+        metrics.register_collector(f"rpc_client.{name}", self.metrics_snapshot)
 
     def put_all_labels(self, labels: Dict[str, str]):
         self.labels.update(labels)
@@ -122,10 +143,14 @@ class RpcClient(ABC):
             while not self.is_shutdown():
                 try:
                     await asyncio.sleep(Constants.KEEP_ALIVE_TIME_MILLS / 1000)
+                    await self._health_check_pool()
                     if get_current_time_millis() - self.last_active_timestamp < Constants.KEEP_ALIVE_TIME_MILLS:
                         continue
 
                     is_healthy = await self.send_health_check()
+                    if metrics.enabled:
+                        metrics.counter("nacos_client_health_check_total",
+                                        result="success" if is_healthy else "fail").inc()
                     if is_healthy:
                         self.last_active_timestamp = get_current_time_millis()
                         continue
@@ -154,9 +179,10 @@ class RpcClient(ABC):
 
                     if ctx.server_info:
                         server_exist = False
-                        for server_info in self.nacos_server.get_server_list():
-                            if ctx.server_info.server_ip == server_info.ip_addr:
-                                ctx.server_info.server_port = server_info.port
+                        for server_address in self.nacos_server.get_server_list():
+                            server_info = self._resolve_server_info(server_address)
+                            if ctx.server_info.server_ip == server_info.server_ip:
+                                ctx.server_info.server_port = server_info.server_port
                                 server_exist = True
                                 break
 
@@ -182,6 +208,7 @@ class RpcClient(ABC):
         self.reconnection_task = asyncio.create_task(self.reconnection_handler())
 
         connection = None
+        connect_begin = time.perf_counter()
         start_up_retry_times = RpcClient.RETRY_TIMES
         while start_up_retry_times > 0 and connection is None:
             try:
@@ -189,18 +216,21 @@ class RpcClient(ABC):
                 server_info = self._next_rpc_server()
                 self.logger.info(
                     f"rpc client start to connect server, server: {server_info.get_address()}")
-                connection = await self.connect_to_server(server_info)
+                connection = await self._race_connect(server_info)
             except Exception as e:
                 self.logger.warning(
                     f"rpc client failed to connect server, error: {str(e)},retry times left:{start_up_retry_times}")
 
             if connection:
+                self._report_connect_time(connect_begin)
                 self.current_connection = connection
                 self.logger.info(
                     f"rpc client successfully connected to server:{self.current_connection.server_info.get_address()}, connection_id:{self.current_connection.get_connection_id()}")
                 async with self.lock:
                     self.rpc_client_status = RpcClientStatus.RUNNING
                     await self._notify_connection_change(ConnectionStatus.CONNECTED)
+                self._schedule_pool_fill()
+                self._schedule_hedge_connection()
 
         if connection is None:
             self.logger.warning(
@@ -221,6 +251,20 @@ class RpcClient(ABC):
     def get_rpc_port_offset(self):
         pass
 
+    def get_connect_race_size(self) -> int:
+        """Number of servers raced on connect and reconnect, 1 tries one server at a time."""
+        return 1
+
+    def get_connect_race_stagger_ms(self) -> int:
+        return 0
+
+    def get_reconnect_backoff(self) -> DecorrelatedJitterBackoff:
+        return DecorrelatedJitterBackoff()
+
+    def get_connection_pool_size(self) -> int:
+        """Number of connections kept to the current server, current_connection included."""
+        return 1
+
     def get_current_server(self):
         if self.current_connection:
             return self.current_connection.server_info
@@ -241,6 +285,9 @@ class RpcClient(ABC):
         await self.event_chan.put(ConnectionEvent(event_type))
 
     async def notify_server_srv_change(self):
+        if not self.is_running():
+            # not connected yet or reconnecting, the next connect picks from the new list anyway
+            return
         if self.current_connection is None:
             await self.switch_server_async(None, False)
             return
@@ -248,7 +295,7 @@ class RpcClient(ABC):
         cur_server_info = self.current_connection.get_server_info()
         found = False
         for server in self.nacos_server.get_server_list():
-            if server.ip_addr == cur_server_info.server_ip:
+            if self._resolve_server_info(server).get_address() == cur_server_info.get_address():
                 found = True
                 break
 
@@ -275,11 +322,20 @@ class RpcClient(ABC):
         async with self.lock:
             self.server_request_handler_mapping[request_type] = handler
 
+    async def remove_server_request_handler(self, request_type: str) -> None:
+        async with self.lock:
+            self.server_request_handler_mapping.pop(request_type, None)
+
     async def register_connection_listener(self, listener: ConnectionEventListener):
         self.logger.info(f"rpc client register connection listener: {listener.__class__.__name__}")
         async with self.lock:
             self.connection_event_listeners.append(listener)
 
+    async def remove_connection_listener(self, listener: ConnectionEventListener):
+        async with self.lock:
+            if listener in self.connection_event_listeners:
+                self.connection_event_listeners.remove(listener)
+
     def _next_rpc_server(self) -> Optional[ServerInfo]:
         server_config = self.nacos_server.get_next_server()
         return self._resolve_server_info(server_config)
@@ -301,49 +357,97 @@ class RpcClient(ABC):
         return server_info
 
     async def request(self, request: Request, timeout_millis: int = DEFAULT_TIMEOUT_MILLS):
-        retry_times = 0
         start = get_current_time_millis()
-        exception_throw = None
-        while retry_times < RpcClient.RETRY_TIMES and get_current_time_millis() < start + timeout_millis:
-            wait_reconnect = False
-            try:
-                if not self.current_connection or not self.is_running():
-                    wait_reconnect = True
-                    raise NacosException(CLIENT_DISCONNECT,
-                                         "client not connected,status:" + str(self.rpc_client_status))
-                response = await self.current_connection.request(request, timeout_millis)
-
-                if not response:
-                    raise NacosException(SERVER_ERROR, "request failed, response is null")
-
-                if isinstance(response, ErrorResponse):
-                    if response.get_error_code() == UN_REGISTER:
-                        async with self.lock:
-                            wait_reconnect = True
-                            self.rpc_client_status = RpcClientStatus.UNHEALTHY
-                            self.logger.error("connection is unregistered, switch server, connectionId=%s, request=%s",
-                                              self.current_connection.get_connection_id(), request.get_request_type())
-                            await self.switch_server_async(None, False)
-                    raise NacosException(SERVER_ERROR, response.get_message())
-                self.last_active_timestamp = get_current_time_millis()
-                return response
-            except NacosException as e:
-                if wait_reconnect:
-                    sleep_time = min(0.1, timeout_millis / 3000)
-                    await asyncio.sleep(sleep_time)
-                self.logger.error("send request fail, request=%s, retryTimes=%s, errorMessage=%s", request, retry_times,
-                                  str(e))
-                exception_throw = e
-            retry_times += 1
-
-        async with self.lock:
-            self.rpc_client_status = RpcClientStatus.UNHEALTHY
-        await self.switch_server_async(None, True)
-        raise exception_throw
+        begin = time.perf_counter() if metrics.enabled else None
+        with start_span("nacos.rpc.request") as span:
+            span.set_attribute("nacos.request_type", request.get_request_type())
+            span.set_attribute("nacos.module", request.get_module())
+            if self.flow_controller is not None and request.get_module() != 'internal':
+                # throttled before the retry loop, so a rejection neither retries nor marks the server unhealthy
+                try:
+                    await self.flow_controller.acquire(request.get_module(), request.get_request_type(), timeout_millis)
+                except NacosException as e:
+                    if begin is not None:
+                        self._record_request_metrics(request, begin, e.error_code)
+                    raise
+            retry_times = 0
+            exception_throw = None
+            while retry_times < RpcClient.RETRY_TIMES and get_current_time_millis() < start + timeout_millis:
+                wait_reconnect = False
+                try:
+                    if not self.current_connection or not self.is_running():
+                        wait_reconnect = True
+                        raise NacosException(CLIENT_DISCONNECT,
+                                             "client not connected,status:" + str(self.rpc_client_status))
+                    connection = self._select_connection(request)
+                    # the time spent in flow control and earlier attempts counts against the timeout
+                    remaining_millis = max(1, start + timeout_millis - get_current_time_millis())
+                    if self.hedge_policy is not None and request.is_read_only():
+                        connection, response = await self._hedged_request(connection, request, remaining_millis)
+                    else:
+                        response = await self._timed_request(connection, request, remaining_millis)
+
+                    if not response:
+                        raise NacosException(SERVER_ERROR, "request failed, response is null")
+
+                    if isinstance(response, ErrorResponse):
+                        if response.get_error_code() == UN_REGISTER and connection is not self.current_connection:
+                            self.logger.warning("pooled connection is unregistered, drop it, connectionId=%s, request=%s",
+                                                connection.get_connection_id(), request.get_request_type())
+                            await self.remove_pool_connection(connection)
+                        elif response.get_error_code() == UN_REGISTER:
+                            async with self.lock:
+                                wait_reconnect = True
+                                self.rpc_client_status = RpcClientStatus.UNHEALTHY
+                                self.logger.error("connection is unregistered, switch server, connectionId=%s, request=%s",
+                                                  self.current_connection.get_connection_id(), request.get_request_type())
+                                await self.switch_server_async(None, False)
+                        raise NacosException(SERVER_ERROR, response.get_message())
+                    if connection is self.current_connection:
+                        self.last_active_timestamp = get_current_time_millis()
+                    if begin is not None:
+                        self._record_request_metrics(request, begin, response.get_result_code())
+                    span.set_attribute("nacos.request_id", response.requestId or "")
+                    span.set_attribute("nacos.result_code", response.get_result_code())
+                    span.set_attribute("nacos.retry_times", retry_times)
+                    return response
+                except NacosException as e:
+                    if wait_reconnect:
+                        sleep_time = min(0.1, timeout_millis / 3000)
+                        await asyncio.sleep(sleep_time)
+                    self.logger.error("send request fail, request=%s, retryTimes=%s, errorMessage=%s", request, retry_times,
+                                      str(e))
+                    exception_throw = e
+                retry_times += 1
+
+            if exception_throw is None:
+                # the timeout was used up before the first attempt, that says nothing about the server
+                exception_throw = NacosException(CLIENT_OVER_THRESHOLD,
+                                                 f"request {request.get_request_type()} timed out after "
+                                                 f"{timeout_millis}ms before it was sent")
+                if begin is not None:
+                    self._record_request_metrics(request, begin, exception_throw.error_code)
+                raise exception_throw
+            async with self.lock:
+                self.rpc_client_status = RpcClientStatus.UNHEALTHY
+            await self.switch_server_async(None, True)
+            if begin is not None:
+                self._record_request_metrics(request, begin, exception_throw.error_code)
+            span.set_attribute("nacos.retry_times", retry_times)
+            raise exception_throw
+
+    @staticmethod
+    def _record_request_metrics(request: Request, begin: float, code: int):
+        request_type = request.get_request_type()
+        metrics.histogram("nacos_client_request_latency_ms", type=request_type).observe(
+            (time.perf_counter() - begin) * 1000)
+        metrics.counter("nacos_client_request_total", type=request_type, code=code).inc()
 
     async def shutdown(self):
         async with self.lock:
             self.rpc_client_status = RpcClientStatus.SHUTDOWN
+        self.nacos_server.remove_server_list_listener(self.notify_server_srv_change)
+        metrics.unregister_collector(f"rpc_client.{self.name}")
 
         # 取消所有任务
         tasks = [self.event_listener_task, self.health_check_task, self.reconnection_task]
@@ -361,19 +465,34 @@ class RpcClient(ABC):
         self.reconnection_task = None
 
         await self._close_connection()
+        await self._close_pool_connections()
+        await self._close_hedge_connection()
+
+    def metrics_snapshot(self) -> dict:
+        """State of the connections, reconnects, hedging and flow control of this client."""
+        return {
+            "status": self.rpc_client_status.name,
+            "server": self.current_connection.server_info.get_address() if self.current_connection else None,
+            "connect_time_ms": self.connect_time_ms,
+            "pool_connections": len(self.pool_connections),
+            "circuit_breakers": self.nacos_server.get_circuit_breaker_states(),
+            "hedge": self.hedge_policy.snapshot() if self.hedge_policy is not None else None,
+            "flow_control": self.flow_controller.snapshot() if self.flow_controller is not None else None,
+        }
 
     async def _close_connection(self):
         if self.current_connection is not None:
             await self.current_connection.close()
             await self._notify_connection_change(ConnectionStatus.DISCONNECTED)
 
-    async def send_health_check(self):
-        if not self.current_connection:
+    async def send_health_check(self, connection: Optional[Connection] = None):
+        connection = connection or self.current_connection
+        if not connection:
             return False
 
         health_check_request = HealthCheckRequest()
         try:
-            response = await self.current_connection.request(health_check_request, RpcClient.DEFAULT_TIMEOUT_MILLS)
+            response = await connection.request(health_check_request, RpcClient.DEFAULT_TIMEOUT_MILLS)
             if not response.is_success():
                 # when client request immediately after  server starts, server may not ready to serve new request
                 # the server will return code 3xx, tell the client to retry after a while
@@ -392,19 +511,29 @@ class RpcClient(ABC):
             if reconnection_ctx.on_request_fail and await self.send_health_check():
                 self.logger.info("%s server check success, currentServer is %s", self.name,
                                  self.current_connection.server_info.get_address())
+                if metrics.enabled:
+                    metrics.counter("nacos_client_reconnect_total", result="recovered").inc()
                 async with self.lock:
                     self.rpc_client_status = RpcClientStatus.RUNNING
                     await self._notify_connection_change(ConnectionStatus.CONNECTED)
                 return
 
             switch_success = False
-            reconnect_times, retry_turns = 0, 0
+            reconnect_times = 0
+            connect_begin = time.perf_counter()
+            backoff = self.get_reconnect_backoff()
+            server_info, last_exception = None, None
 
             while not self.is_shutdown() and not switch_success:
                 try:
                     server_info = recommend_server if recommend_server else self._next_rpc_server()
-                    connection_new = await self.connect_to_server(server_info)
+                    # the recommended server gets one attempt, then the server list takes over
+                    recommend_server = None
+                    connection_new = await self._race_connect(server_info)
                     if connection_new:
+                        # the race may have been won by another candidate than the one asked for
+                        server_info = connection_new.server_info
+                        self._report_connect_time(connect_begin)
                         self.logger.info("%s success to connect a server:%s, connectionId:%s", self.name,
                                          server_info.get_address(), connection_new.get_connection_id())
                         if self.current_connection:
@@ -413,11 +542,20 @@ class RpcClient(ABC):
                                              self.current_connection.get_connection_id())
                             self.current_connection.set_abandon(True)
                             await self._close_connection()
+                        await self._close_pool_connections()
+                        if self.hedge_connection is not None and \
+                                self.hedge_connection.server_info.get_address() == server_info.get_address():
+                            # the standby server became the current one
+                            await self._close_hedge_connection()
                         self.current_connection = connection_new
                         async with self.lock:
                             self.rpc_client_status = RpcClientStatus.RUNNING
                         switch_success = True
+                        if metrics.enabled:
+                            metrics.counter("nacos_client_reconnect_total", result="switched").inc()
                         await self._notify_connection_change(ConnectionStatus.CONNECTED)
+                        self._schedule_pool_fill()
+                        self._schedule_hedge_connection()
                         return
 
                     if self.is_shutdown():
@@ -429,23 +567,302 @@ class RpcClient(ABC):
                     logging.error(f"failed to connect server, error = {str(e)}")
                     last_exception = str(e)
 
+                if metrics.enabled:
+                    metrics.counter("nacos_client_reconnect_failures_total").inc()
+
                 if reconnect_times > 0 and reconnect_times % len(self.nacos_server.get_server_list()) == 0:
                     err_info = last_exception if last_exception else "unknown"
                     self.logger.warning(
                         "%s failed to connect to server,after trying %s times,last try server is %s,error:%s",
-                        self.name, reconnect_times, server_info.get_address(), str(err_info))
-                    if retry_turns < 50:
-                        retry_turns += 1
+                        self.name, reconnect_times, server_info.get_address() if server_info else None, str(err_info))
 
                 reconnect_times += 1
                 if not self.is_running():
-                    await asyncio.sleep(min((retry_turns + 1) / 10, 5))
+                    await asyncio.sleep(backoff.next_delay_ms() / 1000)
 
             if self.is_shutdown():
                 self.logger.warning("%s client is shutdown, stop reconnect to server", self.name)
         except NacosException as e:
             self.logger.warning("%s failed to reconnect to server, error is %s", self.name, str(e))
 
+    def _report_connect_time(self, connect_begin: float):
+        self.connect_time_ms = (time.perf_counter() - connect_begin) * 1000
+        self.logger.info("%s time to connect: %.1fms", self.name, self.connect_time_ms)
+        if metrics.enabled:
+            metrics.histogram("nacos_client_connect_time_ms").observe(self.connect_time_ms)
+
+    def _record_server_result(self, server_info: ServerInfo, rtt_ms: Optional[float], success: bool,
+                              request_type: str = "connect"):
+        self.nacos_server.record_server_result(server_info.server_ip,
+                                               server_info.server_port - self.get_rpc_port_offset(), rtt_ms, success,
+                                               request_type)
+
+    async def _connect_and_record(self, server_info: ServerInfo) -> Optional[Connection]:
+        http_port = server_info.server_port - self.get_rpc_port_offset()
+        # only a connection actually attempted uses up the half open trial of the server
+        self.nacos_server.record_server_attempt(server_info.server_ip, http_port)
+        try:
+            connection = await self.connect_to_server(server_info)
+        except asyncio.CancelledError:
+            # lost a connect race, says nothing about the server
+            self.nacos_server.record_server_attempt(server_info.server_ip, http_port, cancelled=True)
+            raise
+        except Exception:
+            self._record_server_result(server_info, None, False)
+            raise
+        # several round trips and handshakes, only the outcome is a useful sample
+        self._record_server_result(server_info, None, connection is not None)
+        return connection
+
+    def _race_candidates(self, first: ServerInfo) -> List[ServerInfo]:
+        candidates = [first]
+        addresses = {first.get_address()}
+        race_size = min(self.get_connect_race_size(), len(self.nacos_server.get_server_list()))
+        for _ in range(race_size * 2):
+            if len(candidates) >= race_size:
+                break
+            try:
+                server_info = self._next_rpc_server()
+            except NacosException:
+                # no other server is available right now
+                break
+            if server_info.get_address() not in addresses:
+                addresses.add(server_info.get_address())
+                candidates.append(server_info)
+        return candidates
+
+    async def _race_connect(self, first: ServerInfo) -> Optional[Connection]:
+        """Connects to first, starting an attempt to the next candidate whenever the running ones
+        fail or have not finished within the stagger delay. The first connection set up wins, the
+        other attempts are cancelled and their connections closed."""
+        candidates = self._race_candidates(first)
+        if len(candidates) == 1:
+            return await self._connect_and_record(first)
+
+        stagger = self.get_connect_race_stagger_ms() / 1000
+        pending = set()
+        try:
+            for server_info in candidates:
+                self.logger.info("%s race to connect server %s", self.name, server_info.get_address())
+                pending.add(asyncio.create_task(self._connect_and_record(server_info)))
+                connection = await self._first_connection(pending, stagger)
+                if connection:
+                    return connection
+            return await self._first_connection(pending, None)
+        finally:
+            for task in pending:
+                task.cancel()
+            for result in await asyncio.gather(*pending, return_exceptions=True):
+                if isinstance(result, Connection):
+                    result.set_abandon(True)
+                    await result.close()
+
+    async def _first_connection(self, pending: set, timeout: Optional[float]) -> Optional[Connection]:
+        # None when the timeout passed or every pending attempt failed
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        while pending:
+            remaining = None if deadline is None else deadline - loop.time()
+            if remaining is not None and remaining <= 0:
+                return None
+            done, _ = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+            winner = None
+            for task in done:
+                pending.discard(task)
+                if task.exception() is not None:
+                    self.logger.warning("%s connect attempt failed, error:%s", self.name, str(task.exception()))
+                elif task.result() is None:
+                    continue
+                elif winner is None:
+                    winner = task.result()
+                else:
+                    task.result().set_abandon(True)
+                    await task.result().close()
+            if winner:
+                return winner
+        return None
+
+    def _select_connection(self, request: Request) -> Connection:
+        # least outstanding requests among the healthy connections, the current connection wins ties
+        selected = self.current_connection
+        if not self.pool_connections or not request.is_read_only():
+            return selected
+        for connection in self.pool_connections:
+            if not connection.is_abandon() and connection.in_flight < selected.in_flight:
+                selected = connection
+        return selected
+
+    def _schedule_pool_fill(self):
+        if self.get_connection_pool_size() <= 1 or self.is_shutdown():
+            return
+        if self.pool_task is None or self.pool_task.done():
+            self.pool_task = asyncio.create_task(self._fill_connection_pool())
+
+    async def _fill_connection_pool(self):
+        current = self.current_connection
+        while not self.is_shutdown() and current is not None and current is self.current_connection \
+                and len(self.pool_connections) < self.get_connection_pool_size() - 1:
+            try:
+                connection = await self.connect_to_server(current.server_info)
+            except NacosException as e:
+                self.logger.warning("%s failed to open pooled connection to %s, error:%s", self.name,
+                                    current.server_info.get_address(), str(e))
+                return
+            if connection is None:
+                return
+            if self.is_shutdown() or current is not self.current_connection:
+                # switched server meanwhile, the pool is refilled for the new server
+                connection.set_abandon(True)
+                await connection.close()
+                return
+            self.pool_connections.append(connection)
+            self.logger.info("%s add pooled connection to %s, connectionId:%s, pool size:%s", self.name,
+                             current.server_info.get_address(), connection.get_connection_id(),
+                             len(self.pool_connections) + 1)
+
+    async def _health_check_pool(self):
+        if not self.is_running():
+            return
+        for connection in list(self.pool_connections):
+            if not await self.send_health_check(connection):
+                self.logger.warning("%s pooled connection health check fail, connectionId:%s", self.name,
+                                    connection.get_connection_id())
+                await self.remove_pool_connection(connection)
+        self._schedule_pool_fill()
+        if self.hedge_connection is not None and not await self.send_health_check(self.hedge_connection):
+            self.logger.warning("%s hedge connection health check fail, connectionId:%s", self.name,
+                                self.hedge_connection.get_connection_id())
+            await self._close_hedge_connection()
+        self._schedule_hedge_connection()
+
+    async def remove_pool_connection(self, connection: Connection):
+        if connection is self.hedge_connection:
+            await self._close_hedge_connection()
+            return
+        if connection not in self.pool_connections:
+            return
+        self.pool_connections.remove(connection)
+        connection.set_abandon(True)
+        await connection.close()
+        self.logger.info("%s remove pooled connection, connectionId:%s", self.name, connection.get_connection_id())
+
+    async def replace_pool_connection(self, connection: Connection):
+        """Closes a pooled or hedge connection and opens its replacement, the current connection is kept."""
+        await self.remove_pool_connection(connection)
+        self._schedule_pool_fill()
+        self._schedule_hedge_connection()
+
+    async def _close_pool_connections(self):
+        connections, self.pool_connections = self.pool_connections, []
+        for connection in connections:
+            connection.set_abandon(True)
+            await connection.close()
+
+    async def _timed_request(self, connection: Connection, request: Request, timeout_millis: int):
+        begin = time.perf_counter()
+        try:
+            response = await connection.request(request, timeout_millis)
+        except Exception:
+            self._record_server_result(connection.server_info, None, False, request.get_request_type())
+            raise
+        rtt_ms = (time.perf_counter() - begin) * 1000
+        self._record_server_result(connection.server_info, rtt_ms, True, request.get_request_type())
+        if self.hedge_policy is not None and request.is_read_only():
+            self.hedge_policy.record_latency(rtt_ms)
+        return response
+
+    async def _hedged_request(self, connection: Connection, request: Request, timeout_millis: int):
+        """Sends a read only request on connection and, when it has not answered within the hedge
+        delay and the budget allows, the same request on a second connection. The first response
+        wins and the other attempt is cancelled. Returns the connection that answered and the response."""
+        policy = self.hedge_policy
+        policy.on_read()
+        # every attempt sends its own copy, the two run at the same time on different connections
+        attempts = {asyncio.create_task(self._timed_request(connection, request.model_copy(), timeout_millis)):
+                    connection}
+        try:
+            delay_ms = policy.delay_ms()
+            if delay_ms is not None:
+                await asyncio.wait(attempts, timeout=delay_ms / 1000)
+                hedge_connection = self._hedge_target(connection)
+                if not any(task.done() for task in attempts) and hedge_connection is not None \
+                        and policy.try_acquire():
+                    self.logger.debug("%s hedge %s to connectionId:%s after %.1fms", self.name,
+                                      request.get_request_type(), hedge_connection.get_connection_id(), delay_ms)
+                    attempts[asyncio.create_task(
+                        self._timed_request(hedge_connection, request.model_copy(), timeout_millis))] = hedge_connection
+
+            pending, error = set(attempts), None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if attempts[task] is not connection:
+                            policy.hedges_won += 1
+                        return attempts[task], task.result()
+                    error = error or task.exception()
+            raise error
+        finally:
+            for task in attempts:
+                task.cancel()
+            # wait for the cancelled attempt to release its connection, its error is not interesting
+            await asyncio.gather(*attempts, return_exceptions=True)
+
+    def _hedge_target(self, primary: Connection) -> Optional[Connection]:
+        # another server helps when the primary one stalls, another connection only when the channel does
+        if self.hedge_connection is not None and not self.hedge_connection.is_abandon():
+            return self.hedge_connection
+        candidates = [c for c in [self.current_connection] + self.pool_connections
+                      if c is not None and c is not primary and not c.is_abandon()]
+        return min(candidates, key=lambda c: c.in_flight, default=None)
+
+    def _schedule_hedge_connection(self):
+        if self.hedge_policy is None or self.is_shutdown() or len(self.nacos_server.get_server_list()) < 2:
+            return
+        if self.hedge_connection is not None and not self.hedge_connection.is_abandon():
+            return
+        if self.hedge_connection_task is None or self.hedge_connection_task.done():
+            self.hedge_connection_task = asyncio.create_task(self._open_hedge_connection())
+
+    async def _open_hedge_connection(self):
+        current = self.current_connection
+        if current is None:
+            return
+        server_info = None
+        for _ in range(len(self.nacos_server.get_server_list())):
+            try:
+                candidate = self._next_rpc_server()
+            except NacosException:
+                return
+            if candidate.get_address() != current.server_info.get_address():
+                server_info = candidate
+                break
+        if server_info is None:
+            return
+        try:
+            connection = await self._connect_and_record(server_info)
+        except NacosException as e:
+            self.logger.warning("%s failed to open hedge connection to %s, error:%s", self.name,
+                                server_info.get_address(), str(e))
+            return
+        if connection is None:
+            return
+        if self.is_shutdown() or self.current_connection is None \
+                or self.current_connection.server_info.get_address() == server_info.get_address():
+            connection.set_abandon(True)
+            await connection.close()
+            return
+        self.hedge_connection = connection
+        self.logger.info("%s open hedge connection to %s, connectionId:%s", self.name, server_info.get_address(),
+                         connection.get_connection_id())
+
+    async def _close_hedge_connection(self):
+        connection, self.hedge_connection = self.hedge_connection, None
+        if connection is not None:
+            connection.set_abandon(True)
+            await connection.close()
+            self.logger.info("%s close hedge connection, connectionId:%s", self.name, connection.get_connection_id())
+
 
 class ConnectResetRequestHandler(IServerRequestHandler):
     def __init__(self, rpc_client: RpcClient):
@@ -459,10 +876,10 @@ class ConnectResetRequestHandler(IServerRequestHandler):
             return None
 
         try:
-            with self.rpc_client.lock:
+            async with self.rpc_client.lock:
                 if self.rpc_client.is_running():
-                    if request.server_ip.strip():
-                        server_info = ServerInfo(request.server_ip, int(request.server_port))
+                    if request.serverIp and request.serverIp.strip():
+                        server_info = ServerInfo(request.serverIp, int(request.serverPort))
                         await self.rpc_client.switch_server_async(server_info=server_info,
                                                                   on_request_fail=False)
                     else:
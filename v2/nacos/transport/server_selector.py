@@ -0,0 +1,117 @@
+import random
+import time
+from typing import Dict, List, Optional
+
+from v2.nacos.common.constants import Constants
+
+SERVER_SELECT_ROUND_ROBIN = "round_robin"
+SERVER_SELECT_LATENCY = "latency"
+
+
+def server_key(address: str) -> str:
+    """Normalizes a server list entry ("ip", "ip:port" or "http://ip:port/") to "ip:port"."""
+    address = address.strip().rstrip("/")
+    if "://" in address:
+        address = address.split("://", 1)[1]
+    address = address.split("/", 1)[0]
+    if ":" not in address:
+        return f"{address}:{Constants.DEFAULT_PORT}"
+    return address
+
+
+class ServerStats:
+    """Exponentially weighted moving averages of the round trip time and the error rate of one server.
+
+    rtt_ms is measured by the tcp probe. slowness is how much longer than usual the server takes to
+    answer requests, 1.0 until requests to it were measured.
+    """
+
+    def __init__(self):
+        self.rtt_ms: Optional[float] = None
+        self.slowness = 1.0
+        self.error_rate = 0.0
+        self.samples = 0
+        self.last_update = time.monotonic()
+
+    def record(self, rtt_ms: Optional[float], success: bool, alpha: float) -> None:
+        self.error_rate = self.decayed_error_rate() * (1 - alpha) + (0.0 if success else alpha)
+        # a failed call says nothing about the latency of the server, a timeout would only inflate it
+        if success and rtt_ms is not None:
+            self.rtt_ms = rtt_ms if self.rtt_ms is None else self.rtt_ms * (1 - alpha) + rtt_ms * alpha
+        self.samples += 1
+        self.last_update = time.monotonic()
+
+    def record_slowness(self, slowness: float, alpha: float) -> None:
+        self.slowness = self.slowness * (1 - alpha) + slowness * alpha
+
+    def decayed_error_rate(self) -> float:
+        # errors fade out without new samples, so a server that failed once gets another chance
+        elapsed = time.monotonic() - self.last_update
+        return self.error_rate * 0.5 ** (elapsed / Constants.SERVER_ERROR_RATE_HALF_LIFE)
+
+
+class LatencyServerSelector:
+    """Chooses servers by power of two choices over EWMA RTT penalized by the EWMA error rate.
+
+    Two distinct candidates are drawn at random and the one with the lower score wins, which
+    settles clients on the fastest members without sending all of them to the same one. Servers
+    without samples score best so that they are measured.
+
+    Request round trip times are not comparable with the probe or across request types, a config
+    query and a batch register differ in server work. Each is divided by the moving average of its
+    request type over all servers, and the probe rtt of a server is scaled by the average ratio, so
+    a server accepting connections quickly but answering slowly ranks behind the others.
+    """
+
+    def __init__(self, alpha: float = Constants.SERVER_EWMA_ALPHA,
+                 error_penalty: float = Constants.SERVER_ERROR_PENALTY):
+        self.alpha = alpha
+        self.error_penalty = error_penalty
+        self.stats: Dict[str, ServerStats] = {}
+        # moving average rtt of every request type over all servers
+        self.request_rtt_ms: Dict[str, float] = {}
+
+    def _stats_of(self, key: str) -> ServerStats:
+        stats = self.stats.get(key)
+        if stats is None:
+            stats = ServerStats()
+            self.stats[key] = stats
+        return stats
+
+    def record(self, key: str, rtt_ms: Optional[float], success: bool) -> None:
+        """Records a probe of the server, rtt_ms is None when it measured no latency."""
+        self._stats_of(key).record(rtt_ms, success, self.alpha)
+
+    def record_request(self, key: str, request_type: str, rtt_ms: Optional[float], success: bool) -> None:
+        """Records a request of request_type answered by the server in rtt_ms."""
+        stats = self._stats_of(key)
+        stats.record(None, success, self.alpha)
+        if not success or rtt_ms is None:
+            return
+        average = self.request_rtt_ms.get(request_type)
+        if average is None:
+            self.request_rtt_ms[request_type] = rtt_ms
+            return
+        if average > 0:
+            stats.record_slowness(rtt_ms / average, self.alpha)
+        self.request_rtt_ms[request_type] = average * (1 - self.alpha) + rtt_ms * self.alpha
+
+    def score(self, key: str) -> float:
+        stats = self.stats.get(key)
+        if stats is None:
+            return 0.0
+        if stats.rtt_ms is None:
+            # no latency sample yet, a server that only failed ranks behind every server that answered
+            return float("inf") if stats.decayed_error_rate() > Constants.SERVER_ERROR_RATE_IGNORED else 0.0
+        return stats.rtt_ms * stats.slowness * (1 + self.error_penalty * stats.decayed_error_rate())
+
+    def choose(self, servers: List[str]) -> str:
+        if len(servers) == 1:
+            return servers[0]
+        first, second = random.sample(servers, 2)
+        return first if self.score(server_key(first)) <= self.score(server_key(second)) else second
+
+    def snapshot(self) -> Dict[str, dict]:
+        return {key: {"rtt_ms": stats.rtt_ms, "slowness": stats.slowness, "error_rate": stats.decayed_error_rate(),
+                      "samples": stats.samples}
+                for key, stats in self.stats.items()}
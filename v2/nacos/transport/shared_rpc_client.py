@@ -0,0 +1,148 @@
+import asyncio
+import uuid
+import weakref
+from typing import Dict, List, Set, Tuple
+
+from v2.nacos.common.client_config import ClientConfig
+from v2.nacos.common.constants import Constants
+from v2.nacos.transport.connection_event_listener import ConnectionEventListener
+from v2.nacos.transport.http_agent import HttpAgent
+from v2.nacos.transport.nacos_server_connector import NacosServerConnector
+from v2.nacos.transport.rpc_client import RpcClient, ConnectionType
+from v2.nacos.transport.rpc_client_factory import RpcClientFactory
+from v2.nacos.transport.server_request_handler import IServerRequestHandler
+
+
+class _SharedRpcClientEntry:
+
+    def __init__(self, key: Tuple, rpc_client: RpcClient, http_agent: HttpAgent):
+        self.key = key
+        self.rpc_client = rpc_client
+        # owned by the entry, a service closes its own agent on shutdown while others still share the client
+        self.http_agent = http_agent
+        # modules using the client, subscriptions and redo data of two services of the same
+        # module would overwrite each other on the server, so each module joins once
+        self.modules: Set[str] = set()
+        self.started = False
+        self.start_lock = asyncio.Lock()
+
+
+class SharedRpcClientLease:
+    """One service's use of a shared rpc client.
+
+    Handlers and listeners registered through the lease are removed again on release, so a
+    service that shut down no longer receives pushes or redoes its data on reconnect.
+    """
+
+    def __init__(self, registry: "SharedRpcClientRegistry", entry: _SharedRpcClientEntry, module: str):
+        self._registry = registry
+        self._entry = entry
+        self.module = module
+        self._handlers: List[str] = []
+        self._listeners: List[ConnectionEventListener] = []
+        self.released = False
+
+    @property
+    def rpc_client(self) -> RpcClient:
+        return self._entry.rpc_client
+
+    @property
+    def nacos_server(self) -> NacosServerConnector:
+        return self._entry.rpc_client.nacos_server
+
+    async def register_server_request_handler(self, request_type: str, handler: IServerRequestHandler) -> None:
+        await self.rpc_client.register_server_request_handler(request_type, handler)
+        self._handlers.append(request_type)
+
+    async def register_connection_listener(self, listener: ConnectionEventListener) -> None:
+        await self.rpc_client.register_connection_listener(listener)
+        self._listeners.append(listener)
+        if self.rpc_client.is_running():
+            # the connected event was sent before this service joined
+            await listener.on_connected()
+
+    async def start(self) -> None:
+        async with self._entry.start_lock:
+            if not self._entry.started:
+                self._entry.started = True
+                await self.rpc_client.start()
+
+    async def release(self) -> None:
+        if self.released:
+            return
+        self.released = True
+        for request_type in self._handlers:
+            await self.rpc_client.remove_server_request_handler(request_type)
+        for listener in self._listeners:
+            await self.rpc_client.remove_connection_listener(listener)
+        await self._registry.release(self._entry, self.module)
+
+
+class SharedRpcClientRegistry:
+    """Process wide rpc clients shared by the naming, config and ai services of the same server and namespace."""
+
+    def __init__(self):
+        self._entries: Dict[Tuple, List[_SharedRpcClientEntry]] = {}
+        # asyncio locks are bound to one loop, the registry is not
+        self._locks = weakref.WeakKeyDictionary()
+
+    def _lock(self) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        lock = self._locks.get(loop)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._locks[loop] = lock
+        return lock
+
+    @staticmethod
+    def _key_of(client_config: ClientConfig) -> Tuple:
+        credentials = client_config.credentials_provider.get_credentials()
+        return (asyncio.get_running_loop(), tuple(client_config.server_list), client_config.endpoint,
+                client_config.namespace_id or "", client_config.username, credentials.get_access_key_id(),
+                client_config.tls_config.enabled if client_config.tls_config else False)
+
+    async def acquire(self, logger, client_config: ClientConfig, module: str) -> SharedRpcClientLease:
+        key = self._key_of(client_config)
+        async with self._lock():
+            entries = self._entries.setdefault(key, [])
+            entry = next((e for e in entries if module not in e.modules), None)
+            if entry is None:
+                http_agent = HttpAgent(logger, client_config.tls_config, client_config.timeout_ms,
+                                       pool_size=client_config.http_pool_size,
+                                       pool_size_per_host=client_config.http_pool_size_per_host,
+                                       keep_alive_timeout=client_config.http_keep_alive_timeout)
+                nacos_server = NacosServerConnector(logger, client_config, http_agent)
+                await nacos_server.init()
+                # the naming server only keeps ephemeral data for connections labeled with the naming module,
+                # config and ai requests do not depend on the module label
+                labels = {Constants.LABEL_SOURCE: Constants.LABEL_SOURCE_SDK,
+                          Constants.LABEL_MODULE: Constants.NAMING_MODULE}
+                rpc_client = await RpcClientFactory(logger).create_client(
+                    f"{uuid.uuid4()}_shared", ConnectionType.GRPC, labels, client_config, nacos_server)
+                entry = _SharedRpcClientEntry(key, rpc_client, http_agent)
+                entries.append(entry)
+                logger.info("create shared rpc client %s, namespace:%s", rpc_client.name, client_config.namespace_id)
+            entry.modules.add(module)
+            logger.info("%s joins shared rpc client %s, modules:%s", module, entry.rpc_client.name, entry.modules)
+            return SharedRpcClientLease(self, entry, module)
+
+    async def release(self, entry: _SharedRpcClientEntry, module: str) -> None:
+        async with self._lock():
+            entry.modules.discard(module)
+            if entry.modules:
+                return
+            entries = self._entries.get(entry.key, [])
+            if entry in entries:
+                entries.remove(entry)
+            if not entries:
+                self._entries.pop(entry.key, None)
+        entry.rpc_client.logger.info("shutdown shared rpc client %s, no service uses it", entry.rpc_client.name)
+        await entry.rpc_client.shutdown()
+        await entry.rpc_client.nacos_server.close()
+        await entry.http_agent.close()
+
+    def size(self) -> int:
+        return sum(len(entries) for entries in self._entries.values())
+
+
+shared_rpc_clients = SharedRpcClientRegistry()
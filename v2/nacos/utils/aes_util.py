@@ -28,6 +28,25 @@ def encrypt(message: str, key: str) -> str:
     return base64.b64encode(encrypted).decode('utf-8')
 
 
+def encrypt_gcm(message: str, key: bytes) -> str:
+    """
+    authenticated encryption, the result is base64(nonce + tag + ciphertext)
+    """
+    aes = AES.new(key, AES.MODE_GCM)
+    encrypted, tag = aes.encrypt_and_digest(str_to_bytes(message))
+    return base64.b64encode(aes.nonce + tag + encrypted).decode('utf-8')
+
+
+def decrypt_gcm(encr_data: str, key: bytes) -> str:
+    """
+    raises ValueError when the data was not encrypted with the key or was modified
+    """
+    byte_array = decode_base64(str_to_bytes(encr_data))
+    nonce, tag, encrypted = byte_array[:16], byte_array[16:32], byte_array[32:]
+    aes = AES.new(key, AES.MODE_GCM, nonce=nonce)
+    return bytes_to_str(aes.decrypt_and_verify(encrypted, tag))
+
+
 def decrypt(encr_data: str, key: str) -> str:
     byte_array = decode_base64(str_to_bytes(encr_data))
     key_bytes = decode_base64(str_to_bytes(key))
@@ -0,0 +1,64 @@
+import atexit
+import logging
+import queue
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener, TimedRotatingFileHandler
+from typing import Dict, Hashable, Optional
+
+LOG_FORMAT = '%(asctime)s %(levelname)s %(message)s'
+
+_queue_handlers: Dict[str, QueueHandler] = {}
+_listeners: Dict[str, QueueListener] = {}
+_lock = threading.Lock()
+
+
+def get_queue_handler(log_path: str, backup_count: int) -> QueueHandler:
+    """Handler that writes to the daily rotated log_path from a background thread.
+
+    There is one per path in the process, so clients logging to the same file share it instead of
+    each adding a file handler of their own.
+    """
+    with _lock:
+        handler = _queue_handlers.get(log_path)
+        if handler is not None:
+            return handler
+        file_handler = TimedRotatingFileHandler(log_path, when="midnight", interval=1, backupCount=backup_count,
+                                                encoding='utf-8')
+        file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        records = queue.SimpleQueue()
+        listener = QueueListener(records, file_handler, respect_handler_level=True)
+        listener.start()
+        handler = QueueHandler(records)
+        _queue_handlers[log_path] = handler
+        _listeners[log_path] = listener
+        return handler
+
+
+@atexit.register
+def _stop_listeners():
+    # flushes the records still queued before the interpreter exits
+    with _lock:
+        for listener in _listeners.values():
+            listener.stop()
+        _listeners.clear()
+        _queue_handlers.clear()
+
+
+class LogRateLimiter:
+    """Lets one log line per key through every interval seconds and counts the suppressed ones."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._last: Dict[Hashable, float] = {}
+        self._suppressed: Dict[Hashable, int] = {}
+
+    def acquire(self, key: Hashable) -> Optional[int]:
+        """None if the line is to be suppressed, otherwise how many were suppressed since the last one."""
+        now = time.monotonic()
+        last = self._last.get(key)
+        if last is not None and now - last < self.interval:
+            self._suppressed[key] = self._suppressed.get(key, 0) + 1
+            return None
+        self._last[key] = now
+        return self._suppressed.pop(key, 0)
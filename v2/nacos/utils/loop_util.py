@@ -0,0 +1,104 @@
+import asyncio
+import logging
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Optional, TypeVar
+
+try:
+    import uvloop
+except ImportError:  # pragma: no cover - uvloop is an optional dependency
+    uvloop = None
+
+T = TypeVar("T")
+
+# loops whose default executor was replaced, it is set once per loop
+_tuned_executor_loops = weakref.WeakSet()
+
+
+def uvloop_available() -> bool:
+    return uvloop is not None
+
+
+def is_uvloop(loop: asyncio.AbstractEventLoop) -> bool:
+    return uvloop is not None and isinstance(loop, uvloop.Loop)
+
+
+def install_uvloop(logger=None) -> bool:
+    """Makes asyncio.run and asyncio.new_event_loop create uvloop loops from now on.
+
+    For hosts that start their loop with asyncio.run. Returns False, and keeps the default loop,
+    when uvloop is not installed.
+    """
+    if uvloop is None:
+        (logger or logging.getLogger(__name__)).warning("uvloop is not installed, keep the default event loop")
+        return False
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return True
+
+
+def new_event_loop(use_uvloop: bool = True) -> asyncio.AbstractEventLoop:
+    """A uvloop loop when use_uvloop is set and uvloop is installed, otherwise a default one."""
+    if use_uvloop and uvloop is not None:
+        return uvloop.new_event_loop()
+    return asyncio.new_event_loop()
+
+
+def run(main: Awaitable[T], use_uvloop: bool = True, debug: Optional[bool] = None) -> T:
+    """Like asyncio.run, on a loop made by new_event_loop, without changing the loop policy."""
+    if hasattr(asyncio, "Runner"):
+        with asyncio.Runner(debug=debug, loop_factory=lambda: new_event_loop(use_uvloop)) as runner:
+            return runner.run(main)
+    # python 3.10 has no Runner, run the loop the way asyncio.run does
+    loop = new_event_loop(use_uvloop)
+    try:
+        asyncio.set_event_loop(loop)
+        if debug is not None:
+            loop.set_debug(debug)
+        return loop.run_until_complete(main)
+    finally:
+        try:
+            _cancel_all_tasks(loop)
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.run_until_complete(loop.shutdown_default_executor())
+        finally:
+            asyncio.set_event_loop(None)
+            loop.close()
+
+
+def _cancel_all_tasks(loop: asyncio.AbstractEventLoop):
+    tasks = asyncio.all_tasks(loop)
+    if not tasks:
+        return
+    for task in tasks:
+        task.cancel()
+    loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+    for task in tasks:
+        if not task.cancelled() and task.exception() is not None:
+            loop.call_exception_handler({"message": "unhandled exception during loop_util.run() shutdown",
+                                         "exception": task.exception(), "task": task})
+
+
+def tune_event_loop(loop: asyncio.AbstractEventLoop, client_config, logger=None):
+    """Applies the event loop options of client_config to loop, options left at 0 change nothing.
+
+    use_uvloop only warns when loop is not a uvloop loop, the host picks the loop it starts.
+    slow_callback_warning_ms turns on the debug mode of the loop, which logs every callback
+    running longer than that, at the cost of the debug checks on every call. loop_executor_workers
+    sizes the default executor running the aiofiles cache reads and writes and DNS lookups.
+    """
+    logger = logger or logging.getLogger(__name__)
+    if client_config.use_uvloop and not is_uvloop(loop):
+        logger.warning("use_uvloop is set but the client runs on %s, start the loop with "
+                       "v2.nacos.utils.loop_util.run or call install_uvloop first", type(loop).__name__)
+    if client_config.slow_callback_warning_ms > 0:
+        loop.set_debug(True)
+        loop.slow_callback_duration = client_config.slow_callback_warning_ms / 1000
+    if client_config.loop_executor_workers > 0 and loop not in _tuned_executor_loops:
+        # the executor already used by the loop would otherwise keep its threads until exit
+        previous = getattr(loop, "_default_executor", None)
+        loop.set_default_executor(ThreadPoolExecutor(client_config.loop_executor_workers,
+                                                     thread_name_prefix="nacos-loop-executor"))
+        _tuned_executor_loops.add(loop)
+        if previous is not None:
+            previous.shutdown(wait=False)
+        logger.info("default executor of the event loop set to %s workers", client_config.loop_executor_workers)